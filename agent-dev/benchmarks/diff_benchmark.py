@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the diff engine backends against difflib.unified_diff.
+
+Generates synthetic "generated files" of 10k to 1M lines, applies a
+number of scattered edits and times each backend on the same pair.
+difflib is skipped above --difflib-max-lines, where it takes minutes.
+
+Usage:
+    python benchmarks/diff_benchmark.py
+    python benchmarks/diff_benchmark.py --sizes 10000 100000 --edits 200 --verify
+"""
+
+import argparse
+import difflib
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.file_manager.diff_engine import DiffEngine
+from src.file_manager.patch import apply_patch
+
+
+def make_file(lines: int, repetitive: bool, rng: random.Random) -> list:
+    """Code-like lines; repetitive files mimic fixtures and migrations"""
+    if repetitive:
+        templates = ["    {", '        "id": %d,', '        "name": "item",', '        "active": true', "    },"]
+        return [(templates[i % 5] % (i // 5) if "%d" in templates[i % 5] else templates[i % 5]) + "\n"
+                for i in range(lines)]
+    return [f"def function_{i}(arg_{rng.randint(0, 99)}): return {rng.randint(0, 10**6)}\n" for i in range(lines)]
+
+
+def mutate(lines: list, edits: int, rng: random.Random) -> list:
+    result = list(lines)
+    for _ in range(edits):
+        position = rng.randrange(len(result))
+        choice = rng.random()
+        if choice < 0.4:
+            result[position] = f"# changed {rng.random()}\n"
+        elif choice < 0.7:
+            result.insert(position, f"# inserted {rng.random()}\n")
+        else:
+            del result[position]
+    return result
+
+
+def time_call(func) -> tuple:
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--edits", type=int, default=100, help="Scattered edits per file")
+    parser.add_argument("--backends", nargs="+", default=["histogram", "patience"])
+    parser.add_argument("--difflib-max-lines", type=int, default=100_000)
+    parser.add_argument("--verify", action="store_true", help="Check that every diff applies back")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'lines':>9} {'kind':<10} {'difflib':>10} " + " ".join(f"{name:>10}" for name in args.backends))
+
+    for size in args.sizes:
+        for repetitive in (False, True):
+            old = make_file(size, repetitive, rng)
+            new = mutate(old, args.edits, rng)
+            old_text, new_text = "".join(old), "".join(new)
+
+            if size <= args.difflib_max_lines:
+                elapsed, _ = time_call(lambda: "".join(difflib.unified_diff(old, new, "old", "new")))
+                row = [f"{elapsed:>9.2f}s"]
+            else:
+                row = [f"{'skipped':>10}"]
+
+            for name in args.backends:
+                engine = DiffEngine(backend=name, max_lines=max(args.sizes) * 2)
+                elapsed, diff = time_call(lambda: engine.unified_diff(old_text, new_text, "old", "new"))
+                row.append(f"{elapsed:>9.2f}s")
+                if args.verify:
+                    patched = apply_patch(old_text, diff, fuzz=0)
+                    if patched.content != new_text:
+                        print(f"  {name}: diff does not reproduce the new file", file=sys.stderr)
+
+            kind = "repetitive" if repetitive else "unique"
+            print(f"{size:>9} {kind:<10} " + " ".join(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,9 @@ Main AI Development Agent with intelligent discovery
 """
 
 import json
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 from rich.console import Console
 from rich.prompt import Prompt, Confirm
 from rich.panel import Panel
@@ -12,15 +13,29 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from .config.settings import AgentSettings
 from .utils.llm import LLMClient
+from .utils.deadline import Deadline, TaskTimeoutError
+from .utils.speculation import Speculation, fingerprint
+from .utils.safety import SafetyChecker
 from .config.prompts import PromptManager
 from .discovery.smart_agent import SmartDiscoveryAgent
 from .analyst.prd_generator import PRDGenerator
 from .tasks.ai_decomposer import AITaskDecomposer
 from .tasks.manager import TaskManager
+from .tasks.models import TaskStatus
+from .tasks.retry import RetryScheduler
+from .tasks.write_sets import WriteSetScheduler
+from .tasks.static_validator import StaticValidator
+from .tasks.validation_batcher import ValidationBatcher
 from .builder.agent import BuilderAgent
+from .builder.context import ContextAssembler
 from .reviewer.agent import ReviewerAgent
+from .reviewer.routing import ReviewRouter
 from .educator.agent import EducatorAgent
+from .educator.lane import ExplanationLane
 from .file_manager.handler import FileManager
+from .file_manager.diff_engine import DiffEngine
+from .state.store import StateStore
+from .state.cache import ResultCache
 
 
 console = Console()
@@ -34,27 +49,91 @@ class SoftwareDevAgent:
         
         # Initialize all components
         self.llm_client = LLMClient(self.settings)
-        self.prompt_manager = PromptManager()
+        self.prompt_manager = PromptManager(reload_interval=self.settings.prompt_reload_seconds)
+        self.state_store = StateStore(self.settings.state_db_path)
+        self.review_cache = self._result_cache("review")
+        self.validation_cache = self._result_cache("validation")
         
         # AI-optimized components
         self.discovery_agent = SmartDiscoveryAgent(self.llm_client, self.prompt_manager)
         self.prd_generator = PRDGenerator(self.llm_client)
-        self.task_decomposer = AITaskDecomposer(self.llm_client)
+        self.task_decomposer = AITaskDecomposer(self.llm_client, result_cache=self.validation_cache)
+        self.static_validator = StaticValidator(
+            skip_llm_for_trivial=self.settings.skip_llm_validation_for_trivial
+        )
+        self.validation_batcher = ValidationBatcher(
+            self.task_decomposer,
+            window_seconds=self.settings.validation_batch_window_seconds,
+            max_batch_chars=self.settings.validation_batch_max_chars,
+            max_item_chars=self.settings.validation_batch_item_max_chars
+        )
         
         # Traditional components
         self.task_manager = TaskManager()
-        self.builder_agent = BuilderAgent(self.llm_client, self.prompt_manager)
-        self.reviewer_agent = ReviewerAgent(self.llm_client, self.prompt_manager)
+        # Tasks writing different files run together; overlapping ones wait
+        self.write_scheduler = WriteSetScheduler()
+        self.retry_scheduler = RetryScheduler(
+            max_retries=self.settings.max_retries,
+            base_delay=self.settings.retry_backoff_seconds,
+            max_delay=self.settings.retry_backoff_max_seconds
+        )
+        self.builder_agent = BuilderAgent(
+            self.llm_client,
+            self.prompt_manager,
+            patch_mode=self.settings.patch_mode,
+            patch_min_lines=self.settings.patch_min_lines,
+            patch_fuzz=self.settings.patch_fuzz
+        )
+        self.context_assembler = ContextAssembler(token_budget=self.settings.builder_context_token_budget)
+        self.reviewer_agent = ReviewerAgent(
+            self.llm_client,
+            self.prompt_manager,
+            diff_max_change_ratio=self.settings.review_diff_max_change_ratio,
+            diff_context_lines=self.settings.review_diff_context_lines,
+            result_cache=self.review_cache,
+            router=ReviewRouter(
+                confidence_threshold=self.settings.confidence_threshold,
+                escalation_model=self.settings.review_escalation_model,
+                light_max_lines=self.settings.review_light_max_lines,
+                skip_config_max_lines=self.settings.review_skip_config_max_lines
+            )
+        )
         self.educator_agent = EducatorAgent(self.llm_client, self.prompt_manager)
+        self.explanation_lane: Optional[ExplanationLane] = None
+        if self.settings.enable_explanations:
+            self.explanation_lane = ExplanationLane(
+                self.educator_agent,
+                self.state_store,
+                batch_size=self.settings.explanation_batch_size,
+                window_seconds=self.settings.explanation_batch_window_seconds
+            )
         self.file_manager = FileManager(
             output_dir=self.settings.output_dir,
-            dry_run=self.settings.dry_run
+            dry_run=self.settings.dry_run,
+            diff_engine=DiffEngine(
+                backend=self.settings.diff_backend,
+                max_lines=self.settings.diff_max_lines
+            ),
+            write_workers=self.settings.file_write_workers,
+            durable=self.settings.durable_writes,
+            backup_dir=self.settings.backup_dir,
+            max_backups=self.settings.max_backups,
+            max_file_size_mb=self.settings.max_file_size_mb,
+            stream_threshold_mb=self.settings.stream_threshold_mb,
+            safety_scanner=SafetyChecker.scanner if self.settings.safety_scan_writes else None
         )
         
         # State
         self.project_prd: Optional[Dict[str, Any]] = None
         self.start_time: Optional[datetime] = None
+        self.phase_deadline: Optional[Deadline] = None
+        self._pending_decomposition: Optional[Speculation] = None
         
+    def _result_cache(self, namespace: str) -> Optional[ResultCache]:
+        if not self.settings.enable_result_cache:
+            return None
+        return ResultCache(self.state_store, namespace)
+    
     def run(self):
         """Main agent loop with intelligent discovery"""
         self.start_time = datetime.now()
@@ -72,22 +151,45 @@ class SoftwareDevAgent:
             # Phase 2: AI-Optimized PRD Generation
             prd = self._generate_ai_prd(discovery_data)
             
-            # Phase 3: Task Decomposition
-            tasks = self._decompose_to_tasks(prd)
+            # Phase 3: Task Decomposition (streams tasks in the background)
+            decomposition = self._decompose_to_tasks(prd)
             
-            # Phase 4: Development Loop
-            self._ai_development_loop(tasks, prd)
+            # Phase 4: Development Loop (starts building while tasks still arrive)
+            self._ai_development_loop(decomposition, prd)
             
             # Phase 5: Completion
             self._finalize()
             
         except KeyboardInterrupt:
+            self.cancel()
             console.print("\n[bold yellow]⚠️  Agent interrupted[/bold yellow]")
         except Exception as e:
             console.print(f"\n[bold red]❌ Agent failed: {e}[/bold red]")
             import traceback
             traceback.print_exc()
     
+    def cancel(self):
+        """Cancel in-flight work of the current phase (safe to call from another thread)"""
+        if self.phase_deadline is not None:
+            self.phase_deadline.cancel()
+        if self._pending_decomposition is not None:
+            self._pending_decomposition.discard()
+    
+    def _ask_while_speculating(self, ask: Callable[[], Any]) -> Any:
+        """Ask the user something, using the wait to keep the model warm
+        
+        Discovery analysis depends on the answer being typed, so the only
+        work that is safe to run ahead is loading the model.
+        """
+        if not self.settings.speculative_execution:
+            return ask()
+        
+        warm_up = Speculation("warm-up", lambda deadline, emit: self.llm_client.warm_up(deadline)).start()
+        try:
+            return ask()
+        finally:
+            warm_up.discard()
+    
     def _run_intelligent_discovery(self) -> Dict[str, Any]:
         """Run intelligent, iterative discovery"""
         console.print(Panel.fit(
@@ -103,7 +205,7 @@ class SoftwareDevAgent:
         console.print(f"\n{current_message}")
         
         # Get initial response BEFORE entering progress context
-        initial_response = Prompt.ask("\n[bold]Your response[/bold]")
+        initial_response = self._ask_while_speculating(lambda: Prompt.ask("\n[bold]Your response[/bold]"))
         
         understanding_score = 0.0
         iteration = 1
@@ -130,7 +232,9 @@ class SoftwareDevAgent:
                 # TEMPORARY: Close progress to get user input
                 progress.stop()
                 
-                user_input = Prompt.ask(f"\n[iteration {iteration}] Your response")
+                user_input = self._ask_while_speculating(
+                    lambda: Prompt.ask(f"\n[iteration {iteration}] Your response")
+                )
                 
                 # Restart progress
                 progress.start_task(task)
@@ -207,6 +311,11 @@ class SoftwareDevAgent:
             if len(human_prd.split('\n')) > 15:
                 console.print("   ... [truncated]")
         
+        # Decompose the pending PRD while the user reads it; the result is
+        # only used if development proceeds with this exact PRD
+        if self.settings.speculative_execution:
+            self._pending_decomposition = self._start_decomposition(self.project_prd)
+        
         # Ask for approval
         console.print("\n" + "="*80)
         approved = Confirm.ask("Approve this PRD and proceed to development?", default=True)
@@ -219,19 +328,49 @@ class SoftwareDevAgent:
         
         return self.project_prd
     
-    def _decompose_to_tasks(self, prd: Dict[str, Any]) -> List:
-        """Decompose PRD into AI-executable tasks"""
+    def _decompose_to_tasks(self, prd: Dict[str, Any]) -> Future:
+        """Decompose PRD into AI-executable tasks
+        
+        Decomposition runs in the background and registers every task with
+        the task manager as soon as it has been generated. The returned
+        future resolves to the full task list.
+        """
         console.print(Panel.fit(
             "[bold cyan]🔨 DECOMPOSING TO AI TASKS[/bold cyan]",
             border_style="cyan"
         ))
         
-        tasks = self.task_decomposer.decompose_prd(prd)
-        
-        # Add to task manager
-        for task in tasks:
-            self.task_manager.add_task(task)
-        
+        # Reuse the decomposition started during PRD approval if the PRD is unchanged
+        speculation = self._pending_decomposition
+        self._pending_decomposition = None
+        if speculation is not None and speculation.matches(fingerprint(prd)):
+            console.print("[dim]♻️  Using decomposition started during PRD review[/dim]")
+        else:
+            if speculation is not None:
+                speculation.discard()
+            speculation = self._start_decomposition(prd)
+        
+        # Decomposition overlaps with building, so both share the phase deadline
+        self.phase_deadline = Deadline(self.settings.phase_timeout_seconds)
+        self.task_manager.open_intake()
+        decomposition = speculation.commit(self._register_task, deadline=self.phase_deadline)
+        decomposition.add_done_callback(lambda future: self.task_manager.close_intake())
+        return decomposition
+    
+    def _start_decomposition(self, prd: Dict[str, Any]) -> Speculation:
+        """Start decomposing a PRD in the background; tasks are held until committed"""
+        return Speculation(
+            fingerprint(prd),
+            lambda deadline, emit: self.task_decomposer.decompose_prd(prd, deadline=deadline, on_task=emit)
+        ).start()
+    
+    def _register_task(self, task):
+        """Hand a freshly decomposed task to the scheduler"""
+        self.task_manager.add_task(task)
+        console.print(f"[dim]➕ {task.id}: {task.description}[/dim]")
+    
+    def _report_decomposition(self, tasks: List):
+        """Show the task breakdown once decomposition has finished"""
         console.print(f"[green]✅ Created {len(tasks)} AI-executable tasks[/green]")
         
         # Show task breakdown
@@ -246,10 +385,8 @@ class SoftwareDevAgent:
         
         total_hours = sum(task.estimated_hours for task in tasks)
         console.print(f"\n⏱️  Estimated total: {total_hours:.1f} hours")
-        
-        return tasks
     
-    def _ai_development_loop(self, tasks: List, prd_context: Dict[str, Any]):
+    def _ai_development_loop(self, decomposition: Future, prd_context: Dict[str, Any]):
         """AI development loop with validation"""
         console.print(Panel.fit(
             "[bold cyan]👨‍💻 AI DEVELOPMENT LOOP[/bold cyan]\n"
@@ -257,16 +394,47 @@ class SoftwareDevAgent:
             border_style="cyan"
         ))
         
-        completed_tasks = 0
         iteration = 1
+        reported = False
+        executor = ThreadPoolExecutor(
+            max_workers=self.settings.max_parallel_tasks,
+            thread_name_prefix="task"
+        )
+        running: Dict[Future, Any] = {}  # Future -> task it is processing
         
-        while iteration <= self.settings.max_iterations and completed_tasks < len(tasks):
-            console.print(f"\n[bold]Iteration {iteration}[/bold]")
+        while iteration <= self.settings.max_iterations:
+            if self.phase_deadline.expired:
+                console.print("[red]⏱️  Development phase deadline reached, stopping[/red]")
+                break
+            
+            if decomposition.done() and not reported:
+                self._report_decomposition(decomposition.result())
+                reported = True
+            
+            # Finished tasks have already released their paths
+            for future in [future for future in running if future.done()]:
+                running.pop(future)
+                future.result()
             
-            # Get next ready task
-            ready_tasks = self.task_manager.get_ready_tasks()
+            # Failed tasks whose backoff has elapsed go back to the queue
+            self._release_due_retries()
             
-            if not ready_tasks:
+            # Get next ready tasks, leaving out those submitted but not yet started
+            running_ids = {task.id for task in running.values()}
+            ready_tasks = [task for task in self.task_manager.get_ready_tasks() if task.id not in running_ids]
+            
+            if not ready_tasks and not running:
+                if not decomposition.done() or len(self.retry_scheduler):
+                    # More tasks or retries are on their way
+                    next_retry = self.retry_scheduler.next_due_in()
+                    self.task_manager.wait_for_change(
+                        timeout=min(1.0, next_retry) if next_retry is not None else 1.0
+                    )
+                    continue
+                
+                if self.task_manager.count_by_status(TaskStatus.COMPLETED) >= len(self.task_manager.tasks):
+                    break
+                
                 console.print("[yellow]No ready tasks. Checking dependencies...[/yellow]")
                 # Check if we can mark some tasks as ready
                 self._check_blocked_tasks()
@@ -276,41 +444,146 @@ class SoftwareDevAgent:
                     console.print("[yellow]All tasks waiting on dependencies[/yellow]")
                     break
             
-            # Process each ready task
-            for task in ready_tasks[:3]:  # Process max 3 tasks per iteration
-                self._process_ai_task(task, prd_context)
-                completed_tasks += 1
+            # Fresh work first so retries never hold up the critical path
+            ready_tasks.sort(key=lambda t: t.metadata.get("attempts", 0))
             
-            iteration += 1
-        
-        console.print(f"\n[green]✅ Development loop complete. Processed {completed_tasks}/{len(tasks)} tasks[/green]")
+            # Start every ready task whose write set is free right now; small validations get batched together
+            batch = self.write_scheduler.select(ready_tasks, self.settings.max_parallel_tasks - len(running))
+            if batch:
+                console.print(f"\n[bold]Iteration {iteration}[/bold]")
+                iteration += 1
+            for task in batch:
+                future = executor.submit(self._process_claimed_task, task, prd_context, self.phase_deadline)
+                # A finished task frees its paths and its slot: select again right away
+                future.add_done_callback(lambda _: self.task_manager.notify_change())
+                running[future] = task
+            
+            if running and not batch:
+                # Until a task finishes, is added or changes status (bounded, for retries coming due)
+                next_retry = self.retry_scheduler.next_due_in()
+                self.task_manager.wait_for_change(
+                    timeout=min(1.0, next_retry) if next_retry is not None else 1.0
+                )
+        
+        executor.shutdown(wait=True)
+        if not decomposition.done():
+            # Stop generating tasks nobody will build
+            self.phase_deadline.cancel()
+        
+        completed_tasks = self.task_manager.count_by_status(TaskStatus.COMPLETED)
+        console.print(f"\n[green]✅ Development loop complete. Processed {completed_tasks}/{len(self.task_manager.tasks)} tasks[/green]")
+    
+    def _process_claimed_task(self, task, prd_context: Dict[str, Any], phase_deadline: Optional[Deadline] = None):
+        """Process a task selected by the write-set scheduler, then free its paths"""
+        self.validation_batcher.task_started(task.id)
+        try:
+            self._process_ai_task(task, prd_context, phase_deadline)
+        finally:
+            self.validation_batcher.task_finished(task.id)
+            self.write_scheduler.release(task.id)
     
-    def _process_ai_task(self, task, prd_context: Dict[str, Any]):
-        """Process a single AI task"""
+    def _process_ai_task(self, task, prd_context: Dict[str, Any], phase_deadline: Optional[Deadline] = None):
+        """Process a single AI task within its deadline"""
         console.print(f"\n[bold]Processing: {task.id}[/bold]")
         console.print(f"📝 {task.description}")
         console.print(f"📁 Files to create: {len(task.metadata.get('files_to_create', []))}")
         
+        # The task gets the tighter of its own deadline, the task timeout and the phase deadline
+        deadline = Deadline.from_datetime(task.deadline, parent=phase_deadline).child(
+            self.settings.task_timeout_seconds
+        )
+        
         # Update task status
-        self.task_manager.update_task_status(task.id, "IN_PROGRESS")
+        self.task_manager.update_task_status(task.id, TaskStatus.IN_PROGRESS)
         
-        # Build phase
-        console.print("[blue]🤖 AI Builder working...[/blue]")
-        build_result = self.builder_agent.build_for_task(task, {
-            **prd_context,
+        try:
+            self._run_ai_task(task, prd_context, deadline)
+        except TaskTimeoutError as e:
+            console.print(f"[red]⏱️  Task timed out: {e}[/red]")
+            task.notes = f"Timed out: {e}"
+            self._fail_task(task, [f"The previous attempt timed out ({e}); keep the output smaller and focused"])
+    
+    def _fail_task(self, task, feedback: List[str]):
+        """Mark a task FAILED and queue it for a feedback-guided retry"""
+        self.file_manager.end_task(task.id)
+        self.task_manager.update_task_status(task.id, TaskStatus.FAILED)
+        
+        if self.retry_scheduler.schedule(task, feedback):
+            console.print(
+                f"[yellow]🔁 {task.id} queued for retry "
+                f"({self.retry_scheduler.attempts(task.id)}/{self.retry_scheduler.max_retries})[/yellow]"
+            )
+        else:
+            console.print(f"[red]🛑 {task.id} exhausted its retry budget[/red]")
+    
+    def _release_due_retries(self):
+        """Move failed tasks whose backoff has elapsed back to PENDING"""
+        for task_id in self.retry_scheduler.pop_due():
+            if self.task_manager.update_task_status(task_id, TaskStatus.PENDING):
+                console.print(f"[dim]🔁 Retrying {task_id}[/dim]")
+    
+    def _run_ai_task(self, task, prd_context: Dict[str, Any], deadline: Deadline):
+        """Build, validate and write a task's files"""
+        # Only the PRD parts relevant to this task go into the prompt
+        extra = {
             "ai_instructions": task.metadata.get("ai_instructions", ""),
             "technical_requirements": task.metadata.get("technical_requirements", [])
-        })
+        }
+        interfaces = self._dependency_interfaces(task)
+        if interfaces:
+            extra["dependency_interfaces"] = interfaces
+        assembled = self.context_assembler.assemble(task, prd_context, extra=extra)
+        console.print(
+            f"[dim]   Context: {assembled.tokens}/{assembled.full_tokens} tokens "
+            f"({assembled.pruned_ratio:.0%} pruned)[/dim]"
+        )
+        
+        # Files the task touches that already exist can be patched instead of rewritten;
+        # the versions read here are the base for merging concurrent edits on write
+        existing_files = self.file_manager.begin_task(
+            task.id,
+            task.metadata.get("files_to_create", []) + task.target_files
+        )
+        
+        # Build phase
+        console.print("[blue]🤖 AI Builder working...[/blue]")
+        build_result = self.builder_agent.build_for_task(
+            task,
+            assembled.context,
+            deadline=deadline,
+            existing_files=existing_files
+        )
+        for warning in build_result.warnings:
+            console.print(f"[yellow]⚠️  {warning}[/yellow]")
         
         if not build_result.success:
             console.print(f"[red]❌ Build failed: {build_result.error_message}[/red]")
-            self.task_manager.update_task_status(task.id, "FAILED")
+            self._fail_task(task, [f"Build failed: {build_result.error_message}"])
             return
         
-        # Validate with AI decomposer
-        console.print("[blue]🔍 AI Validation...[/blue]")
         generated_files = {f.filename: f.code for f in build_result.files}
-        validation = self.task_decomposer.validate_task_completion(task, generated_files)
+        
+        # Writes outside the declared write set are not protected by scheduling
+        undeclared = self.write_scheduler.undeclared(task, generated_files)
+        if undeclared:
+            task.metadata["undeclared_writes"] = undeclared
+            console.print(f"[yellow]⚠️  Writes outside the declared files: {', '.join(undeclared)}[/yellow]")
+        
+        # Cheap local gate: broken output goes straight to retry without an LLM call
+        validation = self.static_validator.check(task, generated_files)
+        if not validation["passed"]:
+            console.print("[red]❌ Static checks failed:[/red]")
+            for issue in validation["issues"]:
+                console.print(f"  • {issue}")
+            self._fail_task(task, validation["issues"])
+            return
+        
+        if validation["skip_llm"]:
+            console.print("[dim]🔍 Static checks sufficient, skipping AI validation[/dim]")
+        else:
+            # Validate with AI decomposer
+            console.print("[blue]🔍 AI Validation...[/blue]")
+            validation = self.validation_batcher.validate(task, generated_files, deadline=deadline)
         
         if not validation.get("passed", False):
             console.print(f"[yellow]⚠️  Validation issues:[/yellow]")
@@ -319,22 +592,92 @@ class SoftwareDevAgent:
             
             if not validation.get("can_proceed", False):
                 console.print("[red]❌ Task failed validation[/red]")
-                self.task_manager.update_task_status(task.id, "FAILED")
+                self._fail_task(task, validation.get("issues", []) or ["Validation rejected the output"])
+                return
+        
+        # Review all files in parallel; a critical bug or security issue rejects the build
+        if self.settings.enable_code_review:
+            console.print("[blue]🔎 Reviewing files...[/blue]")
+            # Files that already exist are reviewed as a diff against their current version;
+            # files above the stream threshold are not loaded and get a full review
+            previous_versions = {
+                f.filename: previous
+                for f in build_result.files
+                if (previous := self.file_manager.read_file(
+                    f.filename,
+                    max_bytes=self.file_manager.stream_threshold_bytes
+                )) is not None
+            }
+            review = self.reviewer_agent.review_build(
+                build_result,
+                deadline=deadline,
+                previous_versions=previous_versions
+            )
+            if review.get("blocking_issues"):
+                console.print("[red]❌ Review found blocking issues:[/red]")
+                for issue in review["blocking_issues"]:
+                    console.print(f"  • {issue}")
+                self._fail_task(task, review["blocking_issues"])
                 return
+            if review.get("total_files"):
+                console.print(
+                    f"[dim]   Reviewed {review['total_files']} files, "
+                    f"{review['total_issues']} issues, avg score {review['average_score']:.2f}[/dim]"
+                )
         
         # File writing
+        deadline.check(f"Task {task.id}")
         console.print("[blue]💾 Writing files...[/blue]")
         file_results = self.file_manager.write_files(
             [{"filename": f.filename, "code": f.code} for f in build_result.files],
-            task.id
+            task.id,
+            deadline=deadline
         )
         
-        if file_results.get("failed"):
+        if file_results.get("conflicts"):
+            feedback = [
+                f"{conflict['filename']} was changed by another task while this one ran "
+                f"({conflict['error']}); build on its current content"
+                for conflict in file_results["conflicts"]
+            ]
+            # FAILED first: a requeued task may be released as soon as it is queued
+            self.task_manager.update_task_status(task.id, TaskStatus.FAILED)
+            if self.retry_scheduler.requeue(task, feedback):
+                console.print("[yellow]🔀 Files changed by a concurrent task conflict with this one, rebuilding[/yellow]")
+            else:
+                console.print("[yellow]🔀 Task keeps conflicting with concurrent changes, retrying with backoff[/yellow]")
+                self._fail_task(task, feedback)
+        elif file_results.get("failed"):
             console.print(f"[red]❌ File writing failed[/red]")
-            self.task_manager.update_task_status(task.id, "FAILED")
+            self._fail_task(task, [
+                f"Could not write {failure['filename']}: {failure['error']}"
+                for failure in file_results["failed"]
+            ])
         else:
             console.print(f"[green]✅ Task completed (Score: {validation.get('score', 0)}/100)[/green]")
-            self.task_manager.update_task_status(task.id, "COMPLETED")
+            task.metadata["output_files"] = file_results["success"] + file_results["unchanged"]
+            if file_results["merged"]:
+                console.print(f"[dim]   Merged concurrent changes into {', '.join(file_results['merged'])}[/dim]")
+            if file_results["unchanged"]:
+                console.print(f"[dim]   {len(file_results['unchanged'])} files unchanged, not rewritten[/dim]")
+            if file_results["safety"]:
+                task.metadata["safety_findings"] = file_results["safety"]
+                for filename, findings in file_results["safety"].items():
+                    first = findings[0]
+                    console.print(
+                        f"[yellow]⚠️  {filename}: {len(findings)} safety findings, "
+                        f"first at line {first['line']}: {first['message']}[/yellow]"
+                    )
+            self.task_manager.update_task_status(task.id, TaskStatus.COMPLETED)
+            
+            # Explanations are produced off the critical path
+            if self.explanation_lane is not None:
+                self.explanation_lane.submit(
+                    task.id,
+                    build_result.files,
+                    [r for r in self.reviewer_agent.review_history if r.task_id == task.id],
+                    {"description": task.description, "type": task.metadata.get("type")}
+                )
             
             # Show what was learned
             if validation.get("suggestions"):
@@ -342,6 +685,21 @@ class SoftwareDevAgent:
                 for suggestion in validation.get("suggestions", [])[:2]:
                     console.print(f"  • {suggestion}")
     
+    def _dependency_interfaces(self, task) -> str:
+        """Interface stubs of the files produced by the tasks this one depends on"""
+        filenames = []
+        for dependency_id in task.dependencies:
+            dependency = self.task_manager.tasks.get(dependency_id)
+            if dependency is None:
+                continue
+            outputs = dependency.metadata.get("output_files") or dependency.metadata.get("files_to_create", [])
+            filenames.extend(f for f in outputs if f not in filenames)
+        
+        return self.file_manager.symbol_index.stubs(
+            filenames,
+            max_chars=self.settings.dependency_interface_max_chars
+        )
+    
     def _check_blocked_tasks(self):
         """Check and potentially unblock tasks waiting on dependencies"""
         # Simple implementation: if all dependencies are done, mark as ready
@@ -389,6 +747,49 @@ class SoftwareDevAgent:
         console.print(f"   • Failed: {failed}")
         console.print(f"   • Success rate: {(completed/total_tasks*100 if total_tasks > 0 else 0):.1f}%")
         console.print(f"   • Elapsed time: {elapsed}")
+        context_stats = self.context_assembler.stats
+        if context_stats["full_tokens"]:
+            console.print(
+                f"   • Builder context: {context_stats['tokens']}/{context_stats['full_tokens']} tokens "
+                f"({1 - context_stats['tokens'] / context_stats['full_tokens']:.0%} pruned)"
+            )
+        for name, cache in (("Review", self.review_cache), ("Validation", self.validation_cache)):
+            if cache is not None:
+                console.print(f"   • {name} cache: {cache.stats['hits']} hits, {cache.stats['misses']} misses")
+        
+        if not self.settings.dry_run:
+            usage = self.file_manager.get_backup_usage()
+            if usage["versions"]:
+                console.print(
+                    f"   • Backups: {usage['versions']} versions in {usage['objects']} objects, "
+                    f"{usage['stored_bytes'] / 1024:.1f} KiB on disk "
+                    f"({usage['saved_ratio']:.0%} saved by compression and deduplication)"
+                )
+        
+        scheduling = self.write_scheduler.stats
+        if scheduling["deferred"] or scheduling["undeclared"]:
+            console.print(
+                f"   • Write sets: {scheduling['deferred']} tasks deferred for overlapping files, "
+                f"{scheduling['undeclared']} undeclared writes"
+            )
+        
+        if self.settings.enable_code_review:
+            capacity = self.reviewer_agent.get_capacity_report()
+            console.print(f"\n🔎 [bold]Review capacity:[/bold]")
+            for mode in ("full", "diff", "light"):
+                entry = capacity[mode]
+                console.print(
+                    f"   • {mode.capitalize()}: {entry['files']} files, "
+                    f"{entry['seconds']:.1f}s ({entry['cached']} from cache)"
+                )
+            console.print(f"   • Skipped: {capacity['skipped']} files")
+            console.print(f"   • Escalated to larger model: {capacity['escalated']} files")
+        
+        if self.explanation_lane is not None and self.explanation_lane.pending:
+            console.print(
+                f"\n📚 [dim]{self.explanation_lane.pending} task explanations still being written "
+                f"in the background ({self.explanation_lane.stats['explained']} saved)[/dim]"
+            )
         
         if self.settings.dry_run:
             console.print("\n💡 [yellow]Run in DRY-RUN mode. To write files, set DRY_RUN=False[/yellow]")
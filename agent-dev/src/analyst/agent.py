@@ -1,10 +1,10 @@
 from typing import Dict, Any, Optional
 from pydantic import BaseModel, Field
 import json
-import difflib
 from datetime import datetime
 from ..utils.llm import LLMClient
 from ..config.prompts import PromptManager
+from ..file_manager.diff_utils import DEFAULT_ENGINE
 from .prd_generator import PRDGenerator
 
 
@@ -184,13 +184,11 @@ class AnalystAgent:
             new_content = new_prd.sections.get(section_name, PRDSection(title=section_name, content="")).content
             
             if old_content != new_content:
-                diff = difflib.unified_diff(
-                    old_content.splitlines(keepends=True),
-                    new_content.splitlines(keepends=True),
+                diff_output.append(DEFAULT_ENGINE.unified_diff(
+                    old_content,
+                    new_content,
                     fromfile=f"{section_name} (v{old_prd.version})",
-                    tofile=f"{section_name} (v{new_prd.version})",
-                    lineterm=""
-                )
-                diff_output.extend(diff)
+                    tofile=f"{section_name} (v{new_prd.version})"
+                ))
         
-        return "\n".join(diff_output)
\ No newline at end of file
+        return "".join(diff_output)
\ No newline at end of file
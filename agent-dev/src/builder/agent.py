@@ -3,8 +3,10 @@ from pydantic import BaseModel, Field
 import json
 from datetime import datetime
 from ..utils.llm import LLMClient
+from ..utils.deadline import Deadline, TaskTimeoutError
 from ..config.prompts import PromptManager
 from ..tasks.models import Task
+from ..file_manager.patch import apply_patch
 
 
 class CodeFile(BaseModel):
@@ -15,6 +17,7 @@ class CodeFile(BaseModel):
     tests: Optional[str] = None
     documentation: Optional[str] = None
     confidence_score: float = Field(ge=0.0, le=1.0)
+    generation_mode: str = "full"  # "full" or "patch"
 
 
 class BuildResult(BaseModel):
@@ -28,48 +31,91 @@ class BuildResult(BaseModel):
 
 
 class BuilderAgent:
-    def __init__(self, llm_client: LLMClient, prompt_manager: PromptManager):
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        prompt_manager: PromptManager,
+        patch_mode: bool = True,
+        patch_min_lines: int = 80,
+        patch_fuzz: int = 2
+    ):
         self.llm_client = llm_client
         self.prompt_manager = prompt_manager
         self.build_history: List[BuildResult] = []
+        # Existing files at least this long are edited with diffs instead of rewritten
+        self.patch_mode = patch_mode
+        self.patch_min_lines = patch_min_lines
+        self.patch_fuzz = patch_fuzz
         
-    def build_for_task(self, task: Task, context: Dict[str, Any]) -> BuildResult:
-        """Generate code for a specific task"""
+    def build_for_task(
+        self,
+        task: Task,
+        context: Dict[str, Any],
+        deadline: Optional[Deadline] = None,
+        existing_files: Optional[Dict[str, str]] = None
+    ) -> BuildResult:
+        """Generate code for a specific task
+        
+        In patch mode, large files in `existing_files` are edited with
+        unified diffs. Files whose patch does not apply are regenerated in
+        full with a second request that shows their current content.
+        
+        Raises TaskTimeoutError if the deadline passes before the model answers.
+        """
         start_time = datetime.now()
+        existing_files = existing_files or {}
+        warnings: List[str] = []
         
         try:
-            # Prepare build prompt
-            build_prompt = self.prompt_manager.get_prompt(
-                "builder",
-                "code_generation",
-                task_description=task.description,
-                target_files=", ".join(task.target_files),
-                dependencies=", ".join(task.dependencies),
-                context=json.dumps(context, indent=2)
-            )
+            patch_targets = self._patch_targets(existing_files)
+            if patch_targets:
+                build_prompt = self.prompt_manager.get_prompt(
+                    "builder",
+                    "code_patch",
+                    task_description=task.description,
+                    target_files=", ".join(task.target_files),
+                    dependencies=", ".join(task.dependencies),
+                    context=json.dumps(context, separators=(',', ':'), default=str),
+                    existing_files=self._existing_files_block(patch_targets)
+                )
+            else:
+                build_prompt = self._generation_prompt(task, context, task.target_files)
             
-            # Generate code
-            response = self.llm_client.generate(
-                prompt=build_prompt,
-                system_prompt=self.prompt_manager.get_prompt("builder", "system_prompt"),
-                response_format={"type": "json_object"}
-            )
+            files = self._generate_files(task, build_prompt, deadline)
             
-            # Parse response
-            code_data = json.loads(response)
-            files = []
+            # Turn patches into full file content; failed ones are regenerated
+            failed_patches = []
+            for file in files:
+                if file.generation_mode != "patch":
+                    continue
+                original = existing_files.get(file.filename)
+                if original is None:
+                    failed_patches.append(file.filename)
+                    warnings.append(f"Patch for {file.filename}: file does not exist")
+                    continue
+                patch_result = apply_patch(original, file.code, fuzz=self.patch_fuzz)
+                if patch_result.success:
+                    file.code = patch_result.content
+                else:
+                    failed_patches.append(file.filename)
+                    warnings.append(f"Patch for {file.filename} did not apply: " + "; ".join(
+                        f"hunk {c.hunk + 1} ({c.header}) near line {c.expected_line}: {c.reason}"
+                        for c in patch_result.conflicts
+                    ))
             
-            for file_data in code_data.get("files", []):
-                file = CodeFile(
-                    filename=file_data["filename"],
-                    code=file_data["code"],
-                    language=file_data.get("language", self._detect_language(file_data["filename"])),
-                    dependencies=file_data.get("dependencies", []),
-                    tests=file_data.get("tests"),
-                    documentation=file_data.get("documentation"),
-                    confidence_score=file_data.get("confidence_score", 0.8)
-                )
-                files.append(file)
+            if failed_patches:
+                files = [f for f in files if f.filename not in failed_patches]
+                present = {f.filename for f in files}
+                rewrite_prompt = self._rewrite_prompt(task, context, failed_patches, existing_files)
+                regenerated = {}
+                for file in self._generate_files(task, rewrite_prompt, deadline):
+                    if file.filename in present:
+                        continue
+                    if file.generation_mode == "patch":
+                        warnings.append(f"Regenerated {file.filename} as a patch again; dropped")
+                        continue
+                    regenerated[file.filename] = file
+                files.extend(regenerated.values())
             
             # Calculate build time
             build_time = (datetime.now() - start_time).total_seconds()
@@ -78,12 +124,15 @@ class BuilderAgent:
                 task_id=task.id,
                 files=files,
                 success=True,
+                warnings=warnings,
                 build_time=build_time
             )
             
             self.build_history.append(result)
             return result
             
+        except TaskTimeoutError:
+            raise
         except Exception as e:
             build_time = (datetime.now() - start_time).total_seconds()
             
@@ -92,12 +141,98 @@ class BuilderAgent:
                 files=[],
                 success=False,
                 error_message=str(e),
+                warnings=warnings,
                 build_time=build_time
             )
             
             self.build_history.append(result)
             return result
     
+    def _patch_targets(self, existing_files: Dict[str, str]) -> Dict[str, str]:
+        """Existing files large enough that a diff is cheaper than a rewrite"""
+        if not self.patch_mode:
+            return {}
+        return {
+            filename: code
+            for filename, code in existing_files.items()
+            if code.count("\n") + 1 >= self.patch_min_lines
+        }
+    
+    def _generation_prompt(self, task: Task, context: Dict[str, Any], target_files: List[str]) -> str:
+        """Prompt asking for complete file contents"""
+        return self.prompt_manager.get_prompt(
+            "builder",
+            "code_generation",
+            task_description=task.description,
+            target_files=", ".join(target_files),
+            dependencies=", ".join(task.dependencies),
+            context=json.dumps(context, separators=(',', ':'), default=str)
+        )
+    
+    def _rewrite_prompt(
+        self,
+        task: Task,
+        context: Dict[str, Any],
+        filenames: List[str],
+        existing_files: Dict[str, str]
+    ) -> str:
+        """Prompt asking for complete contents of files whose patches failed, showing their current content"""
+        current = {filename: existing_files[filename] for filename in filenames if filename in existing_files}
+        if not current:
+            return self._generation_prompt(task, context, filenames)
+        return self.prompt_manager.get_prompt(
+            "builder",
+            "code_rewrite",
+            task_description=task.description,
+            target_files=", ".join(filenames),
+            dependencies=", ".join(task.dependencies),
+            context=json.dumps(context, separators=(',', ':'), default=str),
+            existing_files=self._existing_files_block(current)
+        )
+    
+    @staticmethod
+    def _existing_files_block(files: Dict[str, str]) -> str:
+        return "\n\n".join(f"### {filename}\n```\n{code}\n```" for filename, code in files.items())
+    
+    def _generate_files(self, task: Task, build_prompt: str, deadline: Optional[Deadline]) -> List[CodeFile]:
+        """Send a build prompt and parse the files in the answer"""
+        # Retries carry the reasons the previous attempt was rejected
+        feedback = task.metadata.get("retry_feedback")
+        if feedback:
+            build_prompt += (
+                "\n\nA previous attempt at this task was rejected. Fix these problems:\n"
+                + "\n".join(f"- {item}" for item in feedback)
+            )
+        
+        # Generate code
+        response = self.llm_client.generate(
+            prompt=build_prompt,
+            system_prompt=self.prompt_manager.get_prompt("builder", "system_prompt"),
+            response_format={"type": "json_object"},
+            deadline=deadline
+        )
+        
+        # Parse response
+        code_data = json.loads(response)
+        files = []
+        
+        for file_data in code_data.get("files", []):
+            # Patched files carry the diff in `code` until it is applied
+            is_patch = bool(file_data.get("patch")) and not file_data.get("code")
+            file = CodeFile(
+                filename=file_data["filename"],
+                code=file_data["patch"] if is_patch else file_data["code"],
+                language=file_data.get("language", self._detect_language(file_data["filename"])),
+                dependencies=file_data.get("dependencies", []),
+                tests=file_data.get("tests"),
+                documentation=file_data.get("documentation"),
+                confidence_score=file_data.get("confidence_score", 0.8),
+                generation_mode="patch" if is_patch else "full"
+            )
+            files.append(file)
+        
+        return files
+    
     def _detect_language(self, filename: str) -> str:
         """Detect programming language from filename"""
         extensions = {
@@ -0,0 +1,203 @@
+"""
+Context Assembler - selects the parts of the PRD a build prompt needs
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+from pydantic import BaseModel, Field
+
+from ..tasks.models import Task
+
+
+# Sections every build needs, in the order they are added (path into the PRD)
+CORE_SECTIONS: List[Tuple[str, ...]] = [
+    ("project", "name"),
+    ("project", "description"),
+    ("architecture", "pattern"),
+    ("development", "tech_stack"),
+    ("ai_agent_instructions", "coding_guidelines"),
+]
+
+# List sections whose items are ranked by relevance to the task
+RANKED_SECTIONS: List[Tuple[str, ...]] = [
+    ("requirements", "functional"),
+    ("data_models",),
+    ("api_specification", "endpoints"),
+    ("architecture", "components"),
+    ("requirements", "non_functional"),
+]
+
+# Extra sections pulled in by task type
+TYPE_SECTIONS: Dict[str, List[Tuple[str, ...]]] = {
+    "setup": [("development", "dependencies")],
+    "test": [("testing",)],
+    "deployment": [("deployment",)],
+}
+
+ID_PATTERN = re.compile(r"\b[A-Z]{2,}-\d+\b")
+WORD_PATTERN = re.compile(r"[A-Za-z][a-z]+|[A-Z]+(?![a-z])")
+STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "from", "into", "should", "must",
+    "will", "are", "all", "use", "using", "each", "create", "implement", "add",
+    "file", "files", "code", "task", "support", "able", "when", "have", "has",
+}
+
+
+class AssembledContext(BaseModel):
+    context: Dict[str, Any]
+    tokens: int
+    full_tokens: int
+    included: List[str] = Field(default_factory=list)
+    dropped: List[str] = Field(default_factory=list)
+
+    @property
+    def pruned_ratio(self) -> float:
+        if not self.full_tokens:
+            return 0.0
+        return max(0.0, 1 - self.tokens / self.full_tokens)
+
+
+class ContextAssembler:
+    """Build a compact, task-specific slice of the PRD.
+
+    Core sections (project summary, tech stack, coding guidelines) are always
+    included. Items of the ranked sections - requirements, data models, API
+    endpoints, architecture components - are included when the task
+    references their id or shares terms with them, best matches first,
+    until `token_budget` is reached. Token counts are estimated from the
+    compact JSON size.
+    """
+
+    def __init__(self, token_budget: int = 1500, chars_per_token: float = 4.0):
+        self.token_budget = token_budget
+        self.chars_per_token = chars_per_token
+        self.stats = {"tasks": 0, "tokens": 0, "full_tokens": 0}
+
+    def assemble(self, task: Task, prd: Dict[str, Any], extra: Optional[Dict[str, Any]] = None) -> AssembledContext:
+        """Select the PRD parts relevant to `task`; `extra` is always included"""
+        context: Dict[str, Any] = dict(extra or {})
+        used = self.estimate_tokens(context)
+        included: List[str] = []
+        dropped: List[str] = []
+
+        task_text = self._task_text(task)
+        terms = self._terms(task_text)
+        referenced_ids = set(ID_PATTERN.findall(task_text))
+
+        sections = CORE_SECTIONS + TYPE_SECTIONS.get(task.metadata.get("type", ""), [])
+        for path in sections:
+            value = self._lookup(prd, path)
+            if value in (None, "", [], {}):
+                continue
+            cost = self.estimate_tokens({path[-1]: value})
+            if used + cost > self.token_budget:
+                dropped.append(".".join(path))
+                continue
+            self._insert(context, path, value)
+            used += cost
+            included.append(".".join(path))
+
+        candidates = []
+        for path in RANKED_SECTIONS:
+            items = self._lookup(prd, path)
+            if not isinstance(items, list):
+                continue
+            for index, item in enumerate(items):
+                score = self._score(item, terms, referenced_ids)
+                label = f"{'.'.join(path)}[{self._item_label(item, index)}]"
+                if score > 0:
+                    candidates.append((score, path, item, label))
+                else:
+                    dropped.append(label)
+
+        # Stable sort keeps PRD order among equally relevant items
+        for score, path, item, label in sorted(candidates, key=lambda c: -c[0]):
+            cost = self.estimate_tokens(item) + 1
+            if used + cost > self.token_budget:
+                dropped.append(label)
+                continue
+            self._insert(context, path, item, append=True)
+            used += cost
+            included.append(label)
+
+        full_tokens = self.estimate_tokens(prd) + self.estimate_tokens(extra or {})
+        tokens = self.estimate_tokens(context)
+        self.stats["tasks"] += 1
+        self.stats["tokens"] += tokens
+        self.stats["full_tokens"] += full_tokens
+
+        return AssembledContext(
+            context=context,
+            tokens=tokens,
+            full_tokens=full_tokens,
+            included=included,
+            dropped=dropped
+        )
+
+    def estimate_tokens(self, data: Any) -> int:
+        return int(len(self.serialize(data)) / self.chars_per_token)
+
+    @staticmethod
+    def serialize(data: Any) -> str:
+        """Compact JSON used in prompts"""
+        return json.dumps(data, separators=(',', ':'), ensure_ascii=False, default=str)
+
+    @staticmethod
+    def _task_text(task: Task) -> str:
+        parts = [
+            task.description,
+            task.metadata.get("ai_instructions", ""),
+            " ".join(task.metadata.get("acceptance_criteria", [])),
+            " ".join(task.metadata.get("technical_requirements", [])),
+            " ".join(task.metadata.get("files_to_create", [])),
+            " ".join(task.target_files),
+        ]
+        return " ".join(str(part) for part in parts if part)
+
+    @staticmethod
+    def _terms(text: str) -> Set[str]:
+        # Splits camelCase and path components; "UserService" -> {"user", "service"}
+        words = {word.lower() for word in WORD_PATTERN.findall(ID_PATTERN.sub(" ", text))}
+        return {word.rstrip("s") for word in words if len(word) > 2 and word not in STOPWORDS}
+
+    def _score(self, item: Any, terms: Set[str], referenced_ids: Set[str]) -> float:
+        text = self._values_text(item)
+        if referenced_ids and referenced_ids & set(ID_PATTERN.findall(text)):
+            return float("inf")
+        return len(terms & self._terms(text))
+
+    @classmethod
+    def _values_text(cls, item: Any) -> str:
+        """Text of an item's values; keys like "description" say nothing about relevance"""
+        if isinstance(item, dict):
+            return " ".join(cls._values_text(value) for value in item.values())
+        if isinstance(item, list):
+            return " ".join(cls._values_text(value) for value in item)
+        return str(item)
+
+    @staticmethod
+    def _item_label(item: Any, index: int) -> str:
+        if isinstance(item, dict):
+            for key in ("id", "name", "path"):
+                if item.get(key):
+                    return str(item[key])
+        return str(index)
+
+    @staticmethod
+    def _lookup(data: Dict[str, Any], path: Tuple[str, ...]) -> Any:
+        for key in path:
+            if not isinstance(data, dict):
+                return None
+            data = data.get(key)
+        return data
+
+    @staticmethod
+    def _insert(context: Dict[str, Any], path: Tuple[str, ...], value: Any, append: bool = False):
+        node = context
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        if append:
+            node.setdefault(path[-1], []).append(value)
+        else:
+            node[path[-1]] = value
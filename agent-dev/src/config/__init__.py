@@ -3,10 +3,11 @@ Configuration module for Software Development Agent
 """
 
 from .settings import AgentSettings, LLMProvider
-from .prompts import PromptManager
+from .prompts import PromptManager, PromptTemplate
 
 __all__ = [
     "AgentSettings",
     "LLMProvider", 
     "PromptManager",
+    "PromptTemplate",
 ]
\ No newline at end of file
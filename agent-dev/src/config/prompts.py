@@ -1,33 +1,221 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Set, Tuple
+import hashlib
 import json
+import string
+import threading
+import time
 from pathlib import Path
+from ..utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# Independent of the working directory the agent is started from
+PROMPTS_DIR = Path(__file__).resolve().parents[2] / "prompts"
+PROMPT_FILE_SUFFIX = "_prompts.json"
+
+# Values the callers of each template pass; a template may use any of them
+_CODE_REVIEW = {"filename", "code", "language", "task_id"}
+_CODE_GENERATION = {"task_description", "target_files", "dependencies", "context"}
+_EXPLANATION = {"task_id", "code_files", "review_results", "context"}
+PROMPT_SCHEMAS: Dict[str, Dict[str, Set[str]]] = {
+    "builder": {
+        "system_prompt": set(),
+        "code_generation": _CODE_GENERATION,
+        "code_patch": _CODE_GENERATION | {"existing_files"},
+        "code_rewrite": _CODE_GENERATION | {"existing_files"},
+        "code_validation": {"filename", "code", "language"},
+        "test_generation": {"filename", "code", "language"},
+    },
+    "reviewer": {
+        "system_prompt": set(),
+        "code_review": _CODE_REVIEW,
+        "code_review_light": _CODE_REVIEW,
+        "code_review_diff": {"filename", "diff", "language", "task_id"},
+    },
+    "educator": {
+        "implementation_explanation": _EXPLANATION,
+        "batch_explanation": {"tasks"},
+        "learning_material": {"explanation"},
+        "simplified_explanation": {"title", "summary", "key_concepts"},
+    },
+    "analyst": {
+        "prd_update": {"current_prd", "feedback"},
+    },
+    "discovery": {
+        "phase_intro": set(),
+        "phase_goals": set(),
+        "phase_users": set(),
+        "phase_constraints": set(),
+        "phase_non_goals": set(),
+        "phase_risks": set(),
+        "phase_confirmation": {"summary"},
+        "clarification_request": {"aspect", "specific_question"},
+        "vague_response_detected": {"clarification_points"},
+    },
+    "ollama_specific": {
+        "system_prompt": set(),
+        "code_generation": _CODE_GENERATION,
+        "code_review": _CODE_REVIEW,
+        "implementation_explanation": _EXPLANATION,
+    },
+}
+
+
+class PromptTemplate:
+    """A prompt template parsed once, ready to render without re-parsing.
+
+    `placeholders` are the names of the values the template needs.
+    `version` changes whenever the template text does.
+    """
+    
+    def __init__(self, category: str, name: str, text: str):
+        self.category = category
+        self.name = name
+        self.text = text
+        self.version = hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+        
+        try:
+            parsed = list(string.Formatter().parse(text))
+        except ValueError as e:
+            raise ValueError(f"Invalid prompt template '{name}' in category '{category}': {e}") from e
+        
+        # (field, literal) pairs in template order; field is None for literal text
+        self._segments: List[Tuple[Optional[str], str]] = []
+        self._simple = True
+        placeholders = set()
+        for literal, field, format_spec, conversion in parsed:
+            if literal:
+                self._segments.append((None, literal))
+            if field is None:
+                continue
+            if not field.isidentifier() or format_spec or conversion:
+                # Positional, attribute or formatted fields: rendered by str.format
+                self._simple = False
+            self._segments.append((field, ""))
+            placeholders.add(field.split(".")[0].split("[")[0])
+        self.placeholders = frozenset(placeholders)
+    
+    def render(self, **kwargs) -> str:
+        missing = self.placeholders - kwargs.keys()
+        if missing:
+            raise KeyError(
+                f"Prompt '{self.name}' in category '{self.category}' is missing values for: "
+                f"{', '.join(sorted(missing))}"
+            )
+        if not self._simple:
+            return self.text.format(**kwargs)
+        return "".join([literal if field is None else str(kwargs[field]) for field, literal in self._segments])
 
 
 class PromptManager:
-    def __init__(self, prompts_dir: str = "prompts"):
-        self.prompts_dir = Path(prompts_dir)
+    """Registry of every prompt template, loaded and compiled at startup.
+
+    Templates live in `<category>_prompts.json` files under `prompts_dir`
+    (the repository's `prompts/` directory by default). A template whose
+    placeholders are not all among the values its callers pass (see
+    `PROMPT_SCHEMAS`) is rejected when it loads. While the agent runs,
+    the files' mtimes are checked at most every `reload_interval` seconds
+    and edited files are recompiled; a file that no longer loads keeps its
+    last good templates.
+    """
+    
+    def __init__(
+        self,
+        prompts_dir: Optional[str] = None,
+        reload_interval: float = 2.0,
+        schemas: Optional[Dict[str, Dict[str, Set[str]]]] = None
+    ):
+        self.prompts_dir = Path(prompts_dir) if prompts_dir else PROMPTS_DIR
+        self.reload_interval = reload_interval
+        self.schemas = PROMPT_SCHEMAS if schemas is None else schemas
         self._prompts: Dict[str, Dict[str, Any]] = {}
+        self._templates: Dict[str, Dict[str, PromptTemplate]] = {}
+        self._mtimes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._next_check = time.monotonic() + reload_interval
         
+        for prompt_file in sorted(self.prompts_dir.glob(f"*{PROMPT_FILE_SUFFIX}")):
+            self._load(prompt_file.name[:-len(PROMPT_FILE_SUFFIX)])
+    
     def load_prompts(self, category: str) -> Dict[str, Any]:
         """Load prompts for a specific category"""
-        if category in self._prompts:
-            return self._prompts[category]
-            
-        prompt_file = self.prompts_dir / f"{category}_prompts.json"
+        self._reload_changed()
+        if category not in self._prompts:
+            with self._lock:
+                if category not in self._prompts:
+                    self._load(category)
+        return self._prompts[category]
+    
+    def get_template(self, category: str, prompt_name: str) -> PromptTemplate:
+        self.load_prompts(category)
+        templates = self._templates[category]
+        if prompt_name not in templates:
+            raise KeyError(f"Prompt '{prompt_name}' not found in category '{category}'")
+        return templates[prompt_name]
+    
+    def get_prompt(self, category: str, prompt_name: str, **kwargs) -> str:
+        """Get a specific prompt with variable substitution"""
+        template = self.get_template(category, prompt_name)
+        return template.render(**kwargs) if kwargs else template.text
+    
+    def get_prompt_version(self, category: str, *prompt_names: str) -> str:
+        """Short hash of the given templates; changes whenever any of them is edited"""
+        if len(prompt_names) == 1:
+            return self.get_template(category, prompt_names[0]).version
+        versions = "".join(self.get_template(category, prompt_name).version for prompt_name in prompt_names)
+        return hashlib.sha256(versions.encode("utf-8")).hexdigest()[:12]
+    
+    def _load(self, category: str):
+        """Read and compile one category file, replacing its templates only if all of them compile"""
+        prompt_file = self.prompts_dir / f"{category}{PROMPT_FILE_SUFFIX}"
         if not prompt_file.exists():
             raise FileNotFoundError(f"Prompt file not found: {prompt_file}")
-            
+        
+        mtime = prompt_file.stat().st_mtime_ns
         with open(prompt_file, 'r', encoding='utf-8') as f:
             prompts = json.load(f)
-            
+        
+        schema = self.schemas.get(category, {})
+        templates = {}
+        for name, text in prompts.items():
+            if not isinstance(text, str):
+                raise ValueError(f"Prompt '{name}' in {prompt_file} is not a string")
+            template = PromptTemplate(category, name, text)
+            if name not in schema:
+                logger.warning(f"Prompt '{name}' in {prompt_file.name} has no schema; placeholders not checked")
+            elif template.placeholders - schema[name]:
+                unknown = ", ".join(sorted(template.placeholders - schema[name]))
+                raise ValueError(f"Prompt '{name}' in {prompt_file} uses placeholders its callers do not pass: {unknown}")
+            templates[name] = template
+        
         self._prompts[category] = prompts
-        return prompts
+        self._templates[category] = templates
+        self._mtimes[category] = mtime
     
-    def get_prompt(self, category: str, prompt_name: str, **kwargs) -> str:
-        """Get a specific prompt with variable substitution"""
-        prompts = self.load_prompts(category)
-        if prompt_name not in prompts:
-            raise KeyError(f"Prompt '{prompt_name}' not found in category '{category}'")
-            
-        template = prompts[prompt_name]
-        return template.format(**kwargs) if kwargs else template
\ No newline at end of file
+    def _reload_changed(self):
+        now = time.monotonic()
+        if now < self._next_check or not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._next_check = now + self.reload_interval
+            for category, mtime in list(self._mtimes.items()):
+                prompt_file = self.prompts_dir / f"{category}{PROMPT_FILE_SUFFIX}"
+                try:
+                    if prompt_file.stat().st_mtime_ns == mtime:
+                        continue
+                    self._load(category)
+                    logger.info(f"Reloaded prompts: {prompt_file.name}")
+                except (OSError, ValueError) as e:
+                    # Retried once the file changes again
+                    self._mtimes[category] = self._mtime(prompt_file)
+                    logger.warning(f"Keeping previous '{category}' prompts, reload failed: {e}")
+        finally:
+            self._lock.release()
+    
+    @staticmethod
+    def _mtime(prompt_file: Path) -> int:
+        try:
+            return prompt_file.stat().st_mtime_ns
+        except OSError:
+            return -1
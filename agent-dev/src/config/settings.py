@@ -20,22 +20,56 @@ class AgentSettings(BaseSettings):
     model_name: str = "deepseek-coder:6.7b"
     temperature: float = 0.1
     max_tokens: int = 4000
+    builder_context_token_budget: int = 1500  # PRD context per build prompt, in estimated tokens
+    dependency_interface_max_chars: int = 6000  # Interface stubs of dependency outputs per build prompt
+    prompt_reload_seconds: float = 2.0  # How often prompt files are checked for edits while running
+    patch_mode: bool = True  # Edit large existing files with unified diffs
+    patch_min_lines: int = 80
+    patch_fuzz: int = 2  # Context lines a hunk may ignore when its context has drifted
+    llm_request_timeout_seconds: int = 300
+    max_concurrent_llm_calls: int = 3  # Global cap on in-flight LLM requests
     
     # Agent Behavior
     dry_run: bool = True
     max_iterations: int = 100
     task_timeout_seconds: int = 300
+    phase_timeout_seconds: Optional[int] = None  # Upper bound for the whole development phase
     max_retries: int = 3
+    max_parallel_tasks: int = 3
+    validation_batch_window_seconds: float = 1.0  # 0 disables batched validation
+    validation_batch_max_chars: int = 12000
+    validation_batch_item_max_chars: int = 4000  # Larger outputs are validated on their own
+    retry_backoff_seconds: float = 5.0
+    retry_backoff_max_seconds: float = 120.0
+    speculative_execution: bool = True  # Start likely-next work while waiting on the user
+    enable_explanations: bool = True  # Educator explanations, produced in the background
+    explanation_batch_size: int = 4
+    explanation_batch_window_seconds: float = 5.0
     
     # File Management
     output_dir: str = "outputs"
-    backup_dir: str = "backups"
-    max_backups: int = 10
+    backup_dir: str = "backups"  # Inside output_dir
+    max_backups: int = 10  # Versions kept per file; 0 keeps all
+    diff_backend: str = "histogram"  # "histogram", "patience" or "difflib"
+    diff_max_lines: int = 200000  # Larger files get a hash-only change summary instead of a diff
+    file_write_workers: int = 8  # Files of one task are read, diffed and staged concurrently
+    durable_writes: bool = True  # fsync a task's staged files, in one pass, before its writes are committed
+    stream_threshold_mb: int = 4  # Existing files above this are compared and backed up without loading them
+    state_db_path: str = ".agent_state/state.db"
+    enable_result_cache: bool = True  # Reuse reviews/validations of unchanged content
     
     # Safety
     require_confirmation: bool = True
     confidence_threshold: float = 0.7
     max_file_size_mb: int = 10
+    safety_scan_writes: bool = True  # Scan files before writing; private keys are never written
+    enable_code_review: bool = True
+    review_diff_max_change_ratio: float = 0.3  # Above this share of changed lines, review the full file
+    review_diff_context_lines: int = 3
+    review_escalation_model: Optional[str] = None  # Larger model for risky or low-confidence files
+    review_light_max_lines: int = 40  # High-confidence files up to this size get a light review
+    review_skip_config_max_lines: int = 50  # Smaller config files are not reviewed
+    skip_llm_validation_for_trivial: bool = True  # Docs/config that parse need no LLM validation
     
     # Logging
     log_level: str = "INFO"
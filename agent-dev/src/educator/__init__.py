@@ -3,8 +3,10 @@ Educator agent module for explanations
 """
 
 from .agent import EducatorAgent, Explanation
+from .lane import ExplanationLane
 
 __all__ = [
     "EducatorAgent",
     "Explanation",
+    "ExplanationLane",
 ]
\ No newline at end of file
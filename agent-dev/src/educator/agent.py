@@ -1,4 +1,4 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from pydantic import BaseModel, Field
 import json
 from datetime import datetime
@@ -6,6 +6,13 @@ from ..utils.llm import LLMClient
 from ..config.prompts import PromptManager
 from ..builder.agent import CodeFile
 from ..reviewer.agent import ReviewResult
+from ..utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# Task material sent for explanation: (task_id, code files, review results, context)
+ExplanationRequest = Tuple[str, List[CodeFile], List[ReviewResult], Dict[str, Any]]
 
 
 class Explanation(BaseModel):
@@ -20,10 +27,17 @@ class Explanation(BaseModel):
 
 
 class EducatorAgent:
-    def __init__(self, llm_client: LLMClient, prompt_manager: PromptManager):
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        prompt_manager: PromptManager,
+        max_code_chars: int = 6000
+    ):
         self.llm_client = llm_client
         self.prompt_manager = prompt_manager
         self.explanations: Dict[str, Explanation] = {}
+        # Per-file cap on the code sent for explanation
+        self.max_code_chars = max_code_chars
         
     def explain_implementation(
         self,
@@ -38,9 +52,9 @@ class EducatorAgent:
             "educator",
             "implementation_explanation",
             task_id=task_id,
-            code_files=json.dumps([f.dict() for f in code_files], indent=2),
-            review_results=json.dumps([r.dict() for r in review_results], indent=2),
-            context=json.dumps(context, indent=2)
+            code_files=self._compact([self._file_summary(f) for f in code_files]),
+            review_results=self._compact([self._review_summary(r) for r in review_results]),
+            context=self._compact(context)
         )
         
         response = self.llm_client.generate(
@@ -48,9 +62,73 @@ class EducatorAgent:
             response_format={"type": "json_object"}
         )
         
-        explanation_data = json.loads(response)
+        explanation = self._parse_explanation(task_id, json.loads(response))
+        self.explanations[task_id] = explanation
+        return explanation
+    
+    def explain_batch(self, requests: List[ExplanationRequest], background: bool = True) -> Dict[str, Explanation]:
+        """Explain several completed tasks with a single LLM call
+        
+        Tasks the model leaves out of its answer are missing from the
+        result; explanations are best effort.
+        """
+        tasks = [
+            {
+                "task_id": task_id,
+                "context": context,
+                "files": [self._file_summary(f) for f in code_files],
+                "reviews": [self._review_summary(r) for r in review_results]
+            }
+            for task_id, code_files, review_results, context in requests
+        ]
+        
+        batch_prompt = self.prompt_manager.get_prompt(
+            "educator",
+            "batch_explanation",
+            tasks=self._compact(tasks)
+        )
+        
+        response = self.llm_client.generate(
+            prompt=batch_prompt,
+            response_format={"type": "json_object"},
+            background=background
+        )
+        
+        explanations = {}
+        requested = {task_id for task_id, *_ in requests}
+        for explanation_data in json.loads(response).get("explanations", []):
+            task_id = explanation_data.get("task_id") if isinstance(explanation_data, dict) else None
+            if task_id not in requested:
+                continue
+            explanations[task_id] = self._parse_explanation(task_id, explanation_data)
+            self.explanations[task_id] = explanations[task_id]
         
-        explanation = Explanation(
+        missing = requested - explanations.keys()
+        if missing:
+            logger.warning(f"No explanation returned for {', '.join(sorted(missing))}")
+        return explanations
+    
+    @staticmethod
+    def _compact(data: Any) -> str:
+        return json.dumps(data, separators=(',', ':'), default=str)
+    
+    def _file_summary(self, code_file: CodeFile) -> Dict[str, Any]:
+        code = code_file.code
+        if len(code) > self.max_code_chars:
+            code = code[:self.max_code_chars] + "\n... (truncated)"
+        return {"filename": code_file.filename, "language": code_file.language, "code": code}
+    
+    @staticmethod
+    def _review_summary(review: ReviewResult) -> Dict[str, Any]:
+        return {
+            "filename": review.filename,
+            "score": review.overall_score,
+            "issues": [f"{issue.severity} {issue.type}: {issue.description}" for issue in review.issues]
+        }
+    
+    @staticmethod
+    def _parse_explanation(task_id: str, explanation_data: Dict[str, Any]) -> Explanation:
+        return Explanation(
             title=explanation_data.get("title", f"Explanation for {task_id}"),
             summary=explanation_data.get("summary", ""),
             key_concepts=explanation_data.get("key_concepts", []),
@@ -60,9 +138,6 @@ class EducatorAgent:
             best_practices_applied=explanation_data.get("best_practices_applied", []),
             learning_points=explanation_data.get("learning_points", [])
         )
-        
-        self.explanations[task_id] = explanation
-        return explanation
     
     def generate_learning_material(self, explanation: Explanation) -> Dict[str, Any]:
         """Generate learning materials from explanation"""
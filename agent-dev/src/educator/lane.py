@@ -0,0 +1,100 @@
+"""
+Explanation lane - produces educator explanations in the background
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .agent import EducatorAgent, ExplanationRequest
+from ..state.store import StateStore
+from ..utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+STATE_NAMESPACE = "explanations"
+
+
+class ExplanationLane:
+    """Low-priority queue of completed tasks waiting to be explained.
+
+    `submit` never blocks. A daemon thread collects up to `batch_size`
+    requests (waiting at most `window_seconds` for a batch to fill), asks
+    the educator for all of them in one background LLM call and writes the
+    results to the state store. The thread does not keep the process
+    alive: whatever is still queued when the run ends is dropped.
+    """
+
+    def __init__(
+        self,
+        educator: EducatorAgent,
+        state_store: StateStore,
+        batch_size: int = 4,
+        window_seconds: float = 5.0
+    ):
+        self.educator = educator
+        self.state_store = state_store
+        self.batch_size = batch_size
+        self.window_seconds = window_seconds
+        self._queue: "queue.Queue[ExplanationRequest]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"submitted": 0, "explained": 0, "failed": 0}
+
+    def submit(
+        self,
+        task_id: str,
+        code_files: List[Any],
+        review_results: List[Any],
+        context: Dict[str, Any]
+    ):
+        """Queue a completed task for explanation"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="explanations", daemon=True)
+                self._thread.start()
+            self.stats["submitted"] += 1
+            self._idle.clear()
+        self._queue.put((task_id, code_files, review_results, context))
+
+    @property
+    def pending(self) -> int:
+        return self.stats["submitted"] - self.stats["explained"] - self.stats["failed"]
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued explanations; returns False if some are still pending"""
+        return self._idle.wait(timeout)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            window_end = time.monotonic() + self.window_seconds
+            while len(batch) < self.batch_size:
+                remaining = window_end - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._explain(batch)
+
+    def _explain(self, batch: List[ExplanationRequest]):
+        explanations = {}
+        try:
+            explanations = self.educator.explain_batch(batch)
+            for task_id, explanation in explanations.items():
+                self.state_store.put(STATE_NAMESPACE, task_id, explanation.dict())
+        except Exception as e:
+            logger.warning(f"Explanation batch failed: {e}")
+
+        with self._lock:
+            self.stats["explained"] += len(explanations)
+            self.stats["failed"] += len(batch) - len(explanations)
+            if self.pending == 0:
+                self._idle.set()
@@ -4,9 +4,20 @@ File management module
 
 from .handler import FileManager
 from .diff_utils import generate_diff, apply_diff
+from .symbol_index import SymbolIndex
+from .diff_engine import DiffEngine, register_backend
+from .backup_store import BackupStore
+from .history import FileHistory
+from .merge import merge3
 
 __all__ = [
     "FileManager",
     "generate_diff",
     "apply_diff",
+    "SymbolIndex",
+    "DiffEngine",
+    "register_backend",
+    "BackupStore",
+    "FileHistory",
+    "merge3",
 ]
\ No newline at end of file
@@ -0,0 +1,225 @@
+"""
+Backup Store - content-addressed, compressed backups of overwritten files
+"""
+
+import hashlib
+import json
+import lzma
+import os
+import threading
+import time
+import uuid
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .streaming import file_digest, iter_chunks
+from ..utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# Streaming compressor factories
+COMPRESSORS = {
+    "zlib": lambda: zlib.compressobj(6),
+    "lzma": lzma.LZMACompressor,
+}
+LZMA_MAGIC = b"\xfd7zXZ\x00"
+
+
+class BackupStore:
+    """Previous versions of output files, stored once per distinct content.
+
+    Each version is a blob under `objects/`, named by the sha256 of its
+    content and compressed with zlib or lzma; identical versions - a file
+    reverted, or the same content backed up by several tasks - share one
+    blob. A manifest per task (`manifests/<task_id>.json`) records which
+    version of each file the task overwrote, i.e. the state to restore on
+    rollback. Only the newest `max_backups` versions of every file are
+    kept (0 keeps all); older ones are evicted, and blobs no manifest
+    refers to any more are deleted.
+    """
+
+    def __init__(self, root: str, max_backups: int = 10, compression: str = "zlib"):
+        if compression not in COMPRESSORS:
+            raise ValueError(f"Unknown backup compression: {compression} (available: {', '.join(COMPRESSORS)})")
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.manifests_dir = self.root / "manifests"
+        self.max_backups = max_backups
+        self.compression = compression
+        self._lock = threading.Lock()
+        self._manifests: Dict[str, Dict] = {}
+        self._versions: Dict[str, List[Tuple[float, str, str]]] = {}  # filename -> [(created, task_id, digest)]
+        self._refs: Dict[str, int] = {}  # digest -> manifest entries using it
+
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    def add(self, filename: str, content: str, task_id: str) -> str:
+        """Back up the version of `filename` that `task_id` is about to overwrite
+
+        Only the first version per task and file is kept: that is the state
+        before the task. Returns the path of the blob holding it.
+        """
+        data = content.encode("utf-8")
+        return self._add(filename, task_id, hashlib.sha256(data).hexdigest(), len(data), lambda: [data])
+
+    def add_file(self, filename: str, path: Path, task_id: str) -> str:
+        """Like `add`, but streams the content from disk; for files too large to load"""
+        path = Path(path)
+        digest = file_digest(path, hashlib.sha256())
+        return self._add(filename, task_id, digest, path.stat().st_size, lambda: iter_chunks(path))
+
+    def _add(
+        self,
+        filename: str,
+        task_id: str,
+        digest: str,
+        size: int,
+        chunks: Callable[[], Iterable[bytes]]
+    ) -> str:
+        with self._lock:
+            existing = self._manifests.get(task_id, {}).get("files", {}).get(filename)
+            if existing is not None:
+                return str(self._object_path(existing["hash"]))
+
+        # Compress outside the lock; blobs are immutable, so concurrent writers cannot conflict
+        self._write_object(digest, chunks)
+
+        with self._lock:
+            manifest = self._manifests.setdefault(task_id, {"task_id": task_id, "files": {}})
+            existing = manifest["files"].get(filename)
+            if existing is not None:
+                # A concurrent backup of the same file by this task won; drop the blob if nothing uses it
+                if digest not in self._refs:
+                    self._object_path(digest).unlink(missing_ok=True)
+                return str(self._object_path(existing["hash"]))
+
+            # Garbage collection may have removed the blob since it was written
+            self._write_object(digest, chunks)
+            created = time.time()
+            manifest["files"][filename] = {"hash": digest, "size": size, "created": created}
+            self._versions.setdefault(filename, []).append((created, task_id, digest))
+            self._refs[digest] = self._refs.get(digest, 0) + 1
+
+            touched = {task_id} | self._evict(filename)
+            for touched_id in touched:
+                self._save_manifest(touched_id)
+            self._collect_garbage()
+        return str(self._object_path(digest))
+
+    def get(self, task_id: str, filename: str) -> Optional[str]:
+        """Content of `filename` as it was before `task_id` wrote it"""
+        entry = self._manifests.get(task_id, {}).get("files", {}).get(filename)
+        if entry is None:
+            return None
+        return self.read(entry["hash"])
+
+    def files(self, task_id: str) -> Dict[str, str]:
+        """Backed-up files of a task, mapped to their content hashes"""
+        entries = self._manifests.get(task_id, {}).get("files", {})
+        return {filename: entry["hash"] for filename, entry in entries.items()}
+
+    def count(self, filename: str) -> int:
+        return len(self._versions.get(filename, []))
+
+    def read(self, digest: str) -> Optional[str]:
+        try:
+            data = self._object_path(digest).read_bytes()
+        except OSError:
+            return None
+        data = lzma.decompress(data) if data.startswith(LZMA_MAGIC) else zlib.decompress(data)
+        return data.decode("utf-8")
+
+    def disk_usage(self) -> Dict[str, float]:
+        """Stored vs. logical size of all backups"""
+        with self._lock:
+            stored = 0
+            for digest in self._refs:
+                try:
+                    stored += self._object_path(digest).stat().st_size
+                except OSError:
+                    pass
+            logical = sum(
+                entry["size"]
+                for manifest in self._manifests.values()
+                for entry in manifest["files"].values()
+            )
+            versions = sum(len(manifest["files"]) for manifest in self._manifests.values())
+            return {
+                "versions": versions,
+                "objects": len(self._refs),
+                "manifests": len(self._manifests),
+                "logical_bytes": logical,
+                "stored_bytes": stored,
+                "saved_ratio": 1 - stored / logical if logical else 0.0,
+            }
+
+    def _evict(self, filename: str) -> set:
+        """Drop the oldest versions of a file beyond `max_backups`; returns the tasks touched"""
+        versions = self._versions[filename]
+        touched = set()
+        while self.max_backups > 0 and len(versions) > self.max_backups:
+            _, task_id, digest = versions.pop(0)
+            self._manifests[task_id]["files"].pop(filename, None)
+            self._refs[digest] -= 1
+            touched.add(task_id)
+        return touched
+
+    def _collect_garbage(self):
+        for digest in [digest for digest, refs in self._refs.items() if refs <= 0]:
+            del self._refs[digest]
+            try:
+                self._object_path(digest).unlink()
+            except OSError:
+                pass
+
+    def _write_object(self, digest: str, chunks: Callable[[], Iterable[bytes]]):
+        path = self._object_path(digest)
+        if path.exists():
+            return
+        path.parent.mkdir(exist_ok=True)
+        compressor = COMPRESSORS[self.compression]()
+        temp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        with open(temp, 'wb') as f:
+            for chunk in chunks():
+                f.write(compressor.compress(chunk))
+            f.write(compressor.flush())
+        os.replace(temp, path)
+
+    def _save_manifest(self, task_id: str):
+        path = self.manifests_dir / f"{task_id}.json"
+        manifest = self._manifests[task_id]
+        if not manifest["files"]:
+            self._manifests.pop(task_id)
+            path.unlink(missing_ok=True)
+            return
+        self._write_atomic(path, json.dumps(manifest, indent=2).encode("utf-8"))
+
+    def _load(self):
+        for path in self.manifests_dir.glob("*.json"):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable backup manifest {path.name}: {e}")
+                continue
+            task_id = manifest.get("task_id", path.stem)
+            self._manifests[task_id] = manifest
+            for filename, entry in manifest.get("files", {}).items():
+                self._versions.setdefault(filename, []).append((entry["created"], task_id, entry["hash"]))
+                self._refs[entry["hash"]] = self._refs.get(entry["hash"], 0) + 1
+        for versions in self._versions.values():
+            versions.sort()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        temp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        with open(temp, 'wb') as f:
+            f.write(data)
+        os.replace(temp, path)
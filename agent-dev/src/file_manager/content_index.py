@@ -0,0 +1,94 @@
+"""
+Content Index - detects unchanged output files without reading them
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .streaming import file_digest
+from ..utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class ContentIndex:
+    """Size, mtime and BLAKE2 digest of every file written to the output tree.
+
+    While a file's size and mtime still match what was recorded when it
+    was written, its recorded digest is trusted and the file is not read.
+    Digests are taken over the content as given to `write_files`, so they
+    compare equal to `digest(new_content)` whatever newline translation
+    the platform applies on disk.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._entries: Dict[str, Tuple[int, int, str]] = {}  # filename -> (size, mtime_ns, digest)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+
+    @staticmethod
+    def digest(content: str) -> str:
+        return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def file_digest(filepath: Path) -> str:
+        """`digest` of a file's content, hashed from disk in chunks"""
+        return file_digest(filepath, hashlib.blake2b(digest_size=16))
+
+    def lookup(self, filename: str, filepath: Path) -> Optional[str]:
+        """Recorded digest of a file, if the file has not changed since"""
+        entry = self._entries.get(filename)
+        if entry is None:
+            return None
+        try:
+            stat = filepath.stat()
+        except OSError:
+            return None
+        if (stat.st_size, stat.st_mtime_ns) != entry[:2]:
+            return None
+        return entry[2]
+
+    def record(self, filename: str, filepath: Path, digest: str):
+        try:
+            stat = filepath.stat()
+        except OSError:
+            return
+        with self._lock:
+            self._entries[filename] = (stat.st_size, stat.st_mtime_ns, digest)
+            self._dirty = True
+
+    def forget(self, filename: str):
+        with self._lock:
+            if self._entries.pop(filename, None) is not None:
+                self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            temp = self.path.with_name(self.path.name + ".tmp")
+            try:
+                with open(temp, 'w', encoding='utf-8') as f:
+                    json.dump(self._entries, f)
+                os.replace(temp, self.path)
+                self._dirty = False
+            except OSError as e:
+                logger.warning(f"Failed to save content index: {e}")
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._entries = {filename: tuple(entry) for filename, entry in json.load(f).items()}
+        except (OSError, ValueError, TypeError) as e:
+            # Only a cache: every file is simply hashed again
+            logger.warning(f"Ignoring unreadable content index: {e}")
+            self._entries = {}
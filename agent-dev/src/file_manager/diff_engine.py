@@ -0,0 +1,354 @@
+"""
+Diff engine - pluggable line diff backends for large files
+"""
+
+import difflib
+import hashlib
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+Opcode = Tuple[str, int, int, int, int]  # Same shape as SequenceMatcher.get_opcodes()
+Block = Tuple[int, int, int]  # (i, j, size) like SequenceMatcher.get_matching_blocks()
+
+NO_NEWLINE_MARKER = "\\ No newline at end of file\n"
+
+# Regions this small are handed to difflib when a backend finds no anchor
+FALLBACK_MAX_CELLS = 1_000_000
+
+
+class DiffBackend:
+    """Finds matching lines inside a region of two interned line sequences.
+
+    `split` returns non-crossing matching blocks inside
+    a[a0:a1] / b[b0:b1], in order; the engine recurses into the gaps
+    between them. Returning no blocks means the backend has no anchor for
+    the region.
+    """
+
+    name = "base"
+
+    def split(self, a: Sequence[int], b: Sequence[int], a0: int, a1: int, b0: int, b1: int) -> List[Block]:
+        raise NotImplementedError
+
+
+class PatienceBackend(DiffBackend):
+    """Patience diff: anchor on lines unique to both sides, kept in order by an LIS"""
+
+    name = "patience"
+
+    def split(self, a, b, a0, a1, b0, b1):
+        counts_a: Dict[int, int] = {}
+        for i in range(a0, a1):
+            counts_a[a[i]] = counts_a.get(a[i], 0) + 1
+        position_b: Dict[int, int] = {}
+        counts_b: Dict[int, int] = {}
+        for j in range(b0, b1):
+            if counts_a.get(b[j]) == 1:
+                counts_b[b[j]] = counts_b.get(b[j], 0) + 1
+                position_b[b[j]] = j
+
+        pairs = [
+            (i, position_b[a[i]]) for i in range(a0, a1)
+            if counts_a[a[i]] == 1 and counts_b.get(a[i]) == 1
+        ]
+        if not pairs:
+            return []
+
+        # Longest increasing subsequence of the B positions (patience sorting)
+        tails: List[int] = []
+        tail_index: List[int] = []
+        previous: List[int] = [-1] * len(pairs)
+        for index, (_, j) in enumerate(pairs):
+            pile = bisect_left(tails, j)
+            if pile == len(tails):
+                tails.append(j)
+                tail_index.append(index)
+            else:
+                tails[pile] = j
+                tail_index[pile] = index
+            previous[index] = tail_index[pile - 1] if pile else -1
+
+        anchors = []
+        index = tail_index[-1]
+        while index != -1:
+            i, j = pairs[index]
+            anchors.append((i, j, 1))
+            index = previous[index]
+        return anchors[::-1]
+
+
+class HistogramBackend(DiffBackend):
+    """git's histogram diff: anchor on the longest run around the rarest shared line
+
+    Picking one anchor per region makes the recursion quadratic in the
+    number of edits, so large regions first take every line unique to both
+    sides as an anchor at once (the patience step) and only fall back to
+    the single rarest run where there is none.
+    """
+
+    name = "histogram"
+
+    def __init__(self, max_chain: int = 64, bulk_min_lines: int = 2000):
+        # Lines more frequent than this are never used as anchors
+        self.max_chain = max_chain
+        self.bulk_min_lines = bulk_min_lines
+        self._patience = PatienceBackend()
+
+    def split(self, a, b, a0, a1, b0, b1):
+        if max(a1 - a0, b1 - b0) >= self.bulk_min_lines:
+            anchors = self._patience.split(a, b, a0, a1, b0, b1)
+            if anchors:
+                return anchors
+
+        occurrences: Dict[int, List[int]] = {}
+        for i in range(a0, a1):
+            occurrences.setdefault(a[i], []).append(i)
+
+        best: Optional[Block] = None
+        best_count = self.max_chain + 1
+        best_size = 0
+        j = b0
+        while j < b1:
+            positions = occurrences.get(b[j])
+            if positions is None or len(positions) > best_count:
+                j += 1
+                continue
+            next_j = j + 1
+            for i in positions:
+                si, sj = i, j
+                while si > a0 and sj > b0 and a[si - 1] == b[sj - 1]:
+                    si -= 1
+                    sj -= 1
+                ei, ej = i + 1, j + 1
+                while ei < a1 and ej < b1 and a[ei] == b[ej]:
+                    ei += 1
+                    ej += 1
+                size = ei - si
+                # Rated by the anchor line's frequency; git rates the rarest line in the run,
+                # which costs a second pass over every run
+                count = len(positions)
+                if count < best_count or (count == best_count and size > best_size):
+                    best, best_count, best_size = (si, sj, size), count, size
+                next_j = max(next_j, ej)
+            j = next_j
+
+        return [best] if best else []
+
+
+class DifflibBackend(DiffBackend):
+    """The standard library matcher, for comparison and small inputs"""
+
+    name = "difflib"
+
+    def split(self, a, b, a0, a1, b0, b1):
+        matcher = difflib.SequenceMatcher(None, a[a0:a1], b[b0:b1], autojunk=False)
+        return [(a0 + i, b0 + j, size) for i, j, size in matcher.get_matching_blocks() if size]
+
+
+DIFF_BACKENDS: Dict[str, Callable[[], DiffBackend]] = {
+    "histogram": HistogramBackend,
+    "patience": PatienceBackend,
+    "difflib": DifflibBackend,
+}
+
+
+def register_backend(name: str, factory: Callable[[], DiffBackend]):
+    """Make a backend available to `DiffEngine(backend=name)`"""
+    DIFF_BACKENDS[name] = factory
+
+
+class DiffEngine:
+    """Line diffs that stay fast on large generated files.
+
+    Lines are interned to integers first (the line-hash prefilter), so
+    backends compare ints instead of strings, and the common prefix and
+    suffix of every region are stripped before a backend looks at it.
+    Inputs with more than `max_lines` lines on either side are not diffed
+    at all: `unified_diff` returns a hash-only summary instead.
+    """
+
+    def __init__(self, backend: str = "histogram", max_lines: int = 200_000):
+        if backend not in DIFF_BACKENDS:
+            raise ValueError(f"Unknown diff backend: {backend} (available: {', '.join(DIFF_BACKENDS)})")
+        self.backend = DIFF_BACKENDS[backend]()
+        self.max_lines = max_lines
+
+    def matching_blocks(self, a_lines: Sequence[str], b_lines: Sequence[str]) -> List[Block]:
+        """Matching blocks in the format of SequenceMatcher.get_matching_blocks()"""
+        interned: Dict[str, int] = {}
+        a = [interned.setdefault(line, len(interned)) for line in a_lines]
+        b = [interned.setdefault(line, len(interned)) for line in b_lines]
+
+        blocks: List[Block] = []
+        regions = [(0, len(a), 0, len(b))]
+        while regions:
+            a0, a1, b0, b1 = regions.pop()
+            # Common prefix and suffix need no search
+            start = 0
+            while a0 + start < a1 and b0 + start < b1 and a[a0 + start] == b[b0 + start]:
+                start += 1
+            if start:
+                blocks.append((a0, b0, start))
+                a0, b0 = a0 + start, b0 + start
+            end = 0
+            while a1 - end > a0 and b1 - end > b0 and a[a1 - end - 1] == b[b1 - end - 1]:
+                end += 1
+            if end:
+                blocks.append((a1 - end, b1 - end, end))
+                a1, b1 = a1 - end, b1 - end
+            if a0 == a1 or b0 == b1:
+                continue
+
+            anchors = self.backend.split(a, b, a0, a1, b0, b1)
+            if not anchors and (a1 - a0) * (b1 - b0) <= FALLBACK_MAX_CELLS and not isinstance(self.backend, DifflibBackend):
+                anchors = DifflibBackend().split(a, b, a0, a1, b0, b1)
+
+            # Recurse into the gaps around the anchors
+            prev_a, prev_b = a0, b0
+            for i, j, size in anchors:
+                blocks.append((i, j, size))
+                if i > prev_a and j > prev_b:
+                    regions.append((prev_a, i, prev_b, j))
+                prev_a, prev_b = i + size, j + size
+            if anchors and a1 > prev_a and b1 > prev_b:
+                regions.append((prev_a, a1, prev_b, b1))
+
+        return self._merge(blocks, len(a), len(b))
+
+    def opcodes(self, a_lines: Sequence[str], b_lines: Sequence[str]) -> List[Opcode]:
+        """Edit operations in the format of SequenceMatcher.get_opcodes()"""
+        opcodes: List[Opcode] = []
+        i = j = 0
+        for ai, bj, size in self.matching_blocks(a_lines, b_lines):
+            tag = ""
+            if i < ai and j < bj:
+                tag = "replace"
+            elif i < ai:
+                tag = "delete"
+            elif j < bj:
+                tag = "insert"
+            if tag:
+                opcodes.append((tag, i, ai, j, bj))
+            i, j = ai + size, bj + size
+            if size:
+                opcodes.append(("equal", ai, i, bj, j))
+        return opcodes
+
+    def too_large(self, a_lines: Sequence[str], b_lines: Sequence[str]) -> bool:
+        return max(len(a_lines), len(b_lines)) > self.max_lines
+
+    def unified_diff(
+        self,
+        old_content: str,
+        new_content: str,
+        fromfile: str = "",
+        tofile: str = "",
+        context_lines: int = 3
+    ) -> str:
+        """Unified diff text, or a hash-only summary when the input is too large"""
+        a = old_content.splitlines(keepends=True)
+        b = new_content.splitlines(keepends=True)
+        if self.too_large(a, b):
+            return hash_summary(old_content, new_content, fromfile, tofile)
+        return "".join(format_unified(a, b, self.opcodes(a, b), fromfile, tofile, context_lines))
+
+    @staticmethod
+    def _merge(blocks: List[Block], len_a: int, len_b: int) -> List[Block]:
+        merged: List[Block] = []
+        for i, j, size in sorted(blocks):
+            if merged and merged[-1][0] + merged[-1][2] == i and merged[-1][1] + merged[-1][2] == j:
+                last_i, last_j, last_size = merged[-1]
+                merged[-1] = (last_i, last_j, last_size + size)
+            else:
+                merged.append((i, j, size))
+        merged.append((len_a, len_b, 0))
+        return merged
+
+
+def group_opcodes(opcodes: List[Opcode], context_lines: int = 3) -> Iterator[List[Opcode]]:
+    """Group opcodes into hunks, like SequenceMatcher.get_grouped_opcodes()"""
+    codes = list(opcodes) or [("equal", 0, 1, 0, 1)]
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - context_lines), i2, max(j1, j2 - context_lines), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + context_lines), j1, min(j2, j1 + context_lines)
+
+    span = context_lines * 2
+    group: List[Opcode] = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == "equal" and i2 - i1 > span:
+            group.append((tag, i1, min(i2, i1 + context_lines), j1, min(j2, j1 + context_lines)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - context_lines), max(j1, j2 - context_lines)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def format_unified(
+    a: Sequence[str],
+    b: Sequence[str],
+    opcodes: List[Opcode],
+    fromfile: str,
+    tofile: str,
+    context_lines: int = 3
+) -> Iterator[str]:
+    """Render opcodes as a unified diff, like difflib.unified_diff
+
+    Unlike difflib, a last line without a newline is followed by a
+    "\\ No newline at end of file" marker, as in git and GNU diff, so the
+    diff can be applied back exactly.
+    """
+    started = False
+    for group in group_opcodes(opcodes, context_lines):
+        if not started:
+            started = True
+            yield f"--- {fromfile}\n"
+            yield f"+++ {tofile}\n"
+        first, last = group[0], group[-1]
+        yield f"@@ -{_format_range(first[1], last[2])} +{_format_range(first[3], last[4])} @@\n"
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                for line in a[i1:i2]:
+                    yield from _diff_line(" ", line)
+                continue
+            for line in a[i1:i2]:
+                yield from _diff_line("-", line)
+            for line in b[j1:j2]:
+                yield from _diff_line("+", line)
+
+
+def hash_summary(old_content: str, new_content: str, fromfile: str = "", tofile: str = "") -> str:
+    """Describe a change by hashes and sizes only, for inputs too large to diff"""
+    def describe(content: str) -> str:
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+        return f"sha256:{digest}, {content.count(chr(10))} lines, {len(content)} chars"
+
+    return (
+        f"--- {fromfile}\n+++ {tofile}\n"
+        f"# changed (too large to diff)\n"
+        f"# old: {describe(old_content)}\n"
+        f"# new: {describe(new_content)}\n"
+    )
+
+
+def _format_range(start: int, stop: int) -> str:
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def _diff_line(prefix: str, line: str) -> Iterator[str]:
+    if line.endswith("\n"):
+        yield prefix + line
+    else:
+        yield prefix + line + "\n"
+        yield NO_NEWLINE_MARKER
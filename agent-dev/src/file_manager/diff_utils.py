@@ -2,11 +2,30 @@
 Diff utilities for file comparison
 """
 
-import difflib
-from typing import Optional
+import re
+from typing import List, Optional, Tuple
 
+from .patch import apply_patch
+from .diff_engine import DiffEngine, group_opcodes
 
-def generate_diff(old_content: str, new_content: str, filename: str) -> str:
+
+# Lines that open a function/class/block scope in common languages
+SIGNATURE_PATTERN = re.compile(
+    r"^\s*(?:(?:(?:async\s+)?def|class|function|func|fn|interface|struct|impl|enum)\b|"
+    r"export\s+(?:default\s+)?(?:async\s+)?(?:function|class)\b|"
+    r"(?:public|private|protected|static|internal)\s+[\w<>\[\], ]*\()"
+)
+
+# Used when callers do not pass their own engine
+DEFAULT_ENGINE = DiffEngine()
+
+
+def generate_diff(
+    old_content: str,
+    new_content: str,
+    filename: str,
+    engine: Optional[DiffEngine] = None
+) -> str:
     """
     Generate unified diff between old and new content
     
@@ -14,83 +33,122 @@ def generate_diff(old_content: str, new_content: str, filename: str) -> str:
         old_content: Original file content
         new_content: New file content
         filename: Name of the file (for diff header)
+        engine: Diff engine to use (defaults to DEFAULT_ENGINE)
     
     Returns:
-        Unified diff string
+        Unified diff string, or a hash-only summary for very large files
     """
     if old_content == new_content:
         return f"No changes in {filename}"
     
-    old_lines = old_content.splitlines(keepends=True)
-    new_lines = new_content.splitlines(keepends=True)
-    
-    diff = difflib.unified_diff(
-        old_lines,
-        new_lines,
+    return (engine or DEFAULT_ENGINE).unified_diff(
+        old_content,
+        new_content,
         fromfile=f"{filename} (old)",
-        tofile=f"{filename} (new)",
-        lineterm="\n"
+        tofile=f"{filename} (new)"
     )
-    
-    return "".join(diff)
 
 
 def apply_diff(original: str, diff_text: str) -> Optional[str]:
     """
-    Apply diff to original content (simplified version)
+    Apply a unified diff to original content
     
-    Note: This is a simplified implementation. For production use,
-    consider using a proper patch library like `unidiff` or `patch`.
+    Hunks are located using their line numbers and context, tolerating
+    shifted positions and small context differences (see `patch.apply_patch`).
     
     Args:
         original: Original content
         diff_text: Diff text to apply
     
     Returns:
-        Patched content or None if failed
+        Patched content or None if any hunk failed to apply
     """
-    try:
-        # Simple implementation - just parse and apply
-        lines = original.splitlines(keepends=True)
-        diff_lines = diff_text.splitlines()
+    result = apply_patch(original, diff_text)
+    return result.content if result.success else None
+
+
+def extract_change_hunks(
+    old_content: str,
+    new_content: str,
+    context_lines: int = 3,
+    engine: Optional[DiffEngine] = None
+) -> Tuple[str, float]:
+    """
+    Extract the changed hunks between two versions for review
+    
+    Each hunk carries a few lines of context and the signatures of the
+    functions/classes enclosing it, so a reviewer can judge the change
+    without the whole file.
+    
+    Args:
+        old_content: Previous file content
+        new_content: New file content
+        context_lines: Unchanged lines to keep around each change
+        engine: Diff engine to use (defaults to DEFAULT_ENGINE)
+    
+    Returns:
+        Tuple of (hunks text, change ratio). The ratio is the share of lines
+        added or removed relative to the larger version (0.0 - 1.0).
+    """
+    engine = engine or DEFAULT_ENGINE
+    old_lines = old_content.splitlines()
+    new_lines = new_content.splitlines()
+    if engine.too_large(old_lines, new_lines):
+        # Treat as a full rewrite: callers fall back to whole-file handling
+        return "", 1.0
+    opcodes = engine.opcodes(old_lines, new_lines)
+    
+    changed = 0
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag != "equal":
+            changed += max(i2 - i1, j2 - j1)
+    ratio = changed / max(len(old_lines), len(new_lines), 1)
+    
+    hunks = []
+    for group in group_opcodes(opcodes, context_lines):
+        i1, j1 = group[0][1], group[0][3]
+        i2, j2 = group[-1][2], group[-1][4]
         
-        result = []
-        i = 0
+        first_change = next(b1 for tag, _, _, b1, _ in group if tag != "equal")
         
-        while i < len(diff_lines):
-            line = diff_lines[i]
-            
-            if line.startswith('---') or line.startswith('+++'):
-                i += 1
-                continue
-            
-            if line.startswith('@@'):
-                # Parse chunk header
-                i += 1
+        lines = [f"@@ -{i1 + 1},{i2 - i1} +{j1 + 1},{j2 - j1} @@"]
+        for signature in enclosing_signatures(new_lines, first_change):
+            lines.append(f"   {signature}")
+        for tag, a1, a2, b1, b2 in group:
+            if tag == "equal":
+                lines.extend(f" {line}" for line in old_lines[a1:a2])
                 continue
-            
-            if line.startswith(' '):
-                # Context line
-                if result or line[1:] != lines[len(result)]:
-                    result.append(line[1:])
-                else:
-                    result.append(lines[len(result)])
-                i += 1
-            elif line.startswith('-'):
-                # Remove line
-                i += 1
-            elif line.startswith('+'):
-                # Add line
-                result.append(line[1:])
-                i += 1
-            else:
-                i += 1
-        
-        return "".join(result) if lines else "\n".join(result)
+            lines.extend(f"-{line}" for line in old_lines[a1:a2])
+            lines.extend(f"+{line}" for line in new_lines[b1:b2])
+        hunks.append("\n".join(lines))
     
-    except Exception:
-        # If anything goes wrong, return None
-        return None
+    return "\n".join(hunks), ratio
+
+
+def enclosing_signatures(lines: List[str], index: int) -> List[str]:
+    """
+    Find the signatures of the scopes enclosing a line, outermost first
+    
+    Walks upwards and keeps every signature line that is indented less than
+    everything seen so far, which follows nesting in indentation-based and
+    conventionally formatted brace languages alike.
+    """
+    signatures = []
+    min_indent = None
+    
+    for line in reversed(lines[:index]):
+        if not line.strip():
+            continue
+        indent = len(line) - len(line.lstrip())
+        if min_indent is not None and indent >= min_indent:
+            continue
+        if SIGNATURE_PATTERN.match(line):
+            signatures.append(line.rstrip())
+            min_indent = indent
+            if indent == 0:
+                break
+    
+    return list(reversed(signatures))
 
 
 def get_change_summary(diff_text: str) -> dict:
@@ -1,211 +1,788 @@
 import os
 import shutil
 import json
-from typing import List, Dict, Any, Optional
+import threading
+import hashlib
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterable, Optional
 from pathlib import Path
 import difflib
 from datetime import datetime
 from ..utils.logger import get_logger
+from ..utils.deadline import Deadline
 from .diff_utils import generate_diff, apply_diff
+from .diff_engine import DiffEngine
+from .symbol_index import SymbolIndex
+from .backup_store import BackupStore
+from .history import FileHistory
+from .content_index import ContentIndex
+from .merge import merge3
+from . import streaming
+from ..utils.safety import SafetyChecker, SafetyScanner
 
 
 logger = get_logger(__name__)
 
+# Staged content waiting for its task's commit
+TEMP_SUFFIX = ".agent-tmp"
+
 
 class FileManager:
-    def __init__(self, output_dir: str = "outputs", dry_run: bool = False):
+    def __init__(
+        self,
+        output_dir: str = "outputs",
+        dry_run: bool = False,
+        diff_engine: Optional[DiffEngine] = None,
+        write_workers: int = 8,
+        durable: bool = True,
+        backup_dir: str = "backups",
+        max_backups: int = 10,
+        max_file_size_mb: int = 10,
+        stream_threshold_mb: int = 4,
+        safety_scanner: Optional[SafetyScanner] = None
+    ):
         self.output_dir = Path(output_dir)
         self.dry_run = dry_run
-        self.backup_dir = self.output_dir / "backups"
-        self.history_file = self.output_dir / "file_history.json"
+        self.diff_engine = diff_engine
+        self.write_workers = write_workers
+        # fsync a task's staged files (in one pass) and directories before its writes count as committed
+        self.durable = durable
+        self.backup_dir = self.output_dir / backup_dir
+        self.max_file_size_mb = max_file_size_mb
+        self.max_file_bytes = max_file_size_mb * 1024 * 1024
+        # Existing files above this are never loaded into memory
+        self.stream_threshold_bytes = stream_threshold_mb * 1024 * 1024
+        # Scans content before it is staged; critical findings are not written
+        self.safety_scanner = safety_scanner
+        self.commit_dir = self.output_dir / ".commits"
+        self.history_file = self.output_dir / "file_history.jsonl"
+        # Tasks may write concurrently; writes to the same path must not interleave
+        self._path_locks: Dict[str, threading.Lock] = {}
+        self._path_locks_guard = threading.Lock()
+        # Content of each file as a running task first read it: the base of a three-way merge
+        self._bases: Dict[str, Dict[str, Optional[str]]] = {}
+        # Digest instead of content for files above the stream threshold
+        self._base_digests: Dict[str, Dict[str, str]] = {}
+        self._bases_lock = threading.Lock()
         
         self._setup_directories()
-        self._load_history()
+        self.backups = BackupStore(str(self.backup_dir), max_backups=max_backups)
+        if not self.dry_run:
+            self._recover_commits()
+        self.history = FileHistory(
+            str(self.history_file),
+            diff_engine=diff_engine,
+            max_content_chars=self.stream_threshold_bytes
+        )
+        # Lets rewrites of identical content skip all file I/O
+        self.content_index = ContentIndex(str(self.output_dir / ".content_index.json"))
+        
+        # Interfaces of everything generated so far, for dependency-aware prompts
+        self.symbol_index = SymbolIndex(str(self.output_dir), max_file_bytes=self.stream_threshold_bytes)
+        self.symbol_index.refresh()
         
     def _setup_directories(self):
         """Setup necessary directories"""
         self.output_dir.mkdir(exist_ok=True, parents=True)
-        self.backup_dir.mkdir(exist_ok=True)
+        self.backup_dir.mkdir(exist_ok=True, parents=True)
+        self.commit_dir.mkdir(exist_ok=True)
         
-    def _load_history(self):
-        """Load file history"""
-        self.history = {}
-        if self.history_file.exists():
-            try:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    self.history = json.load(f)
-            except:
-                self.history = {}
-    
-    def _save_history(self):
-        """Save file history"""
-        if self.dry_run:
-            return
-            
+    def begin_task(self, task_id: str, filenames: List[str]) -> Dict[str, str]:
+        """
+        Record the versions a task builds against; returns those that exist
+        
+        If another task changes one of these files before this task writes
+        it, `write_files` merges both changes instead of overwriting. Files
+        above the stream threshold are not loaded: only their digest is
+        recorded, they are not returned, and a concurrent change to them is
+        reported as a conflict.
+        """
+        bases: Dict[str, Optional[str]] = {}
+        digests: Dict[str, str] = {}
+        for filename in dict.fromkeys(filenames):
+            filepath = self.output_dir / filename
+            if filepath.is_file() and filepath.stat().st_size > self.stream_threshold_bytes:
+                digest = self._current_digest(filename, filepath)
+                if digest:  # "" when unreadable: nothing to build against
+                    digests[filename] = digest
+                continue
+            content = self.read_file(filename)
+            if content is not None or not filepath.exists():
+                bases[filename] = content  # None: the file did not exist
+        with self._bases_lock:
+            self._bases[task_id] = bases
+            self._base_digests[task_id] = digests
+        return {filename: content for filename, content in bases.items() if content is not None}
+    
+    def end_task(self, task_id: str):
+        """Forget the base versions of a task that will not write"""
+        with self._bases_lock:
+            self._bases.pop(task_id, None)
+            self._base_digests.pop(task_id, None)
+    
+    def write_files(
+        self,
+        files: List[Dict[str, str]],
+        task_id: str,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """Write multiple files with backup and diff
+
+        Files are staged concurrently and then moved into place together
+        (see `_commit_writes`). Files whose content is identical to what is
+        on disk are not touched and reported under "unchanged". Files
+        another task changed since `begin_task` are three-way merged and
+        reported under "merged"; if any merge conflicts, nothing is written
+        and the files are reported under "conflicts". Safety findings of
+        written files are reported under "safety", by filename. A task's
+        files are written all or none: if one cannot be prepared (a safety
+        refusal, the size limit, the deadline passing before it), nothing
+        is written and every file is reported under "failed".
+        """
+        with self._locked_paths(file_info["filename"] for file_info in files):
+            return self._write_files_locked(files, task_id, deadline)
+    
+    @contextmanager
+    def _locked_paths(self, filenames: Iterable[str]):
+        """Hold the locks of several paths, taken in sorted order so writers cannot deadlock"""
+        with self._path_locks_guard:
+            locks = [
+                self._path_locks.setdefault(filename, threading.Lock())
+                for filename in sorted(set(filenames))
+            ]
+        for lock in locks:
+            lock.acquire()
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.history, f, indent=2)
-        except Exception as e:
-            logger.error(f"Failed to save history: {e}")
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
     
-    def write_files(self, files: List[Dict[str, str]], task_id: str) -> Dict[str, Any]:
-        """Write multiple files with backup and diff"""
+    def _write_files_locked(
+        self,
+        files: List[Dict[str, str]],
+        task_id: str,
+        deadline: Optional[Deadline]
+    ) -> Dict[str, Any]:
         results = {
             "success": [],
+            "unchanged": [],
+            "merged": [],
+            "conflicts": [],
             "failed": [],
             "backups": [],
-            "diffs": {}
+            "diffs": {},
+            "safety": {}
         }
+        with self._bases_lock:
+            bases = self._bases.pop(task_id, {})
+            base_digests = self._base_digests.pop(task_id, {})
         
+        pending = []
         for file_info in files:
-            filename = file_info["filename"]
-            content = file_info["code"]
-            
-            result = self._write_file_safe(filename, content, task_id)
-            
-            if result["success"]:
-                results["success"].append(filename)
-                results["diffs"][filename] = result["diff"]
-                if result["backup"]:
-                    results["backups"].append(result["backup"])
-            else:
+            if deadline is not None and deadline.expired:
                 results["failed"].append({
-                    "filename": filename,
-                    "error": result["error"]
+                    "filename": file_info["filename"],
+                    "error": "Deadline exceeded before write"
                 })
+                continue
+            pending.append((file_info["filename"], file_info["code"]))
         
-        self._save_history()
+        # Read, diff, back up and stage every file concurrently; the output tree is untouched until commit
+        with ThreadPoolExecutor(max_workers=max(1, min(self.write_workers, len(pending) or 1))) as pool:
+            prepared = list(pool.map(lambda item: self._prepare_write(item[0], item[1], task_id, bases, base_digests), pending))
+        
+        conflicts = [result for result in prepared if result.get("conflict")]
+        if conflicts:
+            # The task is rebuilt against the current files; none of its writes may land
+            for result in prepared:
+                self._discard_temp(result.get("temp"))
+            results["conflicts"] = [{"filename": r["filename"], "error": r["error"]} for r in conflicts]
+            results["failed"].extend(results["conflicts"])
+            return results
+        
+        failures = [result for result in prepared if not result["success"]]
+        if failures or results["failed"]:
+            # A retry must not build on half of this task's output
+            for result in prepared:
+                self._discard_temp(result.get("temp"))
+            results["failed"].extend({"filename": r["filename"], "error": r["error"]} for r in failures)
+            failed = ", ".join(failure["filename"] for failure in results["failed"])
+            results["failed"].extend(
+                {"filename": r["filename"], "error": f"Not written because {failed} could not be written"}
+                for r in prepared if r["success"]
+            )
+            return results
+        
+        staged = []
+        for result in prepared:
+            if result["unchanged"]:
+                results["unchanged"].append(result["filename"])
+                if result["reindex"] and not self.dry_run:
+                    self.content_index.record(result["filename"], self.output_dir / result["filename"], result["digest"])
+            else:
+                staged.append(result)
+        
+        if not self.dry_run and staged:
+            for filename, error in self._commit_writes(staged, task_id).items():
+                results["failed"].append({"filename": filename, "error": error})
+            staged = [result for result in staged if result["committed"]]
+        
+        for result in staged:
+            filename = result["filename"]
+            results["success"].append(filename)
+            if result["merged"]:
+                results["merged"].append(filename)
+            results["diffs"][filename] = result["diff"]
+            if result["backup"]:
+                results["backups"].append(result["backup"])
+            if result["safety"]:
+                results["safety"][filename] = result["safety"]
+            self._record_write(result, task_id)
+        
+        if not self.dry_run:
+            self.content_index.save()
         return results
     
-    def _write_file_safe(self, filename: str, content: str, task_id: str) -> Dict[str, Any]:
-        """Safely write a file with backup and diff"""
+    def _record_write(self, result: Dict[str, Any], task_id: str):
+        """Update history and indexes for a committed (or, in dry runs, planned) write"""
+        filename = result["filename"]
+        if result["action"] == "deleted":
+            if not self.dry_run:
+                self.content_index.forget(filename)
+            self.symbol_index.remove(filename)
+            return
+        if not self.dry_run:
+            self.history.append(filename, task_id, result["content"], previous=result["previous"])
+            self.content_index.record(filename, self.output_dir / filename, result["digest"])
+        # Dry runs index the content that would have been written
+        self.symbol_index.update(filename, result["content"])
+    
+    def _prepare_write(
+        self,
+        filename: str,
+        content: str,
+        task_id: str,
+        bases: Optional[Dict[str, Optional[str]]] = None,
+        base_digests: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Read, diff and back up one file, and stage its new content in a temp file"""
         filepath = self.output_dir / filename
+        has_base = bases is not None and filename in bases
         
         try:
+            data = content.encode("utf-8")
+            if len(data) > self.max_file_bytes:
+                raise ValueError(f"{len(data)} bytes exceeds the {self.max_file_bytes // (1024 * 1024)} MB file size limit")
+            
+            # Unchanged since we last wrote it: nothing to read, diff, back up or write
+            digest = self.content_index.digest(content)
+            if self.content_index.lookup(filename, filepath) == digest:
+                return self._unchanged(filename, digest, reindex=False)
+            
             # Ensure directory exists
             filepath.parent.mkdir(exist_ok=True, parents=True)
             
+            # A large base was only hashed, so a concurrent change cannot be merged
+            if base_digests and filename in base_digests:
+                if self._current_digest(filename, filepath) != base_digests[filename]:
+                    return self._conflict(filename, "changed by another task; large files are not merged")
+            
+            # Large files are compared, hashed and backed up straight from disk
+            if filepath.exists() and filepath.stat().st_size > self.stream_threshold_bytes:
+                if has_base and self._current_digest(filename, filepath) != self.content_index.digest(bases[filename] or ""):
+                    return self._conflict(filename, "changed by another task; large files are not merged")
+                return self._prepare_large_write(filename, filepath, content, data, digest, task_id)
+            
             # Read existing content if file exists
             old_content = None
             if filepath.exists():
                 with open(filepath, 'r', encoding='utf-8') as f:
                     old_content = f.read()
+                if self.content_index.digest(old_content) == digest:
+                    return self._unchanged(filename, digest, reindex=True)
+            
+            # Another task changed the file since this one read it: merge instead of overwriting
+            merged = False
+            if has_base and old_content != bases[filename]:
+                merge = merge3(bases[filename] or "", old_content or "", content, engine=self.diff_engine)
+                if not merge.clean:
+                    lines = ", ".join(str(conflict.base_line) for conflict in merge.conflicts)
+                    return self._conflict(filename, f"conflicts with changes by another task at line(s) {lines}")
+                content, merged = merge.content, True
+                digest = self.content_index.digest(content)
+                if content == old_content:
+                    return self._unchanged(filename, digest, reindex=True)
             
             # Generate diff
             diff = ""
             if old_content is not None:
-                diff = generate_diff(old_content, content, str(filepath))
+                diff = generate_diff(old_content, content, str(filepath), engine=self.diff_engine)
             
-            # Create backup
-            backup_path = None
-            if old_content is not None and not self.dry_run:
-                backup_path = self._create_backup(filename, old_content, task_id)
-            
-            # Write file if not dry run
-            if not self.dry_run:
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                
-                # Update history
-                self._update_file_history(filename, task_id, len(content))
-            
-            return {
-                "success": True,
-                "diff": diff,
-                "backup": backup_path,
-                "file_size": len(content)
-            }
+            # The backup is taken when the write commits (see `_commit_writes`)
+            result = self._staged(
+                filename, filepath, content, digest, task_id,
+                action="modified" if old_content is not None else "created",
+                previous=old_content,
+                diff=diff
+            )
+            result["merged"] = merged
+            return result
             
         except Exception as e:
             logger.error(f"Failed to write file {filename}: {e}")
             return {
                 "success": False,
+                "filename": filename,
                 "error": str(e)
             }
     
-    def _create_backup(self, filename: str, content: str, task_id: str) -> str:
-        """Create backup of file"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_filename = f"{filename}.{timestamp}.{task_id}.bak"
-        backup_path = self.backup_dir / backup_filename
+    def _prepare_large_write(
+        self,
+        filename: str,
+        filepath: Path,
+        content: str,
+        data: bytes,
+        digest: str,
+        task_id: str
+    ) -> Dict[str, Any]:
+        """Prepare overwriting a file above the stream threshold without loading it
         
-        try:
-            backup_path.parent.mkdir(exist_ok=True, parents=True)
-            with open(backup_path, 'w', encoding='utf-8') as f:
+        The old content is compared and hashed through a memory map, and
+        streamed into the backup store on commit; the diff is a hash summary.
+        """
+        if streaming.matches(filepath, data):
+            return self._unchanged(filename, digest, reindex=True)
+        
+        old_hash = streaming.file_digest(filepath, hashlib.sha256())
+        new_hash = hashlib.sha256(data).hexdigest()
+        diff = (
+            f"--- {filepath} (old)\n+++ {filepath} (new)\n"
+            f"# changed (large file, not diffed)\n"
+            f"# old: sha256:{old_hash[:16]}, {filepath.stat().st_size} bytes\n"
+            f"# new: sha256:{new_hash[:16]}, {len(data)} bytes\n"
+        )
+        
+        return self._staged(
+            filename, filepath, content, digest, task_id,
+            action="modified",
+            previous=None,
+            diff=diff
+        )
+    
+    def _staged(
+        self,
+        filename: str,
+        filepath: Path,
+        content: str,
+        digest: str,
+        task_id: str,
+        action: str,
+        previous: Optional[str],
+        diff: str
+    ) -> Dict[str, Any]:
+        """Stage new content in a temp file next to the target, so the final os.replace stays on one filesystem"""
+        findings = self._scan(filename, content)
+        
+        temp_path = None
+        if not self.dry_run:
+            temp_path = filepath.with_name(f".{filepath.name}.{task_id}.{uuid.uuid4().hex[:8]}{TEMP_SUFFIX}")
+            # Synced together with the task's other files in `_commit_writes`
+            with open(temp_path, 'w', encoding='utf-8') as f:
                 f.write(content)
-            return str(backup_path)
-        except Exception as e:
-            logger.error(f"Failed to create backup: {e}")
-            return ""
+        
+        return {
+            "success": True,
+            "unchanged": False,
+            "action": action,
+            "filename": filename,
+            "content": content,
+            "digest": digest,
+            "previous": previous,
+            "diff": diff,
+            "backup": None,
+            "temp": str(temp_path) if temp_path else None,
+            "file_size": len(content),
+            "merged": False,
+            "safety": findings,
+            "committed": False
+        }
+    
+    def _scan(self, filename: str, content: str) -> List[Dict[str, Any]]:
+        """Safety findings for content about to be written; raises on critical ones"""
+        if self.safety_scanner is None:
+            return []
+        findings = self.safety_scanner.scan(content, filename)
+        critical = [finding for finding in findings if finding.severity == "critical"]
+        if critical:
+            locations = ", ".join(f"line {finding.line}, column {finding.column}" for finding in critical)
+            raise ValueError(f"refused by safety checks ({critical[0].message} at {locations})")
+        return [finding.dict() for finding in findings]
     
-    def _update_file_history(self, filename: str, task_id: str, size: int):
-        """Update file history"""
-        if filename not in self.history:
-            self.history[filename] = []
+    @staticmethod
+    def _conflict(filename: str, error: str) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "conflict": True,
+            "filename": filename,
+            "error": error
+        }
+    
+    @staticmethod
+    def _unchanged(filename: str, digest: str, reindex: bool) -> Dict[str, Any]:
+        return {
+            "success": True,
+            "unchanged": True,
+            "filename": filename,
+            "digest": digest,
+            "reindex": reindex  # The index did not know the file yet
+        }
+    
+    def _commit_writes(self, staged: List[Dict[str, Any]], task_id: str) -> Dict[str, str]:
+        """
+        Move staged files into place as one unit; returns errors by filename
+        
+        The staged temp files are fsynced in one pass, after all of them
+        have been written, so the kernel can flush them together. A journal
+        listing them is made durable next, so if the process dies half-way
+        the remaining renames are rolled forward on the next start.
+        Directories are fsynced once per task, after all renames, and the
+        journal is then marked committed.
+        
+        The journal doubles as the task's manifest for rollback: for every
+        file it records whether the task created, modified or deleted it,
+        the backup blob of the previous content and the hash of the content
+        the task left behind. Previous content is backed up only here, once
+        the writes have passed every check, so attempts that conflict or
+        fail leave no backups behind.
+        """
+        journal = self.commit_dir / f"{task_id}.json"
+        errors = {}
+        if self.durable:
+            for result in staged:
+                if not result["temp"]:
+                    continue
+                try:
+                    self._fsync_file(result["temp"])
+                except OSError as e:
+                    logger.error(f"Failed to sync staged {result['filename']}: {e}")
+                    errors[result["filename"]] = f"Could not sync staged content: {e}"
+            if errors:
+                for result in staged:
+                    self._discard_temp(result["temp"])
+                    errors.setdefault(result["filename"], "Not written: another file of the task could not be synced")
+                return errors
         
-        self.history[filename].append({
+        for result in staged:
+            if result["action"] != "created":
+                result["backup"] = self._create_backup(result, task_id)
+        previous_blobs = self.backups.files(task_id)
+        items = {
+            result["filename"]: {
+                "filename": result["filename"],
+                "temp": result["temp"],
+                "action": result["action"],
+                "previous": previous_blobs.get(result["filename"]),
+                "hash": result["digest"] if result["action"] != "deleted" else None
+            }
+            for result in staged
+        }
+        # A task writing a file again keeps its first action and previous content
+        earlier = self._read_journal(task_id)
+        if earlier is not None:
+            for item in earlier.get("files", []):
+                if item["filename"] in items:
+                    items[item["filename"]].update(action=item["action"], previous=item["previous"])
+                else:
+                    items[item["filename"]] = dict(item, temp=None)
+        entry = {
             "task_id": task_id,
-            "timestamp": datetime.now().isoformat(),
-            "size": size,
-            "backup_count": len([b for b in self.backup_dir.glob(f"{filename}.*.bak")])
-        })
+            "status": "pending",
+            "timestamp": earlier["timestamp"] if earlier else datetime.now().isoformat(),
+            "files": list(items.values())
+        }
+        try:
+            self._write_journal(journal, entry)
+        except Exception as e:
+            logger.error(f"Failed to journal writes of task {task_id}: {e}")
+            for result in staged:
+                self._discard_temp(result["temp"])
+                errors[result["filename"]] = f"Could not journal write: {e}"
+            return errors
+        
+        directories = set()
+        for result in staged:
+            target = self.output_dir / result["filename"]
+            try:
+                if result["action"] == "deleted":
+                    target.unlink(missing_ok=True)
+                else:
+                    os.replace(result["temp"], target)
+                result["committed"] = True
+                directories.add(target.parent)
+            except OSError as e:
+                # The temp file stays behind; the journal rolls it forward on the next start
+                logger.error(f"Failed to commit {result['filename']}: {e}")
+                errors[result["filename"]] = str(e)
+        
+        if self.durable:
+            for directory in directories:
+                self._fsync_directory(directory)
         
-        # Keep only last 100 entries per file
-        if len(self.history[filename]) > 100:
-            self.history[filename] = self.history[filename][-100:]
+        if not errors:
+            entry["status"] = "committed"
+            try:
+                self._write_journal(journal, entry)
+            except Exception as e:
+                logger.warning(f"Failed to mark task {task_id} committed: {e}")
+        return errors
+    
+    def _read_journal(self, task_id: str) -> Optional[Dict[str, Any]]:
+        journal = self.commit_dir / f"{task_id}.json"
+        if not journal.exists():
+            return None
+        try:
+            with open(journal, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable commit journal {journal.name}: {e}")
+            return None
+    
+    def _write_journal(self, journal: Path, entry: Dict[str, Any]):
+        temp = journal.with_name(journal.name + TEMP_SUFFIX)
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, indent=2)
+            if self.durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp, journal)
+        if self.durable:
+            self._fsync_directory(journal.parent)
+    
+    def _recover_commits(self):
+        """Finish commits interrupted by a crash and drop temp files that were never journaled"""
+        journaled = set()
+        for journal in self.commit_dir.glob("*.json"):
+            try:
+                with open(journal, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Unreadable commit journal {journal.name}: {e}")
+                continue
+            if entry.get("status") != "pending":
+                continue
+            
+            for item in entry.get("files", []):
+                temp = item.get("temp")
+                journaled.add(temp)
+                if item.get("action") == "deleted":
+                    (self.output_dir / item["filename"]).unlink(missing_ok=True)
+                elif temp and os.path.exists(temp):
+                    os.replace(temp, self.output_dir / item["filename"])
+            entry["status"] = "committed"
+            self._write_journal(journal, entry)
+            logger.info(f"Rolled forward interrupted writes of task {entry.get('task_id')}")
+        
+        for temp in self.output_dir.rglob(f"*{TEMP_SUFFIX}"):
+            if str(temp) not in journaled:
+                self._discard_temp(str(temp))
+    
+    @staticmethod
+    def _discard_temp(temp: Optional[str]):
+        if not temp:
+            return
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+    
+    @staticmethod
+    def _fsync_file(path: str):
+        fd = os.open(path, os.O_RDWR)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    @staticmethod
+    def _fsync_directory(directory: Path):
+        """Persist renames in a directory (not supported on every platform)"""
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+    
+    def read_file(self, filename: str, max_bytes: Optional[int] = None) -> Optional[str]:
+        """Return the current content of an output file, or None if it does not exist or is larger than `max_bytes`"""
+        filepath = self.output_dir / filename
+        if not filepath.is_file():
+            return None
+        if not SafetyChecker.check_file_size(filepath, self.max_file_size_mb):
+            logger.warning(f"Not reading {filename}: larger than {self.max_file_size_mb} MB")
+            return None
+        if max_bytes is not None and filepath.stat().st_size > max_bytes:
+            return None
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                return f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"Could not read {filename}: {e}")
+            return None
+    
+    def _create_backup(self, result: Dict[str, Any], task_id: str) -> str:
+        """Back up the content a staged write replaces, streaming it from disk if it was not loaded"""
+        filename = result["filename"]
+        try:
+            if result["previous"] is not None:
+                return self.backups.add(filename, result["previous"], task_id)
+            return self.backups.add_file(filename, self.output_dir / filename, task_id)
+        except Exception as e:
+            logger.error(f"Failed to create backup: {e}")
+            return ""
     
     def rollback_to_task(self, task_id: str) -> Dict[str, Any]:
         """Rollback changes made by a specific task"""
-        backups = list(self.backup_dir.glob(f"*.{task_id}.bak"))
+        return self.rollback_tasks([task_id])
+    
+    def rollback_tasks(self, task_ids: List[str]) -> Dict[str, Any]:
+        """
+        Undo the writes of several tasks in one transaction
         
+        Every file goes back to its state before the earliest of the tasks
+        that wrote it: restored from backup, or deleted if that task created
+        it. Only the tasks' manifests are read, so the cost depends on the
+        files they touched, not on the size of the history. If any file
+        cannot be rolled back - its backup was evicted, or it was changed
+        since by a task outside the set - nothing is changed.
+        """
+        filenames = [
+            item["filename"]
+            for manifest in (self._read_journal(task_id) for task_id in task_ids) if manifest
+            for item in manifest.get("files", [])
+        ]
+        with self._locked_paths(filenames):
+            return self._rollback_locked(task_ids)
+    
+    def _rollback_locked(self, task_ids: List[str]) -> Dict[str, Any]:
         results = {
             "restored": [],
+            "deleted": [],
             "failed": []
         }
         
-        for backup in backups:
-            try:
-                # Extract original filename
-                parts = backup.name.split('.')
-                original_filename = '.'.join(parts[:-3])  # Remove timestamp and task_id and .bak
-                
-                if self._restore_backup(backup, original_filename):
-                    results["restored"].append(original_filename)
-                else:
-                    results["failed"].append(original_filename)
-                    
-            except Exception as e:
-                logger.error(f"Failed to restore {backup}: {e}")
-                results["failed"].append(str(backup))
+        manifests = [
+            manifest for manifest in (self._read_journal(task_id) for task_id in task_ids)
+            if manifest is not None and manifest.get("status") == "committed"
+        ]
+        manifests.sort(key=lambda manifest: manifest["timestamp"])
+        
+        # Earliest write of a file: the state to return to; latest: what must still be on disk
+        first: Dict[str, Dict[str, Any]] = {}
+        last: Dict[str, Dict[str, Any]] = {}
+        for manifest in manifests:
+            for item in manifest["files"]:
+                first.setdefault(item["filename"], item)
+                last[item["filename"]] = item
+        
+        transaction = f"rollback-{uuid.uuid4().hex[:8]}"
+        staged = []
+        errors = []
+        for filename, item in first.items():
+            filepath = self.output_dir / filename
+            if self._current_digest(filename, filepath) != last[filename]["hash"]:
+                errors.append((filename, "changed since by another task"))
+                continue
+            if item["action"] == "created":
+                staged.append(self._stage_delete(filename, transaction))
+                continue
+            content = self.backups.read(item["previous"]) if item.get("previous") else None
+            if content is None:
+                errors.append((filename, "backup no longer available"))
+                continue
+            staged.append(self._prepare_write(filename, content, transaction))
+        errors.extend((result["filename"], result["error"]) for result in staged if not result["success"])
+        
+        if errors:
+            for result in staged:
+                self._discard_temp(result.get("temp"))
+            for filename, error in errors:
+                logger.error(f"Cannot roll back {filename}: {error}")
+            results["failed"] = [filename for filename, _ in errors]
+            return results
         
+        changed = [result for result in staged if not result["unchanged"]]
+        if not self.dry_run and changed:
+            commit_errors = self._commit_writes(changed, transaction)
+            if commit_errors:
+                # The journal completes the remaining renames on the next start
+                results["failed"] = list(commit_errors)
+        
+        for result in changed:
+            if result["committed"] or self.dry_run:
+                self._record_write(result, transaction)
+        for result in staged:
+            if result["unchanged"] or result["committed"] or self.dry_run:
+                key = "deleted" if result.get("action") == "deleted" else "restored"
+                results[key].append(result["filename"])
+        
+        if not self.dry_run:
+            for manifest in manifests:
+                manifest["status"] = "rolled_back"
+                manifest["rolled_back_by"] = transaction
+                self._write_journal(self.commit_dir / f"{manifest['task_id']}.json", manifest)
+            self.content_index.save()
         return results
     
-    def _restore_backup(self, backup_path: Path, original_filename: str) -> bool:
-        """Restore file from backup"""
-        if self.dry_run:
-            return True
-            
+    def _stage_delete(self, filename: str, transaction: str) -> Dict[str, Any]:
+        """Prepare the removal of a file; its current content is backed up on commit"""
+        filepath = self.output_dir / filename
+        if not filepath.exists():
+            return {"success": True, "unchanged": True, "action": "deleted", "filename": filename}
+        return {
+            "success": True,
+            "unchanged": False,
+            "action": "deleted",
+            "filename": filename,
+            "temp": None,
+            "digest": None,
+            "previous": None,
+            "backup": None,
+            "committed": False
+        }
+    
+    def _current_digest(self, filename: str, filepath: Path) -> Optional[str]:
+        """Digest of a file's content as it is on disk now (None if missing)"""
+        digest = self.content_index.lookup(filename, filepath)
+        if digest is not None:
+            return digest
+        if not filepath.exists():
+            return None
         try:
-            target_path = self.output_dir / original_filename
-            
-            # Read backup content
-            with open(backup_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Write to target
-            target_path.parent.mkdir(exist_ok=True, parents=True)
-            with open(target_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to restore {original_filename}: {e}")
-            return False
+            return self.content_index.file_digest(filepath)
+        except OSError:
+            return ""  # Unreadable: never matches a recorded write
+    
+    def get_backup_usage(self) -> Dict[str, float]:
+        """Disk usage of the backup store"""
+        return self.backups.disk_usage()
     
     def get_file_diff(self, filename: str, version1: str, version2: str) -> Optional[str]:
-        """Get diff between two versions of a file"""
-        # Implementation for getting diff between specific versions
-        # This would compare backup files or use git history
+        """Get diff between two versions of a file
         
-        return None
\ No newline at end of file
+        Versions are version numbers (negative counts back from the latest)
+        or the ids of the tasks that wrote them; they are reconstructed from
+        the history log.
+        """
+        old_content = self.history.get_version(filename, version1)
+        new_content = self.history.get_version(filename, version2)
+        if old_content is None or new_content is None:
+            return None
+        return generate_diff(old_content, new_content, filename, engine=self.diff_engine)
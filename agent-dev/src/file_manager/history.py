@@ -0,0 +1,228 @@
+"""
+File History - append-only log of the versions written to output files
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .diff_engine import DiffEngine
+from .patch import apply_patch
+from ..utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class FileHistory:
+    """Every version written to an output file, in a JSONL log.
+
+    Writing a version appends one line; nothing is ever rewritten in
+    place. A version is stored as a unified diff against the previous one
+    where that diff reproduces it exactly, and in full otherwise and every
+    `snapshot_interval` versions, so reconstructing a version replays at
+    most that many diffs. The in-memory index keeps each record's metadata
+    and its byte offset in the log; content is read back only on demand.
+
+    Compaction rewrites the log keeping the newest `max_entries` versions
+    per file. It runs once the dropped records outnumber the kept ones,
+    which keeps appends amortized O(1).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 100,
+        snapshot_interval: int = 20,
+        diff_engine: Optional[DiffEngine] = None,
+        max_content_chars: Optional[int] = None
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.snapshot_interval = snapshot_interval
+        self.diff_engine = diff_engine or DiffEngine()
+        # Larger versions are logged by hash and size only
+        self.max_content_chars = max_content_chars
+        self._index: Dict[str, List[Dict[str, Any]]] = {}
+        self._kept = 0  # Records within the newest `max_entries` of their file
+        self._dropped = 0  # Older records, removed by the next compaction
+        self._lock = threading.Lock()
+        self._load()
+
+    def append(self, filename: str, task_id: str, content: str, previous: Optional[str] = None) -> Dict[str, Any]:
+        """Log a new version of `filename`; `previous` is the content it replaced"""
+        digest = self._hash(content)
+        with self._lock:
+            entries = self._index.setdefault(filename, [])
+            last = entries[-1] if entries else None
+            record: Dict[str, Any] = {
+                "filename": filename,
+                "version": last["version"] + 1 if last else 1,
+                "task_id": task_id,
+                "timestamp": datetime.now().isoformat(),
+                "size": len(content),
+                "hash": digest,
+            }
+
+            delta = None
+            if self.max_content_chars is not None and len(content) > self.max_content_chars:
+                content = None
+            elif (
+                last is not None
+                and previous is not None
+                and last["chain"] + 1 < self.snapshot_interval
+                and self._hash(previous) == last["hash"]
+            ):
+                delta = self._delta(previous, content, digest)
+            if delta is not None:
+                record["chain"] = last["chain"] + 1
+                record["delta"] = delta
+            else:
+                record["chain"] = 0
+                record["content"] = content
+
+            offset = self._append_line(record)
+            self._add(entries, self._metadata(record, offset))
+            if self._dropped > max(self._kept, self.max_entries):
+                self._compact()
+            return self._public(self._index[filename][-1])
+
+    def entries(self, filename: str) -> List[Dict[str, Any]]:
+        """Metadata of the logged versions of a file, oldest first"""
+        return [self._public(entry) for entry in self._index.get(filename, [])[-self.max_entries:]]
+
+    def get_version(self, filename: str, version: Union[int, str]) -> Optional[str]:
+        """Content of one version of a file
+
+        `version` is a version number (negative counts from the latest, so
+        -1 is the current version) or the id of the task that wrote it.
+        """
+        entry = self._resolve(filename, version)
+        if entry is None:
+            return None
+
+        entries = self._index[filename]
+        position = entries.index(entry)
+        start = position
+        while start > 0 and entries[start]["chain"] > 0:
+            start -= 1
+
+        with open(self.path, 'rb') as f:
+            content = None
+            for item in entries[start:position + 1]:
+                f.seek(item["offset"])
+                record = json.loads(f.readline())
+                if "content" in record:
+                    content = record["content"]
+                elif content is not None and record.get("delta"):
+                    result = apply_patch(content, record["delta"], fuzz=0)
+                    content = result.content if result.success else None
+                if content is None:
+                    logger.warning(f"Cannot reconstruct {filename} version {entry['version']}")
+                    return None
+        return content
+
+    def _resolve(self, filename: str, version: Union[int, str]) -> Optional[Dict[str, Any]]:
+        entries = self._index.get(filename, [])[-self.max_entries:]
+        if not entries:
+            return None
+        try:
+            number = int(version)
+        except (TypeError, ValueError):
+            matches = [entry for entry in entries if entry["task_id"] == version]
+            return matches[-1] if matches else None
+        if number < 0:
+            return entries[number] if -number <= len(entries) else None
+        return next((entry for entry in entries if entry["version"] == number), None)
+
+    def _delta(self, previous: str, content: str, digest: str) -> Optional[str]:
+        """Diff that turns `previous` into exactly `content`, or None"""
+        delta = self.diff_engine.unified_diff(previous, content)
+        if not delta:
+            return delta
+        result = apply_patch(previous, delta, fuzz=0)
+        if not result.success or self._hash(result.content) != digest:
+            return None
+        return delta
+
+    def _append_line(self, record: Dict[str, Any]) -> int:
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        with open(self.path, 'ab') as f:
+            offset = f.tell()
+            f.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+        return offset
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                    self._add(self._index.setdefault(record["filename"], []), self._metadata(record, offset))
+                except (ValueError, KeyError):
+                    logger.warning(f"Skipping damaged history record at byte {offset}")
+                offset += len(line)
+
+        if offset < self.path.stat().st_size:
+            # A record cut short by a crash; drop it so the next append starts on a fresh line
+            logger.warning(f"Truncating incomplete history record at byte {offset}")
+            with open(self.path, 'r+b') as f:
+                f.truncate(offset)
+
+    def _compact(self):
+        """Rewrite the log with only the newest `max_entries` versions per file"""
+        temp = self.path.with_name(self.path.name + ".compact")
+        index: Dict[str, List[Dict[str, Any]]] = {}
+        with open(self.path, 'rb') as source, open(temp, 'wb') as target:
+            for filename, entries in self._index.items():
+                kept = entries[-self.max_entries:]
+                for position, entry in enumerate(kept):
+                    source.seek(entry["offset"])
+                    record = json.loads(source.readline())
+                    if position == 0 and "delta" in record:
+                        # The new first version has nothing left to be a diff against
+                        record.pop("delta")
+                        record["content"] = self.get_version(filename, entry["version"])
+                        record["chain"] = 0
+                    offset = target.tell()
+                    target.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+                    index.setdefault(filename, []).append(self._metadata(record, offset))
+        os.replace(temp, self.path)
+        self._index = index
+        self._dropped = 0
+        self._kept = sum(len(entries) for entries in index.values())
+
+    def _add(self, entries: List[Dict[str, Any]], entry: Dict[str, Any]):
+        entries.append(entry)
+        if len(entries) > self.max_entries:
+            self._dropped += 1
+        else:
+            self._kept += 1
+
+    @staticmethod
+    def _metadata(record: Dict[str, Any], offset: int) -> Dict[str, Any]:
+        return {
+            "version": record["version"],
+            "task_id": record["task_id"],
+            "timestamp": record["timestamp"],
+            "size": record["size"],
+            "hash": record["hash"],
+            "chain": record.get("chain", 0),
+            "offset": offset,
+        }
+
+    @staticmethod
+    def _public(entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in entry.items() if key not in ("offset", "chain")}
+
+    @staticmethod
+    def _hash(content: str) -> str:
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
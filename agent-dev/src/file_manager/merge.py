@@ -0,0 +1,132 @@
+"""
+Three-way merge of concurrent edits to the same file
+"""
+
+from typing import List, Optional, Tuple
+from pydantic import BaseModel, Field
+
+from .diff_engine import DiffEngine
+
+
+Change = Tuple[int, int, List[str], str]  # (base start, base end, replacement lines, side)
+
+
+class MergeConflict(BaseModel):
+    base_line: int  # 1-based line in the base version where the conflict starts
+    base: List[str] = Field(default_factory=list)
+    ours: List[str] = Field(default_factory=list)
+    theirs: List[str] = Field(default_factory=list)
+
+
+class MergeResult(BaseModel):
+    content: Optional[str] = None  # None when there are conflicts
+    conflicts: List[MergeConflict] = Field(default_factory=list)
+
+    @property
+    def clean(self) -> bool:
+        return not self.conflicts
+
+
+def merge3(base: str, ours: str, theirs: str, engine: Optional[DiffEngine] = None) -> MergeResult:
+    """
+    Line-level three-way merge of two versions derived from `base`
+
+    Changes are taken from both sides as long as they touch different base
+    lines. Identical changes on both sides are applied once. Blocks both
+    sides insert at the same spot (new imports, registry entries,
+    requirements) are kept from both, ours first; when one block starts
+    or ends with the whole other block, only the longer one is kept. Any
+    other overlap is a conflict and no content is returned.
+    """
+    if ours == theirs or base == theirs:
+        return MergeResult(content=ours)
+    if base == ours:
+        return MergeResult(content=theirs)
+
+    engine = engine or DiffEngine()
+    base_lines = base.splitlines(keepends=True)
+    ours_lines = ours.splitlines(keepends=True)
+    theirs_lines = theirs.splitlines(keepends=True)
+    changes = sorted(
+        _changes(engine, base_lines, ours_lines, "ours") + _changes(engine, base_lines, theirs_lines, "theirs"),
+        key=lambda change: (change[0], change[1])
+    )
+
+    output: List[str] = []
+    conflicts: List[MergeConflict] = []
+    position = 0
+    index = 0
+    while index < len(changes):
+        cluster = [changes[index]]
+        start, end = changes[index][0], changes[index][1]
+        index += 1
+        while index < len(changes) and _overlaps(start, end, changes[index]):
+            end = max(end, changes[index][1])
+            cluster.append(changes[index])
+            index += 1
+
+        output.extend(base_lines[position:start])
+        resolved = _resolve(base_lines, cluster, start, end)
+        if resolved is None:
+            conflicts.append(MergeConflict(
+                base_line=start + 1,
+                base=base_lines[start:end],
+                ours=_apply(base_lines, [c for c in cluster if c[3] == "ours"], start, end),
+                theirs=_apply(base_lines, [c for c in cluster if c[3] == "theirs"], start, end)
+            ))
+        else:
+            output.extend(resolved)
+        position = end
+    output.extend(base_lines[position:])
+
+    if conflicts:
+        return MergeResult(conflicts=conflicts)
+    return MergeResult(content="".join(output))
+
+
+def _changes(engine: DiffEngine, base: List[str], other: List[str], side: str) -> List[Change]:
+    return [
+        (i1, i2, other[j1:j2], side)
+        for tag, i1, i2, j1, j2 in engine.opcodes(base, other)
+        if tag != "equal"
+    ]
+
+
+def _overlaps(start: int, end: int, change: Change) -> bool:
+    """Whether a change (sorted after the cluster start) touches base lines of the cluster"""
+    change_start, change_end = change[0], change[1]
+    if change_start < end:
+        return True
+    # Two insertions at the same spot have no natural order
+    return start == end == change_start == change_end
+
+
+def _resolve(base: List[str], cluster: List[Change], start: int, end: int) -> Optional[List[str]]:
+    ours = [change for change in cluster if change[3] == "ours"]
+    theirs = [change for change in cluster if change[3] == "theirs"]
+    if not ours or not theirs:
+        return _apply(base, cluster, start, end)
+
+    ours_result = _apply(base, ours, start, end)
+    theirs_result = _apply(base, theirs, start, end)
+    if ours_result == theirs_result:
+        return ours_result
+    if start == end:
+        # Both sides only inserted lines here: keep both blocks, unless one already contains the other
+        shorter, longer = sorted((ours_result, theirs_result), key=len)
+        if longer[:len(shorter)] == shorter or longer[len(longer) - len(shorter):] == shorter:
+            return longer
+        return ours_result + theirs_result
+    return None
+
+
+def _apply(base: List[str], changes: List[Change], start: int, end: int) -> List[str]:
+    """base[start:end] with the (non-overlapping) changes of one side applied"""
+    result: List[str] = []
+    position = start
+    for change_start, change_end, lines, _ in changes:
+        result.extend(base[position:change_start])
+        result.extend(lines)
+        position = change_end
+    result.extend(base[position:end])
+    return result
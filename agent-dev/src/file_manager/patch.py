@@ -0,0 +1,236 @@
+"""
+Unified diff parsing and hunk application
+"""
+
+import re
+from typing import List, Optional, Tuple
+from pydantic import BaseModel, Field
+
+
+HUNK_HEADER = re.compile(r"^@@+ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@+")
+
+
+class Hunk(BaseModel):
+    header: str
+    old_start: Optional[int] = None  # 1-based; None when the header carries no position
+    lines: List[Tuple[str, str]] = Field(default_factory=list)  # (" " | "-" | "+", text)
+    old_no_newline: bool = False  # "\ No newline at end of file" after the old side's last line
+    new_no_newline: bool = False  # ... after the new side's last line
+
+    @property
+    def old_block(self) -> List[str]:
+        return [text for op, text in self.lines if op in " -"]
+
+    @property
+    def new_block(self) -> List[str]:
+        return [text for op, text in self.lines if op in " +"]
+
+
+class FilePatch(BaseModel):
+    old_path: Optional[str] = None  # None for a new file (/dev/null)
+    new_path: Optional[str] = None  # None for a deleted file
+    hunks: List[Hunk] = Field(default_factory=list)
+
+
+class HunkConflict(BaseModel):
+    hunk: int  # Index of the hunk in its patch
+    header: str
+    expected_line: Optional[int] = None
+    reason: str
+
+
+class PatchResult(BaseModel):
+    content: Optional[str] = None
+    applied: int = 0
+    conflicts: List[HunkConflict] = Field(default_factory=list)
+    offsets: List[int] = Field(default_factory=list)  # Lines each applied hunk moved from its header
+    fuzz: List[int] = Field(default_factory=list)  # Context lines ignored per applied hunk
+
+    @property
+    def success(self) -> bool:
+        return self.content is not None and not self.conflicts
+
+
+def parse_unified_diff(diff_text: str) -> List[FilePatch]:
+    """
+    Parse a unified diff into per-file patches
+
+    Tolerates what models commonly get wrong: missing file headers, hunk
+    headers without line numbers ("@@ ... @@") and wrong line counts. Hunk
+    bodies end at the next header, not after the announced line count.
+    """
+    patches: List[FilePatch] = []
+    current: Optional[FilePatch] = None
+    hunk: Optional[Hunk] = None
+
+    lines = diff_text.splitlines()
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        index += 1
+        # A file header is a "---" line directly followed by a "+++" line
+        if line.startswith("--- ") and index < len(lines) and lines[index].startswith("+++ "):
+            current = FilePatch(old_path=_strip_path(line[4:]), new_path=_strip_path(lines[index][4:]))
+            patches.append(current)
+            hunk = None
+            index += 1
+            continue
+        if line.startswith("@@"):
+            if current is None:
+                current = FilePatch()
+                patches.append(current)
+            match = HUNK_HEADER.match(line)
+            hunk = Hunk(header=line, old_start=int(match.group(1)) if match else None)
+            current.hunks.append(hunk)
+            continue
+        if hunk is None:
+            continue  # "diff --git", "index ..." and prose around the diff
+        if line.startswith("\\"):
+            # "\ No newline at end of file": the line before it has no newline
+            if hunk.lines:
+                op = hunk.lines[-1][0]
+                hunk.old_no_newline = hunk.old_no_newline or op in " -"
+                hunk.new_no_newline = hunk.new_no_newline or op in " +"
+            continue
+        if line[:1] in (" ", "-", "+"):
+            hunk.lines.append((line[0], line[1:]))
+        elif line == "":
+            hunk.lines.append((" ", ""))  # Editors and models strip the space of blank context lines
+
+    for patch in patches:
+        # Trailing blank "context" lines are usually just the end of the diff text
+        for hunk in patch.hunks:
+            while hunk.lines and hunk.lines[-1] == (" ", ""):
+                hunk.lines.pop()
+    return patches
+
+
+def apply_hunks(original: str, hunks: List[Hunk], fuzz: int = 2) -> PatchResult:
+    """
+    Apply hunks to a text, tracking line offsets between them
+
+    Each hunk is looked up near the position its header announces, shifted
+    by how far earlier hunks moved the text, searching outwards from there.
+    When the exact context is not found, up to `fuzz` context lines are
+    dropped from either end, and finally whitespace differences are
+    ignored. Hunks that still do not match are reported as conflicts and
+    left out; the rest is applied.
+
+    The result ends with a newline like the original does, unless a hunk
+    that reaches the end of the text says otherwise with a "\ No newline
+    at end of file" marker (or the lack of one).
+    """
+    lines = original.splitlines()
+    trailing_newline = original.endswith("\n") or not original
+    result = PatchResult()
+    offset = 0  # How far earlier hunks moved the text
+    floor = 0  # Hunks apply in order and never overlap
+
+    for index, hunk in enumerate(hunks):
+        expected = hunk.old_start - 1 + offset if hunk.old_start else floor
+
+        match = _locate(lines, hunk, expected, floor, fuzz)
+        if match is None:
+            result.conflicts.append(HunkConflict(
+                hunk=index,
+                header=hunk.header,
+                expected_line=expected + 1,
+                reason="context not found"
+            ))
+            continue
+
+        position, old_len, new_block, used_fuzz, dropped_lead = match
+        start = position - dropped_lead
+        if start + len(hunk.old_block) == len(lines):
+            trailing_newline = not hunk.new_no_newline
+        lines[position:position + old_len] = new_block
+        result.offsets.append(start - expected)
+        if hunk.old_start is not None:
+            offset = start - (hunk.old_start - 1) + len(new_block) - old_len
+        floor = position + len(new_block)
+        result.applied += 1
+        result.fuzz.append(used_fuzz)
+
+    result.content = "\n".join(lines) + ("\n" if trailing_newline and lines else "")
+    return result
+
+
+def apply_patch(original: str, diff_text: str, fuzz: int = 2) -> PatchResult:
+    """Apply a single-file unified diff to `original`"""
+    patches = parse_unified_diff(diff_text)
+    if not patches or not any(patch.hunks for patch in patches):
+        return PatchResult(conflicts=[HunkConflict(hunk=0, header="", reason="no hunks in patch")])
+    hunks = [hunk for patch in patches for hunk in patch.hunks]
+    return apply_hunks(original, hunks, fuzz=fuzz)
+
+
+def _locate(
+    lines: List[str],
+    hunk: Hunk,
+    expected: int,
+    floor: int,
+    fuzz: int
+) -> Optional[Tuple[int, int, List[str], int, int]]:
+    """Find where a hunk applies: (position, old length, new lines, fuzz, leading context dropped)"""
+    old_block, new_block = hunk.old_block, hunk.new_block
+
+    if not old_block:
+        # Pure insertion (e.g. into an empty file): trust the header
+        position = min(max(expected, floor), len(lines))
+        return position, 0, new_block, 0, 0
+
+    lead, trail = _context_edges(hunk)
+    for level in range(0, fuzz + 1):
+        drop_lead, drop_trail = min(level, lead), min(level, trail)
+        if level and not (drop_lead or drop_trail):
+            break
+        old = old_block[drop_lead:len(old_block) - drop_trail]
+        new = new_block[drop_lead:len(new_block) - drop_trail]
+        if not old:
+            break
+        for normalize in (_exact, _loose):
+            position = _search(lines, old, expected + drop_lead, floor, normalize)
+            if position is not None:
+                return position, len(old), new, level, drop_lead
+    return None
+
+
+def _search(lines: List[str], block: List[str], expected: int, floor: int, normalize) -> Optional[int]:
+    """Closest position >= floor where `block` matches, searching outwards from `expected`"""
+    last = len(lines) - len(block)
+    if last < floor:
+        return None
+    target = [normalize(line) for line in block]
+    expected = min(max(expected, floor), last)
+    for distance in range(0, max(expected - floor, last - expected) + 1):
+        for position in ((expected,) if distance == 0 else (expected + distance, expected - distance)):
+            if floor <= position <= last:
+                if [normalize(line) for line in lines[position:position + len(block)]] == target:
+                    return position
+    return None
+
+
+def _context_edges(hunk: Hunk) -> Tuple[int, int]:
+    """Number of context lines at the start and end of a hunk"""
+    ops = [op for op, _ in hunk.lines]
+    lead = next((i for i, op in enumerate(ops) if op != " "), len(ops))
+    trail = next((i for i, op in enumerate(reversed(ops)) if op != " "), len(ops))
+    return lead, trail
+
+
+def _exact(line: str) -> str:
+    return line.rstrip("\r")
+
+
+def _loose(line: str) -> str:
+    return " ".join(line.split())
+
+
+def _strip_path(path: str) -> Optional[str]:
+    path = path.split("\t")[0].strip()
+    if path == "/dev/null":
+        return None
+    if path.startswith(("a/", "b/")):
+        path = path[2:]
+    return path
+
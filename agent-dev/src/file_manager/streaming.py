@@ -0,0 +1,47 @@
+"""
+Streaming helpers - hash, compare and copy large files without loading them
+"""
+
+import mmap
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+CHUNK_SIZE = 1024 * 1024
+
+
+@contextmanager
+def mapped(path: Path) -> Iterator[bytes]:
+    """Read-only memory map of a file (an empty bytes object for empty files)"""
+    with open(path, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            yield view
+
+
+def iter_chunks(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    with mapped(path) as view:
+        for start in range(0, len(view), chunk_size):
+            yield view[start:start + chunk_size]
+
+
+def file_digest(path: Path, hasher) -> str:
+    """Feed a file through `hasher` (e.g. hashlib.sha256()) chunk by chunk"""
+    for chunk in iter_chunks(path):
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def matches(path: Path, data: bytes, chunk_size: int = CHUNK_SIZE) -> bool:
+    """Whether a file holds exactly `data`, stopping at the first differing chunk"""
+    with mapped(path) as view:
+        if len(view) != len(data):
+            return False
+        source = memoryview(data)
+        for start in range(0, len(data), chunk_size):
+            if view[start:start + chunk_size] != source[start:start + chunk_size]:
+                return False
+    return True
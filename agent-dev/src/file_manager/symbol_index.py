@@ -0,0 +1,268 @@
+"""
+Symbol Index - interface summaries of the generated code
+"""
+
+import ast
+import re
+import threading
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterable, List, Optional, Tuple
+from pydantic import BaseModel, Field
+
+from ..utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# Lightweight, line-based extraction for languages without a parser at hand
+JS_EXPORT_PATTERN = re.compile(
+    r"^\s*export\s+(?:default\s+)?(?:declare\s+)?(?:abstract\s+)?"
+    r"(?:(?:async\s+)?function\*?\s+(\w+)\s*(\([^)]*\)[^{]*)|"
+    r"class\s+(\w+)([^{]*)|"
+    r"(?:interface|type|enum)\s+(\w+)([^{=]*)|"
+    r"(?:const|let|var)\s+(\w+)\s*(?::\s*([^=]+))?=)"
+)
+JS_EXPORT_PREFIX = re.compile(r"^\s*export\s+(?:default\s+)?(?:declare\s+)?")
+GO_DECL_PATTERN = re.compile(
+    r"^func\s+(?:\((?P<recv>[^)]*)\)\s*)?(?P<name>[A-Z]\w*)\s*(?P<sig>\([^{]*)|"
+    r"^type\s+(?P<type>[A-Z]\w*)\s+(?P<kind>struct|interface|\w+)"
+)
+
+PYTHON_SUFFIXES = {".py", ".pyi"}
+JS_SUFFIXES = {".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs"}
+GO_SUFFIXES = {".go"}
+
+
+class Symbol(BaseModel):
+    kind: str  # "function", "class", "method", "constant", "type"
+    name: str
+    signature: str
+    doc: Optional[str] = None
+    parent: Optional[str] = None  # Enclosing class for methods
+
+
+class ModuleSymbols(BaseModel):
+    filename: str
+    language: str
+    exports: List[str] = Field(default_factory=list)
+    symbols: List[Symbol] = Field(default_factory=list)
+    error: Optional[str] = None
+
+
+class SymbolIndex:
+    """Public symbols of the files in the output directory.
+
+    Files are (re)indexed one at a time with `update` as they are written,
+    or picked up from disk with `refresh`, which only re-parses files whose
+    size or mtime changed. `stubs` renders compact interface stubs that can
+    be given to the builder in place of full source.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_file_bytes: Optional[int] = None):
+        self.root = Path(root) if root else None
+        # Larger files (e.g. generated artifacts) are not read by `refresh`
+        self.max_file_bytes = max_file_bytes
+        self._modules: Dict[str, ModuleSymbols] = {}
+        self._signatures: Dict[str, Tuple[int, int]] = {}  # filename -> (size, mtime_ns)
+        self._lock = threading.Lock()
+
+    def update(self, filename: str, content: str) -> ModuleSymbols:
+        """Index (or re-index) one file from its content"""
+        module = self.parse(filename, content)
+        with self._lock:
+            self._modules[filename] = module
+        return module
+
+    def remove(self, filename: str):
+        with self._lock:
+            self._modules.pop(filename, None)
+            self._signatures.pop(filename, None)
+
+    def refresh(self, suffixes: Iterable[str] = PYTHON_SUFFIXES | JS_SUFFIXES | GO_SUFFIXES) -> int:
+        """Index new or modified source files under `root`; returns how many were parsed"""
+        if self.root is None or not self.root.exists():
+            return 0
+
+        parsed = 0
+        suffixes = set(suffixes)
+        for path in self.root.rglob("*"):
+            if not path.is_file() or path.suffix not in suffixes:
+                continue
+            filename = path.relative_to(self.root).as_posix()
+            stat = path.stat()
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if self._signatures.get(filename) == signature:
+                continue
+            if self.max_file_bytes is not None and stat.st_size > self.max_file_bytes:
+                continue
+            try:
+                content = path.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError) as e:
+                logger.debug(f"Skipping {filename} in symbol index: {e}")
+                continue
+            self.update(filename, content)
+            with self._lock:
+                self._signatures[filename] = signature
+            parsed += 1
+        return parsed
+
+    def get(self, filename: str) -> Optional[ModuleSymbols]:
+        return self._modules.get(filename)
+
+    def stubs(self, filenames: Iterable[str], max_chars: Optional[int] = None) -> str:
+        """Interface stubs of the given files, cut off at `max_chars`"""
+        parts = []
+        used = 0
+        for filename in filenames:
+            module = self._modules.get(filename)
+            if module is None or not module.symbols:
+                continue
+            stub = self.render(module)
+            if max_chars is not None and used + len(stub) > max_chars:
+                parts.append(f"# ... interfaces of further files omitted")
+                break
+            parts.append(stub)
+            used += len(stub)
+        return "\n\n".join(parts)
+
+    @staticmethod
+    def render(module: ModuleSymbols) -> str:
+        """Render a module's public interface as a compact stub"""
+        comment = "#" if module.language == "python" else "//"
+        lines = [f"{comment} {module.filename}"]
+        if module.exports:
+            lines.append(f"{comment} exports: {', '.join(module.exports)}")
+        for symbol in module.symbols:
+            indent = "    " if symbol.parent else ""
+            doc = f"  {comment} {symbol.doc}" if symbol.doc else ""
+            lines.extend(f"{indent}{line}" for line in f"{symbol.signature}{doc}".splitlines())
+        return "\n".join(lines)
+
+    @classmethod
+    def parse(cls, filename: str, content: str) -> ModuleSymbols:
+        suffix = PurePosixPath(filename).suffix.lower()
+        if suffix in PYTHON_SUFFIXES:
+            return cls._parse_python(filename, content)
+        if suffix in JS_SUFFIXES:
+            return cls._parse_js(filename, content)
+        if suffix in GO_SUFFIXES:
+            return cls._parse_go(filename, content)
+        return ModuleSymbols(filename=filename, language=suffix.lstrip(".") or "text")
+
+    @classmethod
+    def _parse_python(cls, filename: str, content: str) -> ModuleSymbols:
+        module = ModuleSymbols(filename=filename, language="python")
+        try:
+            tree = ast.parse(content, filename=filename)
+        except SyntaxError as e:
+            module.error = f"syntax error at line {e.lineno}"
+            return module
+
+        for node in tree.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and cls._is_public(node.name):
+                module.symbols.append(cls._python_function(node))
+            elif isinstance(node, ast.ClassDef) and cls._is_public(node.name):
+                bases = ", ".join(ast.unparse(base) for base in node.bases)
+                module.symbols.append(Symbol(
+                    kind="class",
+                    name=node.name,
+                    signature=f"class {node.name}({bases}):" if bases else f"class {node.name}:",
+                    doc=cls._first_line(ast.get_docstring(node))
+                ))
+                for item in node.body:
+                    if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and (
+                        cls._is_public(item.name) or item.name == "__init__"
+                    ):
+                        module.symbols.append(cls._python_function(item, parent=node.name))
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if not isinstance(target, ast.Name):
+                        continue
+                    if target.id == "__all__" and isinstance(node.value, (ast.List, ast.Tuple)):
+                        module.exports = [
+                            element.value for element in node.value.elts
+                            if isinstance(element, ast.Constant) and isinstance(element.value, str)
+                        ]
+                    elif target.id.isupper():
+                        annotation = f": {ast.unparse(node.annotation)}" if isinstance(node, ast.AnnAssign) else ""
+                        module.symbols.append(Symbol(
+                            kind="constant",
+                            name=target.id,
+                            signature=f"{target.id}{annotation} = ..."
+                        ))
+        return module
+
+    @classmethod
+    def _python_function(cls, node, parent: Optional[str] = None) -> Symbol:
+        prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+        returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+        decorators = "".join(
+            f"@{ast.unparse(d)}\n" for d in node.decorator_list
+            if ast.unparse(d) in ("staticmethod", "classmethod", "property")
+        )
+        return Symbol(
+            kind="method" if parent else "function",
+            name=node.name,
+            signature=f"{decorators}{prefix} {node.name}({ast.unparse(node.args)}){returns}: ...",
+            doc=cls._first_line(ast.get_docstring(node)),
+            parent=parent
+        )
+
+    @staticmethod
+    def _parse_js(filename: str, content: str) -> ModuleSymbols:
+        language = "typescript" if PurePosixPath(filename).suffix.lower() in (".ts", ".tsx") else "javascript"
+        module = ModuleSymbols(filename=filename, language=language)
+        for line in content.splitlines():
+            match = JS_EXPORT_PATTERN.match(line)
+            if not match:
+                continue
+            function, params, klass, heritage, typename, type_rest, const, const_type = match.groups()
+            if function:
+                module.symbols.append(Symbol(kind="function", name=function,
+                                             signature=f"function {function}{params.rstrip()}"))
+            elif klass:
+                module.symbols.append(Symbol(kind="class", name=klass,
+                                             signature=f"class {klass}{heritage.rstrip()}"))
+            elif typename:
+                module.symbols.append(Symbol(kind="type", name=typename,
+                                             signature=JS_EXPORT_PREFIX.sub("", line).rstrip("{ \t")))
+            elif const:
+                annotation = f": {const_type.strip()}" if const_type else ""
+                module.symbols.append(Symbol(kind="constant", name=const,
+                                             signature=f"const {const}{annotation}"))
+        module.exports = [symbol.name for symbol in module.symbols]
+        return module
+
+    @staticmethod
+    def _parse_go(filename: str, content: str) -> ModuleSymbols:
+        module = ModuleSymbols(filename=filename, language="go")
+        for line in content.splitlines():
+            match = GO_DECL_PATTERN.match(line)
+            if not match:
+                continue
+            if match.group("name"):
+                receiver = f"({match.group('recv')}) " if match.group("recv") else ""
+                module.symbols.append(Symbol(
+                    kind="method" if receiver else "function",
+                    name=match.group("name"),
+                    signature=f"func {receiver}{match.group('name')}{match.group('sig').rstrip()}"
+                ))
+            else:
+                module.symbols.append(Symbol(
+                    kind="type",
+                    name=match.group("type"),
+                    signature=f"type {match.group('type')} {match.group('kind')}"
+                ))
+        module.exports = [symbol.name for symbol in module.symbols]
+        return module
+
+    @staticmethod
+    def _is_public(name: str) -> bool:
+        return not name.startswith("_")
+
+    @staticmethod
+    def _first_line(docstring: Optional[str]) -> Optional[str]:
+        if not docstring:
+            return None
+        return docstring.strip().splitlines()[0]
@@ -1,10 +1,15 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pydantic import BaseModel, Field
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from ..utils.llm import LLMClient
+from ..utils.deadline import Deadline, TaskTimeoutError
 from ..config.prompts import PromptManager
-from ..builder.agent import CodeFile
+from ..builder.agent import CodeFile, BuildResult
+from ..file_manager.diff_utils import extract_change_hunks
+from ..state.cache import ResultCache, content_hash
+from .routing import ReviewRouter, RouteDecision, SKIP, LIGHT
 
 
 class CodeIssue(BaseModel):
@@ -25,32 +30,70 @@ class ReviewResult(BaseModel):
     review_time: float
     reviewed_at: datetime = Field(default_factory=datetime.now)
     recommendations: List[str] = Field(default_factory=list)
+    review_mode: str = "full"  # "full", "diff" or "light"
+    cached: bool = False
 
 
 class ReviewerAgent:
-    def __init__(self, llm_client: LLMClient, prompt_manager: PromptManager):
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        prompt_manager: PromptManager,
+        diff_max_change_ratio: float = 0.3,
+        diff_context_lines: int = 3,
+        result_cache: Optional[ResultCache] = None,
+        router: Optional[ReviewRouter] = None
+    ):
         self.llm_client = llm_client
         self.prompt_manager = prompt_manager
+        self.result_cache = result_cache
+        self.router = router
         self.review_history: List[ReviewResult] = []
+        self.routing_log: List[Dict[str, Any]] = []
+        # Rewrites touching more than this share of a file get a full review
+        self.diff_max_change_ratio = diff_max_change_ratio
+        self.diff_context_lines = diff_context_lines
         
-    def review_code(self, task_id: str, code_file: CodeFile) -> ReviewResult:
-        """Review generated code"""
+    def review_code(
+        self,
+        task_id: str,
+        code_file: CodeFile,
+        deadline: Optional[Deadline] = None,
+        previous_code: Optional[str] = None,
+        route: Optional[RouteDecision] = None
+    ) -> ReviewResult:
+        """Review generated code
+        
+        When the previous version of the file is given and the change is
+        small, only the changed hunks are sent for review. `route` selects a
+        light review or a different model (see `ReviewRouter`).
+        """
         start_time = datetime.now()
+        light = route is not None and route.route == LIGHT
+        model = route.model if route is not None else None
         
         try:
-            review_prompt = self.prompt_manager.get_prompt(
-                "reviewer",
-                "code_review",
-                filename=code_file.filename,
-                code=code_file.code,
-                language=code_file.language,
-                task_id=task_id
-            )
+            review_prompt, review_mode = self._build_review_prompt(task_id, code_file, previous_code, light)
+            cache_key = self._cache_key(code_file, review_mode, previous_code, model)
+            
+            cached = self.result_cache.get(cache_key) if self.result_cache else None
+            if cached is not None:
+                result = ReviewResult(
+                    task_id=task_id,
+                    filename=code_file.filename,
+                    review_time=(datetime.now() - start_time).total_seconds(),
+                    cached=True,
+                    **cached
+                )
+                self.review_history.append(result)
+                return result
             
             response = self.llm_client.generate(
                 prompt=review_prompt,
                 system_prompt=self.prompt_manager.get_prompt("reviewer", "system_prompt"),
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                deadline=deadline,
+                model=model
             )
             
             review_data = json.loads(response)
@@ -70,10 +113,7 @@ class ReviewerAgent:
             review_time = (datetime.now() - start_time).total_seconds()
             
             # Determine if passed (no critical issues)
-            passed = not any(
-                issue.severity == "critical" and issue.type in ["bug", "security"]
-                for issue in issues
-            )
+            passed = not any(self.is_blocking(issue) for issue in issues)
             
             result = ReviewResult(
                 task_id=task_id,
@@ -82,12 +122,19 @@ class ReviewerAgent:
                 overall_score=review_data.get("overall_score", 0.8),
                 passed=passed,
                 review_time=review_time,
-                recommendations=review_data.get("recommendations", [])
+                recommendations=review_data.get("recommendations", []),
+                review_mode=review_mode
             )
             
+            if self.result_cache:
+                self.result_cache.put(cache_key, result.dict(include={
+                    "issues", "overall_score", "passed", "recommendations", "review_mode"
+                }))
             self.review_history.append(result)
             return result
             
+        except TaskTimeoutError:
+            raise
         except Exception as e:
             review_time = (datetime.now() - start_time).total_seconds()
             
@@ -107,10 +154,191 @@ class ReviewerAgent:
             self.review_history.append(result)
             return result
     
+    def _build_review_prompt(
+        self,
+        task_id: str,
+        code_file: CodeFile,
+        previous_code: Optional[str],
+        light: bool = False
+    ) -> Tuple[str, str]:
+        """Pick diff, light or full review for a file and build its prompt"""
+        if previous_code is not None and previous_code != code_file.code:
+            hunks, change_ratio = extract_change_hunks(
+                previous_code, code_file.code, self.diff_context_lines
+            )
+            if change_ratio <= self.diff_max_change_ratio:
+                return self.prompt_manager.get_prompt(
+                    "reviewer",
+                    "code_review_diff",
+                    filename=code_file.filename,
+                    diff=hunks,
+                    language=code_file.language,
+                    task_id=task_id
+                ), "diff"
+        
+        if light:
+            return self.prompt_manager.get_prompt(
+                "reviewer",
+                "code_review_light",
+                filename=code_file.filename,
+                code=code_file.code,
+                language=code_file.language,
+                task_id=task_id
+            ), "light"
+        
+        return self.prompt_manager.get_prompt(
+            "reviewer",
+            "code_review",
+            filename=code_file.filename,
+            code=code_file.code,
+            language=code_file.language,
+            task_id=task_id
+        ), "full"
+    
+    def _cache_key(
+        self,
+        code_file: CodeFile,
+        review_mode: str,
+        previous_code: Optional[str],
+        model: Optional[str] = None
+    ) -> str:
+        """Cache key of a review: same code, prompt and model give the same review"""
+        template = {"diff": "code_review_diff", "light": "code_review_light"}.get(review_mode, "code_review")
+        # A diff review depends on the version it is compared against too
+        content = [previous_code, code_file.code] if review_mode == "diff" else code_file.code
+        return ResultCache.key(
+            content_hash(content),
+            code_file.language,
+            self.prompt_manager.get_prompt_version("reviewer", "system_prompt", template),
+            self.llm_client.model_id(model)
+        )
+    
+    def review_build(
+        self,
+        build_result: BuildResult,
+        deadline: Optional[Deadline] = None,
+        previous_versions: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Review all files of a build concurrently
+        
+        Requests run in parallel, bounded by the LLM client's global
+        concurrency limit. As soon as one file has a critical bug or security
+        issue the remaining reviews are cancelled, since the build will be
+        rejected anyway. Files found in `previous_versions` get a diff-only
+        review. With a router, each file is skipped or given a light or full
+        review according to its route. Returns the `get_review_summary`
+        shape plus `short_circuited`, `skipped_files`, `blocking_issues` and
+        `routes`.
+        """
+        previous_versions = previous_versions or {}
+        if not build_result.files:
+            return {}
+        
+        routes: Dict[str, Optional[RouteDecision]] = {}
+        for code_file in build_result.files:
+            route = self.router.route(code_file) if self.router else None
+            routes[code_file.filename] = route
+            if route is not None:
+                self.routing_log.append({
+                    "task_id": build_result.task_id,
+                    "filename": code_file.filename,
+                    "route": route.route,
+                    "reason": route.reason,
+                    "model": route.model
+                })
+        to_review = [
+            code_file for code_file in build_result.files
+            if routes[code_file.filename] is None or routes[code_file.filename].route != SKIP
+        ]
+        
+        # Cancelling this deadline aborts the reviews still in flight
+        review_deadline = deadline.child() if deadline is not None else Deadline()
+        reviews: List[ReviewResult] = []
+        skipped: List[str] = []
+        short_circuited = False
+        
+        # More threads than LLM slots would only queue inside the client, and queued
+        # reviews can still be cancelled here when an earlier one short-circuits
+        workers = max(1, min(len(to_review), self.llm_client.settings.max_concurrent_llm_calls))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="review") as executor:
+            futures = {
+                executor.submit(
+                    self.review_code,
+                    build_result.task_id,
+                    code_file,
+                    review_deadline,
+                    previous_versions.get(code_file.filename),
+                    routes[code_file.filename]
+                ): code_file
+                for code_file in to_review
+            }
+            
+            for future in as_completed(futures):
+                if future.cancelled():
+                    skipped.append(futures[future].filename)
+                    continue
+                try:
+                    review = future.result()
+                except TaskTimeoutError:
+                    if not short_circuited:
+                        raise
+                    skipped.append(futures[future].filename)
+                    continue
+                
+                reviews.append(review)
+                if not short_circuited and any(self.is_blocking(issue) for issue in review.issues):
+                    short_circuited = True
+                    review_deadline.cancel()
+                    for pending in futures:
+                        pending.cancel()
+        
+        summary = self._summarize(reviews)
+        summary.update({
+            "short_circuited": short_circuited,
+            "skipped_files": skipped,
+            "blocking_issues": [
+                f"{review.filename}: {issue.description}"
+                for review in reviews
+                for issue in review.issues
+                if self.is_blocking(issue)
+            ],
+            "routes": {
+                filename: route.route
+                for filename, route in routes.items()
+                if route is not None
+            }
+        })
+        return summary
+    
+    @staticmethod
+    def is_blocking(issue: CodeIssue) -> bool:
+        """Critical bugs and security issues fail a review"""
+        return issue.severity == "critical" and issue.type in ["bug", "security"]
+    
+    def get_capacity_report(self) -> Dict[str, Any]:
+        """How review capacity was spent: files and LLM seconds per review mode"""
+        report: Dict[str, Any] = {
+            mode: {"files": 0, "seconds": 0.0, "cached": 0}
+            for mode in ("full", "diff", "light")
+        }
+        for review in self.review_history:
+            entry = report.setdefault(review.review_mode, {"files": 0, "seconds": 0.0, "cached": 0})
+            entry["files"] += 1
+            if review.cached:
+                entry["cached"] += 1
+            else:
+                entry["seconds"] += review.review_time
+        report["skipped"] = sum(1 for entry in self.routing_log if entry["route"] == SKIP)
+        report["escalated"] = sum(1 for entry in self.routing_log if entry["model"])
+        return report
+    
     def get_review_summary(self, task_id: str) -> Dict[str, Any]:
         """Get summary of reviews for a task"""
         task_reviews = [r for r in self.review_history if r.task_id == task_id]
-        
+        return self._summarize(task_reviews)
+    
+    def _summarize(self, task_reviews: List[ReviewResult]) -> Dict[str, Any]:
+        """Aggregate review results into a summary"""
         if not task_reviews:
             return {}
         
@@ -0,0 +1,94 @@
+"""
+Review routing - decides how much review each generated file gets
+"""
+
+from pathlib import PurePosixPath
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+from ..builder.agent import CodeFile
+from ..utils.safety import SafetyChecker
+
+
+SKIP = "skip"
+LIGHT = "light"
+FULL = "full"
+
+# Generated or purely descriptive files nobody reviews line by line
+LOCKFILES = {
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "poetry.lock",
+    "Pipfile.lock", "Cargo.lock", "go.sum", "composer.lock", "uv.lock"
+}
+DOC_FILENAMES = {"LICENSE", ".gitignore", ".dockerignore", "requirements.txt"}
+DOC_EXTENSIONS = {".md", ".rst", ".txt"}
+CONFIG_EXTENSIONS = {".json", ".yml", ".yaml", ".toml", ".ini", ".cfg"}
+
+
+class RouteDecision(BaseModel):
+    route: str  # "skip", "light" or "full"
+    reason: str
+    model: Optional[str] = None  # Model override for the review, None for the default
+    safety_flags: List[str] = Field(default_factory=list)
+
+
+class ReviewRouter:
+    """Spend review capacity where it matters.
+
+    - Anything `SafetyChecker` flags gets a full review, on the escalation
+      model when one is configured.
+    - Lockfiles, docs and small configs are skipped: the static validator
+      has already checked that they parse.
+    - Code below `confidence_threshold` gets a full review on the
+      escalation model.
+    - Short, high-confidence files get a light review that only looks for
+      critical bugs and security issues.
+    - Everything else gets a normal full review.
+    """
+
+    def __init__(
+        self,
+        confidence_threshold: float = 0.7,
+        escalation_model: Optional[str] = None,
+        light_max_lines: int = 40,
+        skip_config_max_lines: int = 50
+    ):
+        self.confidence_threshold = confidence_threshold
+        self.escalation_model = escalation_model
+        self.light_max_lines = light_max_lines
+        self.skip_config_max_lines = skip_config_max_lines
+
+    def route(self, code_file: CodeFile) -> RouteDecision:
+        path = PurePosixPath(code_file.filename)
+        suffix = path.suffix.lower()
+        lines = code_file.code.count("\n") + 1
+
+        flags = (
+            SafetyChecker.check_for_sensitive_patterns(code_file.code)
+            + SafetyChecker.check_executable_content(code_file.code, code_file.filename)
+        )
+        if flags:
+            return RouteDecision(
+                route=FULL,
+                reason="flagged by safety checks",
+                model=self.escalation_model,
+                safety_flags=flags
+            )
+
+        if path.name in LOCKFILES:
+            return RouteDecision(route=SKIP, reason="lockfile")
+        if path.name in DOC_FILENAMES or suffix in DOC_EXTENSIONS:
+            return RouteDecision(route=SKIP, reason="documentation")
+        if suffix in CONFIG_EXTENSIONS:
+            if lines <= self.skip_config_max_lines:
+                return RouteDecision(route=SKIP, reason="small config")
+            return RouteDecision(route=LIGHT, reason="large config")
+
+        if code_file.confidence_score < self.confidence_threshold:
+            return RouteDecision(
+                route=FULL,
+                reason=f"low confidence ({code_file.confidence_score:.2f})",
+                model=self.escalation_model
+            )
+        if lines <= self.light_max_lines:
+            return RouteDecision(route=LIGHT, reason="short high-confidence file")
+        return RouteDecision(route=FULL, reason="default")
@@ -2,4 +2,11 @@
 State persistence module
 """
 
-# Will be implemented later
\ No newline at end of file
+from .store import StateStore
+from .cache import ResultCache, content_hash
+
+__all__ = [
+    "StateStore",
+    "ResultCache",
+    "content_hash",
+]
@@ -0,0 +1,45 @@
+"""
+Result cache for LLM reviews and validations
+"""
+
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Optional
+
+from .store import StateStore
+
+
+def content_hash(content: Any) -> str:
+    """Hash of file content (or of any JSON-serializable group of files)"""
+    if not isinstance(content, str):
+        content = json.dumps(content, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """LLM results keyed on what actually determines them.
+
+    A key combines the content hash, the language, the version of the prompt
+    template and the model. Changing any of them - including editing the
+    template - yields a different key, so stale results are never returned.
+    """
+
+    def __init__(self, store: StateStore, namespace: str):
+        self.store = store
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def key(content_digest: str, language: str, prompt_version: str, model: str) -> str:
+        return f"{content_digest}:{language}:{prompt_version}:{model}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.store.get(self.namespace, key)
+        with self._lock:
+            self.stats["hits" if value is not None else "misses"] += 1
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]):
+        self.store.put(self.namespace, key, value)
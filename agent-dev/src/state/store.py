@@ -0,0 +1,82 @@
+"""
+State Store - persistent key/value storage shared by the agents
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class StateStore:
+    """SQLite-backed store of JSON values grouped by namespace.
+
+    A single connection is shared between threads and serialized with a
+    lock; WAL mode keeps readers from blocking on writes. Use ":memory:" as
+    `path` for a store that does not outlive the process.
+    """
+
+    def __init__(self, path: str = ".agent_state/state.db"):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )"""
+            )
+            self._conn.commit()
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Return the stored value, or None if there is none"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM entries WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, namespace: str, key: str, value: Any):
+        """Store a JSON-serializable value, replacing any previous one"""
+        payload = json.dumps(value, separators=(',', ':'), default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, payload, time.time())
+            )
+            self._conn.commit()
+
+    def delete(self, namespace: str, key: Optional[str] = None) -> int:
+        """Delete one entry, or the whole namespace when no key is given"""
+        with self._lock:
+            if key is None:
+                cursor = self._conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+            else:
+                cursor = self._conn.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+                )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def items(self, namespace: str) -> Dict[str, Any]:
+        """All entries of a namespace"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM entries WHERE namespace = ?", (namespace,)
+            ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -5,6 +5,9 @@ Task management module
 from .manager import TaskManager
 from .state_machine import TaskStateMachine
 from .models import Task, TaskDependency, TaskStatus
+from .retry import RetryScheduler
+from .static_validator import StaticValidator
+from .write_sets import WriteSetScheduler
 
 __all__ = [
     "TaskManager",
@@ -12,4 +15,7 @@ __all__ = [
     "Task",
     "TaskDependency",
     "TaskStatus",
+    "RetryScheduler",
+    "StaticValidator",
+    "WriteSetScheduler",
 ]
\ No newline at end of file
@@ -2,23 +2,77 @@
 AI Task Decomposer - breaks down PRD into executable tasks for AI agents
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
 import json
 from .models import Task, TaskStatus
 from src.utils.llm import LLMClient
+from src.utils.deadline import Deadline, TaskTimeoutError
+from src.utils.json_stream import JSONArrayStreamParser
+from src.utils.logger import get_logger
+from src.state.cache import ResultCache, content_hash
+
+
+logger = get_logger(__name__)
+
+# Bump whenever the validation prompts below change, so cached verdicts are dropped
+VALIDATION_PROMPT_VERSION = "1"
 
 
 class AITaskDecomposer:
     """Decompose PRD into AI-executable tasks"""
     
-    def __init__(self, llm_client: LLMClient):
+    def __init__(self, llm_client: LLMClient, result_cache: Optional[ResultCache] = None):
         self.llm_client = llm_client
+        self.result_cache = result_cache
         self.task_counter = 1
     
-    def decompose_prd(self, prd: Dict[str, Any]) -> List[Task]:
-        """Decompose PRD into granular tasks for AI agents"""
+    def decompose_prd(
+        self,
+        prd: Dict[str, Any],
+        deadline: Optional[Deadline] = None,
+        on_task: Optional[Callable[[Task], None]] = None
+    ) -> List[Task]:
+        """Decompose PRD into granular tasks for AI agents
+        
+        The response is streamed and each task is handed to `on_task` as soon
+        as its JSON object closes, so callers can start scheduling before the
+        whole decomposition has been generated.
+        """
+        tasks = []
+        try:
+            for task in self.iter_tasks(prd, deadline=deadline):
+                tasks.append(task)
+                if on_task:
+                    on_task(task)
+        except Exception as e:
+            # Tasks already handed out stay valid; only an empty stream is an error
+            if not tasks:
+                raise
+            logger.warning(f"Decomposition stream ended early after {len(tasks)} tasks: {e}")
+        
+        if not tasks:
+            # Fallback to basic tasks
+            tasks = self._create_fallback_tasks(prd)
+            if on_task:
+                for task in tasks:
+                    on_task(task)
+        
+        return tasks
+    
+    def iter_tasks(self, prd: Dict[str, Any], deadline: Optional[Deadline] = None) -> Iterator[Task]:
+        """Yield tasks one by one while the decomposition is being generated"""
+        parser = JSONArrayStreamParser()
         
-        decomposition_prompt = f"""Decompose this PRD into executable development tasks for AI agents:
+        for chunk in self.llm_client.generate_stream(self._build_decomposition_prompt(prd), deadline=deadline):
+            for task_dict in parser.feed(chunk):
+                if isinstance(task_dict, dict):
+                    yield self._task_from_dict(task_dict, prd)
+            if parser.finished:
+                break
+    
+    def _build_decomposition_prompt(self, prd: Dict[str, Any]) -> str:
+        """Build the decomposition prompt for a PRD"""
+        return f"""Decompose this PRD into executable development tasks for AI agents:
 
 {json.dumps(prd, indent=2)}
 
@@ -42,38 +96,30 @@ Rules:
 3. Include testing tasks for each feature
 4. End with deployment/documentation
 5. Maximum 20 tasks for initial phase
-6. Each task should be completable in 1-4 hours by an AI agent"""
-
-        try:
-            response = self.llm_client.generate(decomposition_prompt)
-            task_data = json.loads(response)
-            
-            tasks = []
-            for task_dict in task_data:
-                task = Task(
-                    id=task_dict.get("id", f"TASK-{self.task_counter}"),
-                    description=task_dict.get("description", "Unknown task"),
-                    status=TaskStatus.PENDING,
-                    priority=task_dict.get("priority", 3),
-                    estimated_hours=task_dict.get("estimated_hours", 2.0),
-                    metadata={
-                        "type": task_dict.get("type", "feature"),
-                        "dependencies": task_dict.get("dependencies", []),
-                        "acceptance_criteria": task_dict.get("acceptance_criteria", []),
-                        "files_to_create": task_dict.get("files_to_create", []),
-                        "technical_requirements": task_dict.get("technical_requirements", []),
-                        "ai_instructions": task_dict.get("ai_instructions", ""),
-                        "prd_reference": prd.get("metadata", {}).get("prd_id", "unknown")
-                    }
-                )
-                tasks.append(task)
-                self.task_counter += 1
-            
-            return tasks
-            
-        except json.JSONDecodeError:
-            # Fallback to basic tasks
-            return self._create_fallback_tasks(prd)
+6. Each task should be completable in 1-4 hours by an AI agent
+7. List tasks in dependency order: a task may only depend on tasks listed before it"""
+    
+    def _task_from_dict(self, task_dict: Dict[str, Any], prd: Dict[str, Any]) -> Task:
+        """Build a Task from one decoded element of the decomposition array"""
+        task = Task(
+            id=task_dict.get("id", f"TASK-{self.task_counter}"),
+            description=task_dict.get("description", "Unknown task"),
+            status=TaskStatus.PENDING,
+            priority=task_dict.get("priority", 3),
+            estimated_hours=task_dict.get("estimated_hours", 2.0),
+            dependencies=task_dict.get("dependencies", []),
+            metadata={
+                "type": task_dict.get("type", "feature"),
+                "dependencies": task_dict.get("dependencies", []),
+                "acceptance_criteria": task_dict.get("acceptance_criteria", []),
+                "files_to_create": task_dict.get("files_to_create", []),
+                "technical_requirements": task_dict.get("technical_requirements", []),
+                "ai_instructions": task_dict.get("ai_instructions", ""),
+                "prd_reference": prd.get("metadata", {}).get("prd_id", "unknown")
+            }
+        )
+        self.task_counter += 1
+        return task
     
     def _create_fallback_tasks(self, prd: Dict[str, Any]) -> List[Task]:
         """Create fallback tasks if decomposition fails"""
@@ -117,8 +163,16 @@ Rules:
             )
         ]
     
-    def validate_task_completion(self, task: Task, generated_files: Dict[str, str]) -> Dict[str, Any]:
+    def validate_task_completion(
+        self,
+        task: Task,
+        generated_files: Dict[str, str],
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
         """Validate if a task was completed successfully by AI agent"""
+        cached = self.get_cached_validation(task, generated_files)
+        if cached is not None:
+            return cached
         
         validation_prompt = f"""Validate if this development task was completed successfully:
 
@@ -139,8 +193,13 @@ Return JSON with:
 }}"""
 
         try:
-            response = self.llm_client.generate(validation_prompt)
-            return json.loads(response)
+            response = self.llm_client.generate(validation_prompt, deadline=deadline)
+            verdict = json.loads(response)
+            self._cache_validation(task, generated_files, verdict)
+            return verdict
+        except TaskTimeoutError:
+            # A timed-out validation must not count as a pass
+            raise
         except:
             return {
                 "passed": True,  # Default to passed to keep moving
@@ -148,4 +207,96 @@ Return JSON with:
                 "issues": [],
                 "suggestions": [],
                 "can_proceed": True
-            }
\ No newline at end of file
+            }
+    
+    def validate_tasks_batch(
+        self,
+        items: List[Tuple[Task, Dict[str, str]]],
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Validate several small tasks with a single LLM call
+        
+        Returns a verdict per task id, in the same shape as
+        `validate_task_completion`. Tasks the model leaves out of its answer
+        are validated individually.
+        """
+        if len(items) == 1:
+            task, generated_files = items[0]
+            return {task.id: self.validate_task_completion(task, generated_files, deadline=deadline)}
+        
+        sections = []
+        for task, generated_files in items:
+            sections.append(f"""### TASK {task.id}
+TASK: {task.description}
+TASK INSTRUCTIONS: {task.metadata.get('ai_instructions', 'No specific instructions')}
+ACCEPTANCE CRITERIA: {task.metadata.get('acceptance_criteria', ['Complete the task'])}
+GENERATED FILES: {json.dumps(generated_files, separators=(',', ':'))}""")
+        
+        validation_prompt = f"""Validate if each of these development tasks was completed successfully.
+Judge every task independently.
+
+{chr(10).join(sections)}
+
+Return JSON with one verdict per task:
+{{
+  "results": [
+    {{
+      "task_id": "TASK-1",
+      "passed": true/false,
+      "score": 0-100,
+      "issues": ["list of issues found"],
+      "suggestions": ["suggestions for improvement"],
+      "can_proceed": true/false
+    }}
+  ]
+}}"""
+
+        verdicts: Dict[str, Dict[str, Any]] = {}
+        try:
+            response = self.llm_client.generate(
+                validation_prompt,
+                response_format={"type": "json_object"},
+                deadline=deadline
+            )
+            for result in json.loads(response).get("results", []):
+                if isinstance(result, dict) and result.get("task_id"):
+                    verdicts[result.pop("task_id")] = result
+            for task, generated_files in items:
+                if task.id in verdicts:
+                    self._cache_validation(task, generated_files, verdicts[task.id])
+        except TaskTimeoutError:
+            raise
+        except Exception as e:
+            logger.warning(f"Batch validation failed, validating tasks individually: {e}")
+        
+        for task, generated_files in items:
+            if task.id not in verdicts:
+                verdicts[task.id] = self.validate_task_completion(task, generated_files, deadline=deadline)
+        
+        return verdicts
+    
+    def get_cached_validation(self, task: Task, generated_files: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Verdict of an earlier validation of the same task and files, if any"""
+        if self.result_cache is None:
+            return None
+        return self.result_cache.get(self._validation_cache_key(task, generated_files))
+    
+    def _cache_validation(self, task: Task, generated_files: Dict[str, str], verdict: Dict[str, Any]):
+        if self.result_cache is not None and isinstance(verdict, dict):
+            self.result_cache.put(self._validation_cache_key(task, generated_files), verdict)
+    
+    def _validation_cache_key(self, task: Task, generated_files: Dict[str, str]) -> str:
+        # The verdict depends on the task spec as much as on the files
+        content = {
+            "task": task.description,
+            "instructions": task.metadata.get('ai_instructions'),
+            "criteria": task.metadata.get('acceptance_criteria'),
+            "files": generated_files
+        }
+        languages = sorted({name.rsplit(".", 1)[-1].lower() for name in generated_files if "." in name})
+        return ResultCache.key(
+            content_hash(content),
+            ",".join(languages),
+            VALIDATION_PROMPT_VERSION,
+            self.llm_client.model_id()
+        )
@@ -2,6 +2,7 @@ from typing import List, Dict, Any, Optional
 from enum import Enum
 from pydantic import BaseModel, Field
 import networkx as nx
+import threading
 from datetime import datetime
 from .state_machine import TaskStateMachine
 from .models import Task, TaskDependency, TaskStatus
@@ -13,6 +14,10 @@ class TaskManager:
         self.task_graph = nx.DiGraph()
         self.state_machine = TaskStateMachine()
         self.task_counter = 0
+        # While intake is open (e.g. decomposition still streaming), unknown
+        # dependencies count as unmet instead of being ignored
+        self.intake_open = False
+        self._changed = threading.Condition(threading.RLock())
         
     def create_tasks_from_prd(self, prd: Dict[str, Any]) -> List[Task]:
         """Create granular tasks from PRD"""
@@ -60,50 +65,86 @@ class TaskManager:
         return development_tasks
     
     def add_task(self, task: Task) -> None:
-        """Add a task to the manager"""
-        self.tasks[task.id] = task
-        self.task_graph.add_node(task.id, task=task)
-        
-        for dep_id in task.dependencies:
-            if dep_id in self.tasks:
-                self.task_graph.add_edge(dep_id, task.id)
+        """Add a task to the manager (thread-safe, may be called while tasks are running)"""
+        with self._changed:
+            self.tasks[task.id] = task
+            self.task_graph.add_node(task.id, task=task)
+            
+            for dep_id in task.dependencies:
+                if dep_id in self.tasks:
+                    self.task_graph.add_edge(dep_id, task.id)
+            
+            # Link tasks that arrived earlier and depend on this one
+            for other in self.tasks.values():
+                if task.id in other.dependencies:
+                    self.task_graph.add_edge(task.id, other.id)
+            
+            self._changed.notify_all()
+    
+    def open_intake(self) -> None:
+        """Mark that more tasks are still being added"""
+        with self._changed:
+            self.intake_open = True
+    
+    def close_intake(self) -> None:
+        """Mark that all tasks have been added"""
+        with self._changed:
+            self.intake_open = False
+            self._changed.notify_all()
+    
+    def wait_for_change(self, timeout: Optional[float] = None) -> None:
+        """Block until a task is added, changes status or intake closes"""
+        with self._changed:
+            self._changed.wait(timeout)
+    
+    def notify_change(self) -> None:
+        """Wake threads in `wait_for_change`, e.g. when a running task frees its slot"""
+        with self._changed:
+            self._changed.notify_all()
+    
+    def count_by_status(self, status: TaskStatus) -> int:
+        with self._changed:
+            return sum(1 for task in self.tasks.values() if task.status == status)
     
     def get_ready_tasks(self) -> List[Task]:
         """Get tasks that are ready to execute (all dependencies satisfied)"""
         ready_tasks = []
         
-        for task_id, task in self.tasks.items():
-            if task.status == TaskStatus.PENDING:
-                dependencies_met = all(
-                    self.tasks[dep_id].status == TaskStatus.COMPLETED
-                    for dep_id in task.dependencies
-                    if dep_id in self.tasks
-                )
-                
-                if dependencies_met:
-                    ready_tasks.append(task)
+        with self._changed:
+            for task_id, task in self.tasks.items():
+                if task.status == TaskStatus.PENDING:
+                    dependencies_met = all(
+                        self.tasks[dep_id].status == TaskStatus.COMPLETED
+                        if dep_id in self.tasks else not self.intake_open
+                        for dep_id in task.dependencies
+                    )
+                    
+                    if dependencies_met:
+                        ready_tasks.append(task)
         
         return ready_tasks
     
     def update_task_status(self, task_id: str, status: TaskStatus) -> bool:
         """Update task status using state machine"""
-        if task_id not in self.tasks:
-            return False
-        
-        task = self.tasks[task_id]
-        
-        if self.state_machine.can_transition(task.status, status):
-            task.status = status
-            task.updated_at = datetime.now()
+        with self._changed:
+            if task_id not in self.tasks:
+                return False
             
-            if status == TaskStatus.COMPLETED:
-                task.completed_at = datetime.now()
-            elif status == TaskStatus.IN_PROGRESS:
-                task.started_at = datetime.now()
+            task = self.tasks[task_id]
             
-            return True
-        
-        return False
+            if self.state_machine.can_transition(task.status, status):
+                task.status = status
+                task.updated_at = datetime.now()
+                
+                if status == TaskStatus.COMPLETED:
+                    task.completed_at = datetime.now()
+                elif status == TaskStatus.IN_PROGRESS:
+                    task.started_at = datetime.now()
+                
+                self._changed.notify_all()
+                return True
+            
+            return False
     
     def get_task_dependencies(self, task_id: str) -> List[Task]:
         """Get all dependencies for a task"""
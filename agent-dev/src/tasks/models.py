@@ -2,7 +2,7 @@
 Task models for the software development agent
 """
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from enum import Enum
 from pydantic import BaseModel, Field
@@ -46,6 +46,7 @@ class Task(BaseModel):
     assignee: Optional[str] = None
     tags: List[str] = Field(default_factory=list)
     notes: Optional[str] = None
+    metadata: Dict[str, Any] = Field(default_factory=dict)  # Decomposer output (type, files_to_create, ...)
     
     class Config:
         json_encoders = {
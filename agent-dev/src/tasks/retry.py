@@ -0,0 +1,93 @@
+"""
+Retry scheduling for failed tasks
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .models import Task
+
+
+class RetryScheduler:
+    """Queue of FAILED tasks waiting for another attempt.
+
+    Each task has a retry budget; attempts are spaced with exponential
+    backoff. The failure feedback (build error, validation issues, ...) is
+    kept in `task.metadata["retry_feedback"]` so the next build can address it.
+    Conflict requeues are free but capped separately, at `max_conflict_requeues`
+    (`max_retries` by default).
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 5.0,
+        max_delay: float = 120.0,
+        max_conflict_requeues: Optional[int] = None
+    ):
+        self.max_retries = max_retries
+        self.max_conflict_requeues = max_retries if max_conflict_requeues is None else max_conflict_requeues
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._queue: List[Tuple[float, int, str]] = []
+        self._counter = itertools.count()
+        self._attempts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def schedule(self, task: Task, feedback: List[str]) -> bool:
+        """Queue a failed task for retry; returns False once its budget is spent"""
+        with self._lock:
+            attempts = self._attempts.get(task.id, 0)
+            if attempts >= self.max_retries:
+                return False
+
+            self._attempts[task.id] = attempts + 1
+            task.metadata["attempts"] = attempts + 1
+            task.metadata["retry_feedback"] = feedback
+
+            delay = min(self.max_delay, self.base_delay * (2 ** attempts))
+            heapq.heappush(self._queue, (time.monotonic() + delay, next(self._counter), task.id))
+            return True
+
+    def requeue(self, task: Task, feedback: List[str]) -> bool:
+        """Queue a task for an immediate new attempt that does not count against its budget
+
+        For failures that are not the task's fault, such as a merge conflict
+        with a task that ran at the same time. Returns False once the task
+        has been requeued `max_conflict_requeues` times; a task that keeps
+        conflicting then goes through `schedule` and its normal budget.
+        """
+        with self._lock:
+            requeues = task.metadata.get("conflict_requeues", 0)
+            if requeues >= self.max_conflict_requeues:
+                return False
+
+            task.metadata["conflict_requeues"] = requeues + 1
+            task.metadata["retry_feedback"] = feedback
+            heapq.heappush(self._queue, (time.monotonic(), next(self._counter), task.id))
+            return True
+
+    def pop_due(self, limit: Optional[int] = None) -> List[str]:
+        """Remove and return the ids of tasks whose backoff has elapsed"""
+        due = []
+        now = time.monotonic()
+        with self._lock:
+            while self._queue and self._queue[0][0] <= now and (limit is None or len(due) < limit):
+                due.append(heapq.heappop(self._queue)[2])
+        return due
+
+    def next_due_in(self) -> Optional[float]:
+        """Seconds until the next retry is due, or None if nothing is queued"""
+        with self._lock:
+            if not self._queue:
+                return None
+            return max(0.0, self._queue[0][0] - time.monotonic())
+
+    def attempts(self, task_id: str) -> int:
+        return self._attempts.get(task_id, 0)
+
+    def __len__(self) -> int:
+        return len(self._queue)
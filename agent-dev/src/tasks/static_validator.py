@@ -0,0 +1,132 @@
+"""
+Static Validator - cheap local checks run before LLM validation
+"""
+
+import json
+from pathlib import PurePosixPath
+from typing import Any, Dict, List
+
+from .models import Task
+
+try:
+    import yaml
+except ImportError:  # pyyaml is optional
+    yaml = None
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+# JSONDecodeError and TOMLDecodeError are ValueErrors
+PARSE_ERRORS = (ValueError, yaml.YAMLError) if yaml is not None else (ValueError,)
+
+if yaml is not None:
+    class TaggedSafeLoader(yaml.SafeLoader):
+        """SafeLoader that accepts application tags (CloudFormation `!Ref`, Ansible `!vault`, ...)"""
+
+    # Unknown tags are only checked for syntax; their nodes are returned as-is
+    TaggedSafeLoader.add_multi_constructor("!", lambda loader, suffix, node: node)
+
+
+# Artifacts that need no semantic review once they parse
+TRIVIAL_EXTENSIONS = {".md", ".rst", ".txt", ".json", ".yml", ".yaml", ".toml", ".ini", ".cfg"}
+TRIVIAL_FILENAMES = {"requirements.txt", ".gitignore", ".dockerignore", ".env.example", "LICENSE"}
+
+# Files that are legitimately empty
+EMPTY_ALLOWED = {"__init__.py", ".gitkeep", "py.typed"}
+
+
+class StaticValidator:
+    """Parse-level checks on generated files
+
+    Returns results in the same shape as
+    `AITaskDecomposer.validate_task_completion`, plus `skip_llm` when the
+    output is trivial enough that LLM validation adds nothing.
+    """
+
+    def __init__(self, skip_llm_for_trivial: bool = True):
+        self.skip_llm_for_trivial = skip_llm_for_trivial
+
+    def check(self, task: Task, generated_files: Dict[str, str]) -> Dict[str, Any]:
+        """Run all static checks for a task's generated files"""
+        issues = self._check_expected_files(task, generated_files)
+
+        for filename, code in generated_files.items():
+            issues.extend(self.check_file(filename, code))
+
+        if issues:
+            return {
+                "passed": False,
+                "score": 0,
+                "issues": issues,
+                "suggestions": [],
+                "can_proceed": False,
+                "skip_llm": True
+            }
+
+        trivial = bool(generated_files) and all(self._is_trivial(name) for name in generated_files)
+        return {
+            "passed": True,
+            "score": 90,
+            "issues": [],
+            "suggestions": [],
+            "can_proceed": True,
+            "skip_llm": self.skip_llm_for_trivial and trivial
+        }
+
+    def check_file(self, filename: str, code: str) -> List[str]:
+        """Check a single file; returns a list of issues"""
+        name = PurePosixPath(filename).name
+        suffix = PurePosixPath(filename).suffix.lower()
+
+        if not code.strip():
+            return [] if name in EMPTY_ALLOWED else [f"{filename}: file is empty"]
+
+        try:
+            if suffix == ".py":
+                compile(code, filename, "exec")
+            elif suffix == ".json":
+                json.loads(code)
+            elif suffix in (".yml", ".yaml") and yaml is not None:
+                list(yaml.load_all(code, Loader=TaggedSafeLoader))
+            elif suffix == ".toml" and tomllib is not None:
+                tomllib.loads(code)
+        except SyntaxError as e:
+            return [f"{filename}: syntax error at line {e.lineno}: {e.msg}"]
+        except PARSE_ERRORS as e:
+            return [f"{filename}: invalid {suffix[1:].upper()}: {e}"]
+
+        return []
+
+    def _check_expected_files(self, task: Task, generated_files: Dict[str, str]) -> List[str]:
+        """Every declared file must be present (directory entries excepted)
+
+        A declared path counts as a directory when it ends with "/" or when
+        any generated file sits below it.
+        """
+        generated = {self._normalize(name) for name in generated_files}
+        missing = [
+            path for path in task.metadata.get("files_to_create", [])
+            if not path.endswith("/") and not self._is_present(self._normalize(path), generated)
+        ]
+        return [f"Missing expected file: {path}" for path in missing]
+
+    @staticmethod
+    def _is_present(path: str, generated: set) -> bool:
+        if path in generated:
+            return True
+        prefix = path.rstrip("/") + "/"
+        return any(name.startswith(prefix) for name in generated)
+
+    @staticmethod
+    def _normalize(path: str) -> str:
+        path = path.replace("\\", "/")
+        while path.startswith("./"):
+            path = path[2:]
+        return str(PurePosixPath(path))
+
+    @staticmethod
+    def _is_trivial(filename: str) -> bool:
+        path = PurePosixPath(filename)
+        return path.name in TRIVIAL_FILENAMES or path.suffix.lower() in TRIVIAL_EXTENSIONS
@@ -0,0 +1,166 @@
+"""
+Validation Batcher - packs small task validations into shared LLM calls
+"""
+
+import json
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .models import Task
+from .ai_decomposer import AITaskDecomposer
+from src.utils.deadline import Deadline, TaskTimeoutError
+
+
+class ValidationBatcher:
+    """Collect validation requests from concurrent workers and send them together.
+
+    Workers announce the tasks they run with `task_started` and
+    `task_finished`. A request that is small enough joins the pending
+    batch, which is sent as soon as no other announced task can still
+    join it - so a task running alone is validated right away - or else
+    once `window_seconds` have passed since the batch opened, or when
+    adding another request would exceed `max_batch_chars`. Large requests
+    bypass batching, since per-request overhead does not matter for them.
+    Every task keeps its own deadline: a batch runs until the loosest
+    deadline among its members, and a member whose deadline passed gets a
+    TaskTimeoutError instead of the shared verdict.
+    """
+
+    def __init__(
+        self,
+        decomposer: AITaskDecomposer,
+        window_seconds: float = 1.0,
+        max_batch_chars: int = 12000,
+        max_item_chars: int = 4000
+    ):
+        self.decomposer = decomposer
+        self.window_seconds = window_seconds
+        self.max_batch_chars = max_batch_chars
+        self.max_item_chars = max_item_chars
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[Task, Dict[str, str], Optional[Deadline], Future]] = []
+        self._pending_chars = 0
+        self._timer: Optional[threading.Timer] = None
+        self._expected: Set[str] = set()  # Running tasks that have not asked for validation yet
+        self.stats = {"requests": 0, "batches": 0}
+
+    def task_started(self, task_id: str):
+        """Announce a task that may ask for validation soon"""
+        with self._lock:
+            self._expected.add(task_id)
+
+    def task_finished(self, task_id: str):
+        """A task is done; the pending batch need not wait for it any more"""
+        with self._lock:
+            self._expected.discard(task_id)
+            batch = self._take_if_idle()
+        if batch:
+            self._send(batch)
+
+    def validate(
+        self,
+        task: Task,
+        generated_files: Dict[str, str],
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """Validate a task, possibly together with others; blocks until its verdict is in"""
+        cached = self.decomposer.get_cached_validation(task, generated_files)
+        if cached is not None:
+            self.task_finished(task.id)
+            return cached
+        
+        size = len(json.dumps(generated_files, separators=(',', ':')))
+        with self._lock:
+            self.stats["requests"] += 1
+
+        if size > self.max_item_chars or self.window_seconds <= 0:
+            self.task_finished(task.id)
+            with self._lock:
+                self.stats["batches"] += 1
+            return self.decomposer.validate_task_completion(task, generated_files, deadline=deadline)
+
+        future: Future = Future()
+        batches = []
+        with self._lock:
+            self._expected.discard(task.id)
+            if self._pending and self._pending_chars + size > self.max_batch_chars:
+                batches.append(self._take_batch())
+            self._pending.append((task, generated_files, deadline, future))
+            self._pending_chars += size
+            idle = self._take_if_idle()
+            if idle:
+                batches.append(idle)
+            elif self._timer is None:
+                # Other running tasks may still join; wait for them at most one window
+                self._timer = threading.Timer(self.window_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        for batch in batches:
+            self._send(batch)
+
+        timeout = deadline.remaining() if deadline is not None else None
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            raise TaskTimeoutError(f"Validation of {task.id} exceeded its deadline")
+
+    def flush(self):
+        """Send whatever is pending now"""
+        with self._lock:
+            batch = self._take_batch()
+        if batch:
+            self._send(batch)
+
+    def _take_if_idle(self) -> List[Tuple[Task, Dict[str, str], Optional[Deadline], Future]]:
+        """Detach the pending batch if no running task can still join it (caller holds the lock)"""
+        if self._pending and not self._expected:
+            return self._take_batch()
+        return []
+
+    def _take_batch(self) -> List[Tuple[Task, Dict[str, str], Optional[Deadline], Future]]:
+        """Detach the pending batch (caller holds the lock)"""
+        batch, self._pending, self._pending_chars = self._pending, [], 0
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def _send(self, batch: List[Tuple[Task, Dict[str, str], Optional[Deadline], Future]]):
+        # Members already out of time are not sent at all
+        live = []
+        for member in batch:
+            task, _, deadline, future = member
+            if deadline is not None and deadline.expired:
+                future.set_exception(TaskTimeoutError(f"Validation of {task.id} exceeded its deadline"))
+            else:
+                live.append(member)
+        if not live:
+            return
+
+        # The shared call may run as long as its most patient member waits
+        deadlines = [d for _, _, d, _ in live]
+        deadline = None
+        if all(d is not None for d in deadlines):
+            deadline = max(deadlines, key=lambda d: d.remaining() if d.remaining() is not None else float("inf"))
+            if deadline.remaining() is None:
+                deadline = None
+
+        with self._lock:
+            self.stats["batches"] += 1
+        try:
+            verdicts = self.decomposer.validate_tasks_batch(
+                [(task, files) for task, files, _, _ in live],
+                deadline=deadline
+            )
+        except Exception as e:
+            for *_, future in live:
+                future.set_exception(e)
+            return
+
+        for task, _, member_deadline, future in live:
+            if member_deadline is not None and member_deadline.expired:
+                future.set_exception(TaskTimeoutError(f"Validation of {task.id} exceeded its deadline"))
+            else:
+                future.set_result(verdicts[task.id])
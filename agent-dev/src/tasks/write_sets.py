@@ -0,0 +1,97 @@
+"""
+Write-set scheduling - runs tasks together only when they write different files
+"""
+
+import threading
+from pathlib import PurePosixPath
+from typing import Dict, Iterable, List, Set
+
+from .models import Task
+
+
+class WriteSetScheduler:
+    """Path-level ownership of the files running tasks declared they write.
+
+    A task's write set is its `files_to_create` plus `target_files`;
+    entries ending in "/" cover everything below that directory. `select`
+    claims the write sets of the tasks it picks, so tasks with disjoint
+    write sets run in parallel while a task overlapping a claimed path
+    waits for a later batch (if it runs alongside anyway, the file manager
+    merges the edits). `release` frees a task's paths when it finishes.
+    """
+
+    def __init__(self):
+        self._owners: Dict[str, str] = {}  # path -> running task that claimed it
+        self._claims: Dict[str, Set[str]] = {}  # task id -> claimed paths
+        self._lock = threading.Lock()
+        self.stats = {"deferred": 0, "undeclared": 0}
+
+    @classmethod
+    def write_set(cls, task: Task) -> Set[str]:
+        declared = task.metadata.get("files_to_create", []) + task.target_files
+        return {cls.normalize(path) for path in declared if path and path.strip()}
+
+    def select(self, tasks: Iterable[Task], limit: int) -> List[Task]:
+        """Pick up to `limit` tasks whose write sets do not overlap, claiming them"""
+        selected = []
+        with self._lock:
+            for task in tasks:
+                if len(selected) >= limit:
+                    break
+                paths = self.write_set(task)
+                if self._contended(task.id, paths):
+                    self.stats["deferred"] += 1
+                    continue
+                self._claim(task.id, paths)
+                selected.append(task)
+        return selected
+
+    def release(self, task_id: str):
+        with self._lock:
+            for path in self._claims.pop(task_id, set()):
+                if self._owners.get(path) == task_id:
+                    del self._owners[path]
+
+    def undeclared(self, task: Task, filenames: Iterable[str]) -> List[str]:
+        """Files a task wrote outside its write set; they are claimed if no one else holds them"""
+        declared = self.write_set(task)
+        undeclared = [
+            filename for filename in filenames
+            if not any(self._covers(path, self.normalize(filename)) for path in declared)
+        ]
+        with self._lock:
+            self.stats["undeclared"] += len(undeclared)
+            free = {self.normalize(filename) for filename in undeclared}
+            self._claim(task.id, {path for path in free if not self._contended(task.id, {path})})
+        return undeclared
+
+    def owners(self) -> Dict[str, str]:
+        """Current file-ownership map: path -> task id"""
+        with self._lock:
+            return dict(self._owners)
+
+    def _contended(self, task_id: str, paths: Set[str]) -> bool:
+        return any(
+            owner != task_id and (self._covers(path, owned) or self._covers(owned, path))
+            for owned, owner in self._owners.items()
+            for path in paths
+        )
+
+    def _claim(self, task_id: str, paths: Set[str]):
+        for path in paths:
+            self._owners[path] = task_id
+        self._claims.setdefault(task_id, set()).update(paths)
+
+    @staticmethod
+    def _covers(path: str, other: str) -> bool:
+        """Whether `path` is `other` or a directory containing it"""
+        return path == other or (path.endswith("/") and other.startswith(path))
+
+    @staticmethod
+    def normalize(path: str) -> str:
+        directory = path.endswith(("/", "\\"))
+        path = path.replace("\\", "/")
+        while path.startswith("./"):
+            path = path[2:]
+        path = str(PurePosixPath(path))
+        return path + "/" if directory and path != "." else path
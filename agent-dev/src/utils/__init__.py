@@ -4,7 +4,7 @@ Utility modules
 
 from .llm import LLMClient, OllamaClient
 from .logger import get_logger, setup_logging, logger
-from .safety import SafetyChecker
+from .safety import SafetyChecker, SafetyScanner, SafetyRule, SafetyFinding
 from .validation import ResponseValidator
 
 __all__ = [
@@ -14,5 +14,8 @@ __all__ = [
     "setup_logging",
     "logger",
     "SafetyChecker",
+    "SafetyScanner",
+    "SafetyRule",
+    "SafetyFinding",
     "ResponseValidator",
 ]
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+Deadlines and cooperative cancellation for long-running agent work
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+
+class TaskTimeoutError(Exception):
+    """Raised when work runs past its deadline or is cancelled"""
+
+
+class Deadline:
+    """Absolute point in time after which work must stop.
+
+    A deadline can also be cancelled explicitly; cancellation propagates to
+    every child deadline derived from it, so cancelling a phase stops all
+    tasks running inside it.
+    """
+
+    def __init__(self, seconds: Optional[float] = None, parent: Optional["Deadline"] = None):
+        self._expires_at = time.monotonic() + seconds if seconds is not None else None
+        self._cancelled = threading.Event()
+        self.parent = parent
+
+    @classmethod
+    def from_datetime(cls, when: Optional[datetime], parent: Optional["Deadline"] = None) -> "Deadline":
+        """Create a deadline from a wall-clock datetime (e.g. Task.deadline)"""
+        if when is None:
+            return cls(parent=parent)
+        return cls((when - datetime.now()).total_seconds(), parent=parent)
+
+    def child(self, seconds: Optional[float] = None) -> "Deadline":
+        """Derive a deadline that never outlives this one"""
+        return Deadline(seconds, parent=self)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None if unbounded"""
+        remaining = None
+        if self._expires_at is not None:
+            remaining = max(0.0, self._expires_at - time.monotonic())
+        if self.parent is not None:
+            parent_remaining = self.parent.remaining()
+            if parent_remaining is not None:
+                remaining = parent_remaining if remaining is None else min(remaining, parent_remaining)
+        return remaining
+
+    def timeout(self, default: float) -> float:
+        """Timeout to hand to a blocking call, capped by the remaining time"""
+        remaining = self.remaining()
+        return default if remaining is None else min(default, remaining)
+
+    def cancel(self):
+        """Cancel all work bound to this deadline"""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    @property
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return self.cancelled or (remaining is not None and remaining <= 0)
+
+    def check(self, operation: str = "operation"):
+        """Raise TaskTimeoutError if the deadline has passed"""
+        if self.cancelled:
+            raise TaskTimeoutError(f"{operation} cancelled")
+        if self.expired:
+            raise TaskTimeoutError(f"{operation} exceeded its deadline")
@@ -0,0 +1,71 @@
+"""
+Incremental JSON parsing for streamed LLM responses
+"""
+
+import json
+from typing import Any, List
+
+
+class JSONArrayStreamParser:
+    """Emit the elements of a JSON array as soon as each one is complete.
+
+    Chunks of a streamed response are fed in as they arrive. The first '['
+    marks the array of interest (so `{"tasks": [...]}` wrappers and leading
+    prose are tolerated); every object or array directly inside it is decoded
+    once its closing bracket is seen. Elements that fail to decode are
+    skipped and counted in `errors`.
+    """
+
+    def __init__(self):
+        self._array_depth = None  # Depth of the target array once found
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._element: List[str] = []
+        self.finished = False
+        self.errors = 0
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume a chunk and return the elements completed by it"""
+        completed = []
+        if self.finished:
+            return completed
+
+        for char in chunk:
+            capturing = self._array_depth is not None and self._depth > self._array_depth
+            if capturing:
+                self._element.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._depth += 1
+                if self._array_depth is None and char == "[":
+                    self._array_depth = self._depth
+                elif self._array_depth is not None and self._depth == self._array_depth + 1:
+                    self._element = [char]
+            elif char in "]}":
+                self._depth -= 1
+                if self._array_depth is None:
+                    continue
+                if self._depth == self._array_depth and self._element:
+                    text = "".join(self._element)
+                    self._element = []
+                    try:
+                        completed.append(json.loads(text))
+                    except json.JSONDecodeError:
+                        self.errors += 1
+                elif self._depth < self._array_depth:
+                    self.finished = True
+                    break
+
+        return completed
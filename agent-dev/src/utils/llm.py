@@ -1,27 +1,41 @@
 import os
-from typing import Dict, Any, List, Optional, Union
+import threading
+from typing import Callable, Dict, Any, Iterator, List, Optional, Union
 import json
 import requests
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
 from openai import OpenAI, AsyncOpenAI
 from anthropic import Anthropic
 import instructor
 from pydantic import BaseModel
 from ..config.settings import AgentSettings, LLMProvider
+from .deadline import Deadline, TaskTimeoutError
+
+
+def _deadline_expired(retry_state) -> bool:
+    """Tenacity stop condition: never retry past the caller's deadline"""
+    deadline = retry_state.kwargs.get("deadline")
+    return deadline is not None and deadline.expired
 
 
 class OllamaClient:
-    def __init__(self, base_url: str = "http://localhost:11434"):
+    def __init__(self, base_url: str = "http://localhost:11434", timeout: float = 300):
         self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
     
     def generate(self, model: str, prompt: str, system: Optional[str] = None, 
                  temperature: float = 0.1, max_tokens: int = 4000, 
-                 format: Optional[str] = None) -> str:
-        """Generate text using Ollama API"""
+                 format: Optional[str] = None, deadline: Optional[Deadline] = None) -> str:
+        """Generate text using Ollama API
+        
+        With a deadline the response is streamed so the request can be
+        abandoned between chunks; closing the connection makes Ollama stop
+        generating instead of finishing a response nobody will read.
+        """
         payload = {
             "model": model,
             "prompt": prompt,
-            "stream": False,
+            "stream": deadline is not None,
             "options": {
                 "temperature": temperature,
                 "num_predict": max_tokens
@@ -35,23 +49,109 @@ class OllamaClient:
             payload["format"] = format
         
         try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json=payload,
-                timeout=300
-            )
-            response.raise_for_status()
-            return response.json()["response"]
+            if deadline is None:
+                response = requests.post(
+                    f"{self.base_url}/api/generate",
+                    json=payload,
+                    timeout=self.timeout
+                )
+                response.raise_for_status()
+                return response.json()["response"]
+            
+            return "".join(self._stream(payload, deadline))
+        except requests.exceptions.Timeout as e:
+            if deadline is not None and deadline.expired:
+                raise TaskTimeoutError(f"Ollama request exceeded its deadline: {str(e)}")
+            raise Exception(f"Ollama API error: {str(e)}")
         except requests.exceptions.RequestException as e:
             raise Exception(f"Ollama API error: {str(e)}")
         except KeyError as e:
             raise Exception(f"Invalid response from Ollama: {str(e)}")
+    
+    def generate_stream(self, model: str, prompt: str, system: Optional[str] = None,
+                        temperature: float = 0.1, max_tokens: int = 4000,
+                        deadline: Optional[Deadline] = None) -> Iterator[str]:
+        """Yield response text chunks as Ollama produces them"""
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": True,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens
+            }
+        }
+        
+        if system:
+            payload["system"] = system
+        
+        try:
+            yield from self._stream(payload, deadline)
+        except requests.exceptions.Timeout as e:
+            if deadline is not None and deadline.expired:
+                raise TaskTimeoutError(f"Ollama request exceeded its deadline: {str(e)}")
+            raise Exception(f"Ollama API error: {str(e)}")
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Ollama API error: {str(e)}")
+        except KeyError as e:
+            raise Exception(f"Invalid response from Ollama: {str(e)}")
+    
+    def load_model(self, model: str, keep_alive: str = "10m", timeout: Optional[float] = None):
+        """Load a model into memory (an empty prompt makes Ollama just load it)"""
+        response = requests.post(
+            f"{self.base_url}/api/generate",
+            json={"model": model, "keep_alive": keep_alive},
+            timeout=timeout or self.timeout
+        )
+        response.raise_for_status()
+    
+    def _stream(self, payload: Dict[str, Any], deadline: Optional[Deadline]) -> Iterator[str]:
+        """POST a streaming request and yield its chunks, checking the deadline in between"""
+        if deadline is not None:
+            deadline.check("Ollama request")
+        timeout = deadline.timeout(self.timeout) if deadline is not None else self.timeout
+        
+        with requests.post(
+            f"{self.base_url}/api/generate",
+            json=payload,
+            stream=True,
+            timeout=timeout
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if deadline is not None:
+                    deadline.check("Ollama request")
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                yield chunk["response"]
+                if chunk.get("done"):
+                    break
+
+
+class _Slot:
+    """Context manager releasing an acquired LLM request slot"""
+    
+    def __init__(self, release: Callable[[], None]):
+        self._release = release
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self._release()
 
 
 class LLMClient:
     def __init__(self, settings: AgentSettings):
         self.settings = settings
         self.client = self._initialize_client()
+        # Global cap on in-flight requests, shared by every agent using this client
+        self._slots = threading.BoundedSemaphore(settings.max_concurrent_llm_calls)
+        # Foreground requests waiting for a slot; background requests yield to them
+        self._foreground_waiting = 0
+        # Notified when a slot is released and when the last foreground request stops waiting
+        self._slot_freed = threading.Condition()
         
     def _initialize_client(self):
         if self.settings.llm_provider == LLMProvider.OPENAI:
@@ -63,22 +163,97 @@ class LLMClient:
                 raise ValueError("Anthropic API key is required")
             return Anthropic(api_key=self.settings.anthropic_api_key)
         elif self.settings.llm_provider == LLMProvider.OLLAMA:
-            return OllamaClient(base_url=self.settings.ollama_base_url)
+            return OllamaClient(
+                base_url=self.settings.ollama_base_url,
+                timeout=self.settings.llm_request_timeout_seconds
+            )
         else:
             raise ValueError(f"Unsupported LLM provider: {self.settings.llm_provider}")
     
+    @property
+    def default_model(self) -> str:
+        if self.settings.llm_provider == LLMProvider.OLLAMA:
+            return self.settings.ollama_model
+        return self.settings.model_name
+    
+    def model_id(self, model: Optional[str] = None) -> str:
+        """Identifies the model and sampling settings that produce responses"""
+        return f"{self.settings.llm_provider.value}/{model or self.default_model}@{self.settings.temperature}"
+    
     @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10)
+        stop=stop_after_attempt(3) | _deadline_expired,
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_not_exception_type(TaskTimeoutError)
     )
     def generate(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         response_format: Optional[Dict] = None,
+        deadline: Optional[Deadline] = None,
+        model: Optional[str] = None,
+        background: bool = False,
+        **kwargs
+    ) -> str:
+        """Generate text from LLM
+        
+        When a deadline is given the request timeout is capped by the time
+        remaining and retries stop once the deadline has passed. `model`
+        overrides the configured model for this request. Background requests
+        only take a slot while no foreground request is waiting for one.
+        """
+        if deadline is not None:
+            deadline.check("LLM generation")
+            kwargs.setdefault("timeout", deadline.timeout(self.settings.llm_request_timeout_seconds))
+        
+        with self._acquire_slot(deadline, background=background):
+            return self._generate(prompt, system_prompt, response_format, deadline, model=model, **kwargs)
+    
+    def _acquire_slot(self, deadline: Optional[Deadline], background: bool = False) -> "_Slot":
+        """Wait for a free request slot, no longer than the deadline allows"""
+        if background:
+            return self._acquire_background_slot(deadline)
+        
+        timeout = deadline.remaining() if deadline is not None else None
+        with self._slot_freed:
+            self._foreground_waiting += 1
+        try:
+            acquired = self._slots.acquire(timeout=timeout)
+        finally:
+            with self._slot_freed:
+                self._foreground_waiting -= 1
+                if self._foreground_waiting == 0:
+                    self._slot_freed.notify_all()
+        if not acquired:
+            raise TaskTimeoutError("Timed out waiting for a free LLM slot")
+        return _Slot(self._release_slot)
+    
+    def _acquire_background_slot(self, deadline: Optional[Deadline]) -> "_Slot":
+        """Take a slot only when it is free and nobody in the foreground wants it"""
+        with self._slot_freed:
+            while True:
+                if deadline is not None:
+                    deadline.check("Waiting for a free LLM slot")
+                if self._foreground_waiting == 0 and self._slots.acquire(blocking=False):
+                    return _Slot(self._release_slot)
+                self._slot_freed.wait(deadline.remaining() if deadline is not None else None)
+    
+    def _release_slot(self):
+        # Released under the condition's lock, so a background waiter cannot miss it
+        with self._slot_freed:
+            self._slots.release()
+            self._slot_freed.notify_all()
+    
+    def _generate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        response_format: Optional[Dict],
+        deadline: Optional[Deadline],
+        model: Optional[str] = None,
         **kwargs
     ) -> str:
-        """Generate text from LLM"""
+        model = model or self.default_model
         try:
             if self.settings.llm_provider == LLMProvider.OPENAI:
                 messages = []
@@ -87,7 +262,7 @@ class LLMClient:
                 messages.append({"role": "user", "content": prompt})
                 
                 response = self.client.chat.completions.create(
-                    model=self.settings.model_name,
+                    model=model,
                     messages=messages,
                     temperature=self.settings.temperature,
                     max_tokens=self.settings.max_tokens,
@@ -103,7 +278,7 @@ class LLMClient:
                 messages.append({"role": "user", "content": prompt})
                 
                 response = self.client.messages.create(
-                    model=self.settings.model_name,
+                    model=model,
                     max_tokens=self.settings.max_tokens,
                     temperature=self.settings.temperature,
                     system=system_prompt,
@@ -119,25 +294,134 @@ class LLMClient:
                     format_str = "json"
                 
                 return self.client.generate(
-                    model=self.settings.ollama_model,
+                    model=model,
                     prompt=prompt,
                     system=system_prompt,
                     temperature=self.settings.temperature,
                     max_tokens=self.settings.max_tokens,
-                    format=format_str
+                    format=format_str,
+                    deadline=deadline
                 )
             
             else:
                 raise ValueError(f"Unsupported LLM provider: {self.settings.llm_provider}")
                 
+        except TaskTimeoutError:
+            raise
         except Exception as e:
+            if deadline is not None and deadline.expired:
+                raise TaskTimeoutError(f"LLM generation exceeded its deadline: {str(e)}")
             raise Exception(f"LLM generation failed: {str(e)}")
     
+    def warm_up(self, deadline: Optional[Deadline] = None):
+        """Make sure the model is resident before the next request
+        
+        Only meaningful for local Ollama models, which are unloaded after a
+        period of inactivity; hosted providers need no warm-up.
+        """
+        if self.settings.llm_provider != LLMProvider.OLLAMA:
+            return
+        timeout = (
+            deadline.timeout(self.settings.llm_request_timeout_seconds)
+            if deadline is not None else None
+        )
+        try:
+            self.client.load_model(self.settings.ollama_model, timeout=timeout)
+        except requests.exceptions.RequestException:
+            # Best effort: the next real request will load the model anyway
+            pass
+    
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Iterator[str]:
+        """Yield generated text incrementally
+        
+        Streams are not retried: chunks already handed to the caller cannot
+        be taken back, so failures surface to the consumer.
+        """
+        timeout = (
+            deadline.timeout(self.settings.llm_request_timeout_seconds)
+            if deadline is not None else self.settings.llm_request_timeout_seconds
+        )
+        
+        with self._acquire_slot(deadline):
+            yield from self._generate_stream(prompt, system_prompt, deadline, timeout)
+    
+    def _generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        deadline: Optional[Deadline],
+        timeout: float
+    ) -> Iterator[str]:
+        try:
+            if self.settings.llm_provider == LLMProvider.OPENAI:
+                messages = []
+                if system_prompt:
+                    messages.append({"role": "system", "content": system_prompt})
+                messages.append({"role": "user", "content": prompt})
+                
+                stream = self.client.chat.completions.create(
+                    model=self.settings.model_name,
+                    messages=messages,
+                    temperature=self.settings.temperature,
+                    max_tokens=self.settings.max_tokens,
+                    stream=True,
+                    timeout=timeout
+                )
+                with stream:
+                    for chunk in stream:
+                        if deadline is not None:
+                            deadline.check("LLM generation")
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+            
+            elif self.settings.llm_provider == LLMProvider.ANTHROPIC:
+                stream = self.client.messages.create(
+                    model=self.settings.model_name,
+                    max_tokens=self.settings.max_tokens,
+                    temperature=self.settings.temperature,
+                    system=system_prompt or "",
+                    messages=[{"role": "user", "content": prompt}],
+                    stream=True,
+                    timeout=timeout
+                )
+                with stream:
+                    for event in stream:
+                        if deadline is not None:
+                            deadline.check("LLM generation")
+                        if event.type == "content_block_delta" and hasattr(event.delta, "text"):
+                            yield event.delta.text
+            
+            elif self.settings.llm_provider == LLMProvider.OLLAMA:
+                yield from self.client.generate_stream(
+                    model=self.settings.ollama_model,
+                    prompt=prompt,
+                    system=system_prompt,
+                    temperature=self.settings.temperature,
+                    max_tokens=self.settings.max_tokens,
+                    deadline=deadline
+                )
+            
+            else:
+                raise ValueError(f"Unsupported LLM provider: {self.settings.llm_provider}")
+        
+        except TaskTimeoutError:
+            raise
+        except Exception as e:
+            if deadline is not None and deadline.expired:
+                raise TaskTimeoutError(f"LLM generation exceeded its deadline: {str(e)}")
+            raise Exception(f"LLM streaming failed: {str(e)}")
+    
     def generate_structured(
         self,
         prompt: str,
         response_model: BaseModel,
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        deadline: Optional[Deadline] = None
     ) -> BaseModel:
         """Generate structured output using Pydantic model"""
         try:
@@ -151,6 +435,10 @@ class LLMClient:
                         {"role": "user", "content": prompt}
                     ],
                     temperature=self.settings.temperature,
+                    timeout=(
+                        deadline.timeout(self.settings.llm_request_timeout_seconds)
+                        if deadline else self.settings.llm_request_timeout_seconds
+                    ),
                 )
             else:
                 # For Ollama and Anthropic, use JSON mode
@@ -158,7 +446,8 @@ class LLMClient:
                 response = self.generate(
                     prompt=prompt,
                     system_prompt=system_prompt,
-                    response_format=format_info
+                    response_format=format_info,
+                    deadline=deadline
                 )
                 
                 try:
@@ -175,5 +464,7 @@ class LLMClient:
                     else:
                         raise Exception(f"Failed to parse JSON from response: {response[:200]}")
                         
+        except TaskTimeoutError:
+            raise
         except Exception as e:
             raise Exception(f"Structured generation failed: {str(e)}")
\ No newline at end of file
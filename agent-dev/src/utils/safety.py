@@ -1,33 +1,202 @@
 import os
 import re
-from typing import List, Dict, Any, Optional
-from pathlib import Path
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+from pathlib import Path, PurePosixPath
+from pydantic import BaseModel, Field
+
+
+class SafetyRule(BaseModel):
+    id: str
+    category: str  # "sensitive", "executable" or "filesystem"
+    message: str
+    pattern: str
+    triggers: List[str]  # Literals every match starts with; matched case-insensitively
+    ignore_case: bool = False
+    extensions: List[str] = Field(default_factory=list)  # Empty applies the rule to every file
+    severity: str = "warning"  # "critical" findings are refused by the file manager
+
+
+class SafetyFinding(BaseModel):
+    rule: str
+    category: str
+    severity: str
+    message: str
+    line: int  # 1-based
+    column: int  # 1-based
+
+
+def _sensitive(rule_id: str, pattern: str, triggers: List[str], severity: str = "warning") -> SafetyRule:
+    return SafetyRule(
+        id=rule_id, category="sensitive", message=f"Sensitive pattern found: {pattern}",
+        pattern=pattern, triggers=triggers, ignore_case=True, severity=severity
+    )
+
+
+def _dangerous_import(name: str) -> SafetyRule:
+    return SafetyRule(
+        id=f"import:{name}", category="executable", message=f"Potentially dangerous import: {name}",
+        pattern=re.escape(name), triggers=[name], extensions=[".py"]
+    )
+
+
+def _filesystem(rule_id: str, pattern: str, triggers: List[str]) -> SafetyRule:
+    return SafetyRule(
+        id=rule_id, category="filesystem", message=f"File system operation detected: {pattern}",
+        pattern=pattern, triggers=triggers
+    )
+
+
+DEFAULT_RULES = [
+    _sensitive("hardcoded-secret", r"(api[_-]?key|secret|token|password)\s*=\s*['\"][^'\"]+['\"]",
+               ["api", "secret", "token", "password"]),
+    _sensitive("process-env", r"process\.env\.[A-Z_]+", ["process.env."]),
+    _sensitive("os-getenv", r"os\.getenv\([^)]+\)", ["os.getenv("]),
+    _sensitive("dotenv", r"\.env", [".env"]),
+    _sensitive("config-file", r"config\.(yml|yaml|json|ini|cfg)", ["config."]),
+    _sensitive("private-key-name", r"private[_-]?key", ["private"]),
+    _sensitive("private-key-block", r"BEGIN\s+(RSA|DSA|EC)\s+PRIVATE\s+KEY", ["begin"], severity="critical"),
+    _sensitive("ssh-public-key", r"ssh-rsa\s+[A-Za-z0-9+/]+[=]{0,2}", ["ssh-rsa"]),
+    *(
+        _dangerous_import(name)
+        for name in ("os.system", "subprocess.run", "subprocess.Popen", "exec", "eval", "__import__")
+    ),
+    _filesystem("open-write", r"open\([^)]+,\s*['\"]w['\"]\)", ["open("]),
+    _filesystem("open-append", r"open\([^)]+,\s*['\"]a['\"]\)", ["open("]),
+    _filesystem("shutil", r"shutil\.(copy|move|rmtree)", ["shutil."]),
+    _filesystem("os-remove", r"os\.(remove|unlink|rmdir)", ["os."]),
+]
+
+
+class SafetyScanner:
+    """All safety rules compiled into one scanner that reads content once.
+
+    Every rule names the literals its matches start with. Those triggers
+    are compiled into a single trie-shaped regex, so finding candidate
+    positions costs about the same for 10 rules as for 200; only the
+    rules registered for the trigger found at a position are then tried
+    there. Findings are cached by content digest, so a file checked during
+    review is not scanned again when it is written.
+    """
+    
+    def __init__(self, rules: Optional[List[SafetyRule]] = None, cache_size: int = 2048):
+        self.rules = list(DEFAULT_RULES if rules is None else rules)
+        self.cache_size = cache_size
+        self._compiled: Dict[str, Tuple[SafetyRule, re.Pattern]] = {}
+        self._by_trigger: Dict[str, List[str]] = {}
+        for rule in self.rules:
+            flags = re.IGNORECASE if rule.ignore_case else 0
+            self._compiled[rule.id] = (rule, re.compile(rule.pattern, flags))
+            for trigger in rule.triggers:
+                self._by_trigger.setdefault(trigger.lower(), []).append(rule.id)
+        self._max_trigger = max((len(trigger) for trigger in self._by_trigger), default=0)
+        trie = _trie_pattern(list(self._by_trigger)) or r"(?!)"
+        # Case-folded literals compare much faster than IGNORECASE ones, so the scan runs on lowered text
+        self._triggers = re.compile(trie)
+        self._triggers_ignore_case = re.compile(trie, re.IGNORECASE)
+        self._cache: "OrderedDict[str, Tuple[SafetyFinding, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"scanned": 0, "cached": 0}
+    
+    def scan(self, code: str, filename: str = "") -> List[SafetyFinding]:
+        """Findings of every rule that applies to `filename`, in file order"""
+        key = hashlib.blake2b(code.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+        with self._lock:
+            findings = self._cache.get(key)
+            if findings is not None:
+                self._cache.move_to_end(key)
+                self.stats["cached"] += 1
+        
+        if findings is None:
+            findings = self._scan(code)
+            with self._lock:
+                self._cache[key] = findings
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+                self.stats["scanned"] += 1
+        
+        suffix = PurePosixPath(filename).suffix.lower()
+        return [
+            finding for finding in findings
+            if not self._compiled[finding.rule][0].extensions or suffix in self._compiled[finding.rule][0].extensions
+        ]
+    
+    def _scan(self, code: str) -> Tuple[SafetyFinding, ...]:
+        findings = []
+        rule_ends: Dict[str, int] = {}  # A rule reports a region once, not again for each trigger inside it
+        line, counted = 1, 0
+        position = 0
+        text = code.lower()
+        triggers = self._triggers
+        if len(text) != len(code):
+            # A few case mappings change the length; offsets must stay valid for `code`
+            text, triggers = code, self._triggers_ignore_case
+        while True:
+            match = triggers.search(text, position)
+            if match is None:
+                break
+            start = match.start()
+            # Triggers can be prefixes of each other ("os." and "os.getenv(")
+            prefix = text[start:start + self._max_trigger].lower()
+            for length in range(1, len(prefix) + 1):
+                for rule_id in self._by_trigger.get(prefix[:length], ()):
+                    if rule_ends.get(rule_id, -1) > start:
+                        continue
+                    rule, regex = self._compiled[rule_id]
+                    hit = regex.match(code, start)
+                    if hit is None:
+                        continue
+                    rule_ends[rule_id] = max(hit.end(), start + 1)
+                    line += code.count("\n", counted, start)
+                    counted = start
+                    findings.append(SafetyFinding(
+                        rule=rule.id,
+                        category=rule.category,
+                        severity=rule.severity,
+                        message=rule.message,
+                        line=line,
+                        column=start - code.rfind("\n", 0, start),
+                    ))
+            # Resume right after the trigger start: triggers may overlap (".env" inside "process.env.")
+            position = start + 1
+        return tuple(findings)
+
+
+def _trie_pattern(words: List[str]) -> str:
+    """Regex matching any of `words`, nested as a trie so alternatives share prefixes"""
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    
+    def render(node: Dict[str, Any]) -> str:
+        terminal = "" in node
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            # A trigger that is a prefix of longer ones also matches on its own
+            return "(?:" + body + ")?"
+        return body
+    
+    return render(trie)
 
 
 class SafetyChecker:
     """Safety checks for generated code"""
     
+    # Shared, so content scanned while routing reviews is cached when it is written
+    scanner = SafetyScanner()
+    
     @staticmethod
     def check_for_sensitive_patterns(code: str) -> List[str]:
         """Check for sensitive patterns in code"""
-        sensitive_patterns = [
-            r"(api[_-]?key|secret|token|password)\s*=\s*['\"][^'\"]+['\"]",
-            r"process\.env\.[A-Z_]+",
-            r"os\.getenv\([^)]+\)",
-            r"\.env",
-            r"config\.(yml|yaml|json|ini|cfg)",
-            r"private[_-]?key",
-            r"BEGIN\s+(RSA|DSA|EC)\s+PRIVATE\s+KEY",
-            r"ssh-rsa\s+[A-Za-z0-9+/]+[=]{0,2}",
-        ]
-        
-        issues = []
-        for pattern in sensitive_patterns:
-            matches = re.findall(pattern, code, re.IGNORECASE)
-            if matches:
-                issues.append(f"Sensitive pattern found: {pattern}")
-        
-        return issues
+        return SafetyChecker._messages(SafetyChecker.scanner.scan(code), {"sensitive"})
     
     @staticmethod
     def check_file_size(filepath: Path, max_size_mb: int = 10) -> bool:
@@ -64,29 +233,15 @@ class SafetyChecker:
     @staticmethod
     def check_executable_content(code: str, filename: str) -> List[str]:
         """Check for potentially dangerous executable content"""
+        return SafetyChecker._messages(SafetyChecker.scanner.scan(code, filename), {"executable", "filesystem"})
+    
+    @staticmethod
+    def _messages(findings: List[SafetyFinding], categories: set) -> List[str]:
+        """One issue per rule, located at its first occurrence"""
         issues = []
-        
-        # Check for shell commands in Python files
-        if filename.endswith('.py'):
-            dangerous_imports = [
-                'os.system', 'subprocess.run', 'subprocess.Popen',
-                'exec', 'eval', '__import__'
-            ]
-            
-            for import_stmt in dangerous_imports:
-                if import_stmt in code:
-                    issues.append(f"Potentially dangerous import: {import_stmt}")
-        
-        # Check for file system operations
-        fs_patterns = [
-            r"open\([^)]+,\s*['\"]w['\"]\)",
-            r"open\([^)]+,\s*['\"]a['\"]\)",
-            r"shutil\.(copy|move|rmtree)",
-            r"os\.(remove|unlink|rmdir)",
-        ]
-        
-        for pattern in fs_patterns:
-            if re.search(pattern, code):
-                issues.append(f"File system operation detected: {pattern}")
-        
-        return issues
\ No newline at end of file
+        seen = set()
+        for finding in findings:
+            if finding.category in categories and finding.rule not in seen:
+                seen.add(finding.rule)
+                issues.append(f"{finding.message} (line {finding.line}, column {finding.column})")
+        return issues
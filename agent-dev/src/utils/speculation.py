@@ -0,0 +1,94 @@
+"""
+Speculative execution of likely-next work while the agent waits on a human
+"""
+
+import hashlib
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from .deadline import Deadline
+from .logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def fingerprint(data: Any) -> str:
+    """Stable hash of JSON-serializable inputs, used to key speculative work"""
+    payload = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Speculation:
+    """Work started before we know whether it will be needed.
+
+    `work` is called with a cancellable deadline and an `emit` callback.
+    Emitted items are buffered until `commit` hands them to a sink; after
+    that they are forwarded directly. `discard` cancels the work and drops
+    everything it produced. `key` identifies the inputs the work was started
+    from, so callers can check that it is still valid before committing.
+    """
+
+    def __init__(self, key: str, work: Callable[[Deadline, Callable[[Any], None]], Any]):
+        self.key = key
+        self.deadline = Deadline()
+        self._work = work
+        self._lock = threading.Lock()
+        self._buffer: List[Any] = []
+        self._sink: Optional[Callable[[Any], None]] = None
+        self._discarded = False
+        self._future: Optional[Future] = None
+
+    def start(self) -> "Speculation":
+        """Start the work on a background thread"""
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculation")
+        self._future = executor.submit(self._work, self.deadline, self._emit)
+        executor.shutdown(wait=False)
+        return self
+
+    def _emit(self, item: Any):
+        with self._lock:
+            if self._discarded:
+                return
+            if self._sink is None:
+                self._buffer.append(item)
+                return
+            sink = self._sink
+        sink(item)
+
+    def matches(self, key: str) -> bool:
+        return not self._discarded and self.key == key
+
+    def commit(
+        self,
+        sink: Optional[Callable[[Any], None]] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Future:
+        """Keep the work: replay buffered items into `sink` and return its future
+
+        `deadline` bounds the remaining work from now on (e.g. the phase deadline).
+        """
+        if self._future is None:
+            self.start()
+        if deadline is not None:
+            self.deadline.parent = deadline
+
+        with self._lock:
+            buffered, self._buffer = self._buffer, []
+            for item in buffered:
+                if sink:
+                    sink(item)
+            self._sink = sink or (lambda item: None)
+
+        return self._future
+
+    def discard(self):
+        """Throw the work away, cancelling it if it is still running"""
+        with self._lock:
+            self._discarded = True
+            self._buffer = []
+        self.deadline.cancel()
+        if self._future is not None and not self._future.done():
+            logger.debug(f"Discarded speculative work {self.key[:12]}")
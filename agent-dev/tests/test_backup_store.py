@@ -0,0 +1,42 @@
+from src.file_manager.backup_store import BackupStore
+
+
+def blobs(store):
+    return sorted(path for path in store.objects_dir.rglob("*") if path.is_file())
+
+
+def test_first_backup_per_task_and_file_is_kept(tmp_path):
+    store = BackupStore(str(tmp_path))
+    store.add("a.py", "before\n", "t1")
+    store.add("a.py", "in between\n", "t1")
+
+    assert store.get("t1", "a.py") == "before\n"
+    # The second version is referenced by nothing, so it is not stored
+    assert len(blobs(store)) == 1
+
+
+def test_identical_content_shares_one_blob(tmp_path):
+    store = BackupStore(str(tmp_path), compression="lzma")
+    store.add("a.py", "same\n", "t1")
+    store.add("b.py", "same\n", "t2")
+
+    assert len(blobs(store)) == 1
+    assert store.get("t2", "b.py") == "same\n"
+    assert store.disk_usage()["versions"] == 2
+
+
+def test_old_versions_beyond_max_backups_are_evicted(tmp_path):
+    store = BackupStore(str(tmp_path), max_backups=2)
+    for version in range(4):
+        store.add("a.py", f"v{version}\n", f"t{version}")
+
+    assert store.count("a.py") == 2
+    assert store.get("t0", "a.py") is None
+    assert store.get("t3", "a.py") == "v3\n"
+    assert len(blobs(store)) == 2
+
+
+def test_manifests_survive_a_restart(tmp_path):
+    BackupStore(str(tmp_path)).add("a.py", "kept\n", "t1")
+
+    assert BackupStore(str(tmp_path)).get("t1", "a.py") == "kept\n"
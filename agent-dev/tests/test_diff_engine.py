@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from src.file_manager.diff_engine import DIFF_BACKENDS, DiffEngine
+
+
+def random_edit(rng, lines):
+    edited = list(lines)
+    for _ in range(rng.randint(1, 6)):
+        position = rng.randint(0, len(edited))
+        action = rng.choice(("insert", "delete", "replace"))
+        if action == "insert":
+            edited.insert(position, f"new {rng.randint(0, 9)}\n")
+        elif edited and position < len(edited):
+            if action == "delete":
+                del edited[position]
+            else:
+                edited[position] = f"changed {rng.randint(0, 9)}\n"
+    return edited
+
+
+@pytest.mark.parametrize("backend", sorted(DIFF_BACKENDS))
+def test_opcodes_rebuild_the_new_side(backend):
+    engine = DiffEngine(backend=backend)
+    rng = random.Random(backend)
+    for _ in range(50):
+        # Few distinct lines, so there are many repeated candidates to match
+        a = [f"line {rng.randint(0, 5)}\n" for _ in range(rng.randint(0, 30))]
+        b = random_edit(rng, a)
+        rebuilt = []
+        i = j = 0
+        for tag, i1, i2, j1, j2 in engine.opcodes(a, b):
+            assert (i1, j1) == (i, j)
+            rebuilt.extend(a[i1:i2] if tag == "equal" else b[j1:j2])
+            i, j = i2, j2
+        assert (i, j) == (len(a), len(b))
+        assert rebuilt == b
+
+
+def test_matching_blocks_end_with_a_sentinel_like_difflib():
+    blocks = DiffEngine().matching_blocks(["a\n", "b\n"], ["a\n", "c\n"])
+    assert blocks[-1] == (2, 2, 0)
+    assert blocks[0] == (0, 0, 1)
+
+
+def test_identical_content_has_an_empty_diff():
+    assert DiffEngine().unified_diff("a\nb\n", "a\nb\n") == ""
+
+
+def test_oversized_input_gets_a_hash_summary():
+    diff = DiffEngine(max_lines=10).unified_diff("x\n" * 11, "y\n", "a/f.py", "b/f.py")
+    assert diff.startswith("--- a/f.py\n+++ b/f.py\n# changed (too large to diff)\n")
+    assert "11 lines" in diff
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown diff backend"):
+        DiffEngine(backend="myers")
@@ -0,0 +1,86 @@
+import json
+
+from src.file_manager.history import FileHistory
+
+
+VERSIONS = [
+    "def main():\n    pass\n",
+    "def main():\n    print('hi')\n",
+    "def main():\n    print('hi')",
+    "import sys\n\ndef main():\n    print('hi')\n",
+    "",
+    "x = 1\n",
+]
+
+
+def write_versions(history, versions=VERSIONS):
+    previous = None
+    for number, content in enumerate(versions, 1):
+        history.append("app.py", f"t{number}", content, previous)
+        previous = content
+
+
+def records(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_every_version_reads_back_exactly(tmp_path):
+    history = FileHistory(str(tmp_path / "history.jsonl"))
+    write_versions(history)
+
+    for number, content in enumerate(VERSIONS, 1):
+        assert history.get_version("app.py", number) == content
+    assert history.get_version("app.py", -1) == VERSIONS[-1]
+    assert history.get_version("app.py", "t2") == VERSIONS[1]
+    assert history.get_version("app.py", 99) is None
+
+
+def test_versions_after_the_first_are_stored_as_diffs(tmp_path):
+    path = tmp_path / "history.jsonl"
+    write_versions(FileHistory(str(path)))
+
+    stored = records(path)
+    assert "content" in stored[0]
+    assert all("delta" in record for record in stored[1:])
+
+
+def test_snapshot_every_interval(tmp_path):
+    path = tmp_path / "history.jsonl"
+    write_versions(FileHistory(str(path), snapshot_interval=3))
+
+    assert ["content" in record for record in records(path)] == [True, False, False, True, False, False]
+
+
+def test_index_is_rebuilt_from_the_log(tmp_path):
+    path = tmp_path / "history.jsonl"
+    write_versions(FileHistory(str(path)))
+
+    reopened = FileHistory(str(path))
+    assert [entry["version"] for entry in reopened.entries("app.py")] == list(range(1, len(VERSIONS) + 1))
+    assert reopened.get_version("app.py", 4) == VERSIONS[3]
+
+
+def test_record_cut_short_by_a_crash_is_dropped(tmp_path):
+    path = tmp_path / "history.jsonl"
+    write_versions(FileHistory(str(path)), VERSIONS[:2])
+    with open(path, "ab") as f:
+        f.write(b'{"filename": "app.py", "vers')
+
+    history = FileHistory(str(path))
+    assert len(history.entries("app.py")) == 2
+    history.append("app.py", "t3", "y = 2\n", VERSIONS[1])
+    assert history.get_version("app.py", 3) == "y = 2\n"
+    assert len(records(path)) == 3
+
+
+def test_compaction_keeps_the_newest_versions(tmp_path):
+    path = tmp_path / "history.jsonl"
+    history = FileHistory(str(path), max_entries=2)
+    versions = [f"x = {number}\n" for number in range(8)]
+    write_versions(history, versions)
+
+    assert len(records(path)) < len(versions)
+    assert [entry["version"] for entry in history.entries("app.py")] == [7, 8]
+    assert history.get_version("app.py", 7) == versions[6]
+    assert history.get_version("app.py", 8) == versions[7]
+    assert history.get_version("app.py", 1) is None
@@ -0,0 +1,42 @@
+from src.utils.json_stream import JSONArrayStreamParser
+
+
+def feed_in_chunks(parser, text, size):
+    elements = []
+    for start in range(0, len(text), size):
+        elements.extend(parser.feed(text[start:start + size]))
+    return elements
+
+
+def test_elements_are_emitted_as_soon_as_they_close():
+    parser = JSONArrayStreamParser()
+    assert parser.feed('[{"id": "t1"}, {"id"') == [{"id": "t1"}]
+    assert parser.feed(': "t2"}]') == [{"id": "t2"}]
+    assert parser.finished
+
+
+def test_wrapper_object_and_prose_are_tolerated():
+    text = 'Here are the tasks:\n{"tasks": [{"id": "t1", "files": ["a.py"]}, {"id": "t2", "files": []}]}'
+    parser = JSONArrayStreamParser()
+    assert feed_in_chunks(parser, text, 3) == [
+        {"id": "t1", "files": ["a.py"]},
+        {"id": "t2", "files": []},
+    ]
+
+
+def test_brackets_and_escaped_quotes_inside_strings_are_ignored():
+    text = r'[{"description": "use ] and } and \"[\" freely"}]'
+    parser = JSONArrayStreamParser()
+    assert feed_in_chunks(parser, text, 1) == [{"description": 'use ] and } and "[" freely'}]
+
+
+def test_broken_elements_are_skipped_and_counted():
+    parser = JSONArrayStreamParser()
+    assert parser.feed('[{"id": "t1",}, {"id": "t2"}]') == [{"id": "t2"}]
+    assert parser.errors == 1
+
+
+def test_input_after_the_array_is_ignored():
+    parser = JSONArrayStreamParser()
+    parser.feed('[{"id": "t1"}] [{"id": "t2"}]')
+    assert parser.feed('{"id": "t3"}') == []
@@ -0,0 +1,57 @@
+from src.file_manager.handler import FileManager
+
+
+LARGE = "x = 1\n" * 20
+
+
+def manager_with_threshold(tmp_path, threshold_bytes=64):
+    manager = FileManager(output_dir=str(tmp_path), durable=False)
+    manager.stream_threshold_bytes = threshold_bytes
+    return manager
+
+
+def write(manager, task_id, filename, code):
+    return manager.write_files([{"filename": filename, "code": code}], task_id)
+
+
+def test_large_files_are_hashed_not_loaded_by_begin_task(tmp_path):
+    manager = manager_with_threshold(tmp_path)
+    write(manager, "setup", "big.py", LARGE)
+    write(manager, "setup", "small.py", "y = 1\n")
+
+    existing = manager.begin_task("t1", ["big.py", "small.py"])
+
+    assert existing == {"small.py": "y = 1\n"}
+    assert "big.py" not in manager._bases["t1"]
+    assert manager._base_digests["t1"]["big.py"] == manager.content_index.digest(LARGE)
+
+
+def test_large_file_unchanged_since_begin_task_is_overwritten(tmp_path):
+    manager = manager_with_threshold(tmp_path)
+    write(manager, "setup", "big.py", LARGE)
+
+    manager.begin_task("t1", ["big.py"])
+    results = write(manager, "t1", "big.py", LARGE + "y = 2\n")
+
+    assert results["success"] == ["big.py"]
+    assert (tmp_path / "big.py").read_text(encoding="utf-8") == LARGE + "y = 2\n"
+
+
+def test_concurrent_change_to_a_large_file_conflicts(tmp_path):
+    manager = manager_with_threshold(tmp_path)
+    write(manager, "setup", "big.py", LARGE)
+
+    manager.begin_task("t1", ["big.py"])
+    write(manager, "t2", "big.py", LARGE + "z = 3\n")
+    results = write(manager, "t1", "big.py", LARGE + "y = 2\n")
+
+    assert [conflict["filename"] for conflict in results["conflicts"]] == ["big.py"]
+    assert (tmp_path / "big.py").read_text(encoding="utf-8") == LARGE + "z = 3\n"
+
+
+def test_read_file_respects_max_bytes(tmp_path):
+    manager = manager_with_threshold(tmp_path)
+    write(manager, "setup", "big.py", LARGE)
+
+    assert manager.read_file("big.py") == LARGE
+    assert manager.read_file("big.py", max_bytes=manager.stream_threshold_bytes) is None
@@ -0,0 +1,58 @@
+import threading
+import time
+
+import pytest
+
+from src.config.settings import AgentSettings, LLMProvider
+from src.utils.deadline import Deadline, TaskTimeoutError
+from src.utils.llm import LLMClient
+
+
+def client(slots=1):
+    return LLMClient(AgentSettings(llm_provider=LLMProvider.OLLAMA, max_concurrent_llm_calls=slots))
+
+
+def acquire_in_thread(llm, background, order, name):
+    def run():
+        with llm._acquire_slot(None, background=background):
+            order.append(name)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_background_request_wakes_when_a_slot_is_released():
+    llm = client()
+    order = []
+    held = llm._acquire_slot(None)
+    thread = acquire_in_thread(llm, True, order, "background")
+    time.sleep(0.05)
+    assert order == []
+
+    released = time.monotonic()
+    held.__exit__(None, None, None)
+    thread.join(timeout=1)
+    assert order == ["background"]
+    assert time.monotonic() - released < 0.1
+
+
+def test_background_request_yields_to_waiting_foreground_requests():
+    llm = client()
+    order = []
+    held = llm._acquire_slot(None)
+    foreground = acquire_in_thread(llm, False, order, "foreground")
+    time.sleep(0.05)
+    background = acquire_in_thread(llm, True, order, "background")
+    time.sleep(0.05)
+
+    held.__exit__(None, None, None)
+    foreground.join(timeout=1)
+    background.join(timeout=1)
+    assert order == ["foreground", "background"]
+
+
+def test_background_wait_ends_at_the_deadline():
+    llm = client()
+    with llm._acquire_slot(None):
+        with pytest.raises(TaskTimeoutError):
+            llm._acquire_slot(Deadline(0.05), background=True)
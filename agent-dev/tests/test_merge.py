@@ -0,0 +1,41 @@
+from src.file_manager.merge import merge3
+
+
+BASE = "import os\n\nx = 1\n"
+
+
+def test_changes_to_different_lines_are_combined():
+    ours = "import os\nimport sys\n\nx = 1\n"
+    theirs = "import os\n\nx = 2\n"
+    result = merge3(BASE, ours, theirs)
+    assert result.clean
+    assert result.content == "import os\nimport sys\n\nx = 2\n"
+
+
+def test_identical_changes_are_applied_once():
+    changed = "import os\n\nx = 3\n"
+    assert merge3(BASE, changed, changed).content == changed
+
+
+def test_concurrent_insertions_keep_both_blocks_intact():
+    ours = BASE + "def a():\n    return 1\n"
+    theirs = BASE + "def b():\n    return 1\n"
+    result = merge3(BASE, ours, theirs)
+    assert result.clean
+    assert result.content == BASE + "def a():\n    return 1\ndef b():\n    return 1\n"
+
+
+def test_insertion_contained_in_the_other_is_kept_once():
+    ours = "import os\nimport sys\n\nx = 1\n"
+    theirs = "import os\nimport sys\nimport json\n\nx = 1\n"
+    assert merge3(BASE, ours, theirs).content == theirs
+    assert merge3(BASE, theirs, ours).content == theirs
+
+
+def test_overlapping_edits_conflict():
+    result = merge3(BASE, "import os\n\nx = 2\n", "import os\n\nx = 3\n")
+    assert not result.clean
+    assert result.content is None
+    assert result.conflicts[0].base_line == 3
+    assert result.conflicts[0].ours == ["x = 2\n"]
+    assert result.conflicts[0].theirs == ["x = 3\n"]
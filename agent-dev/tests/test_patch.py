@@ -0,0 +1,45 @@
+import difflib
+
+import pytest
+
+from src.file_manager.diff_engine import DIFF_BACKENDS, DiffEngine, NO_NEWLINE_MARKER
+from src.file_manager.patch import apply_patch
+
+
+PAIRS = [
+    ("a\nb\nc\n", "a\nB\nc\n"),
+    ("a\nb", "a\nb\n"),
+    ("a\nb\n", "a\nb"),
+    ("a\nb", "a\nc"),
+    ("x\nlast", "y\nlast"),
+    ("", "new\n"),
+    ("", "new"),
+    ("old", ""),
+    ("\n".join(f"line {i}" for i in range(40)), "\n".join(f"line {i}" for i in range(40) if i % 7)),
+]
+
+
+@pytest.mark.parametrize("backend", sorted(DIFF_BACKENDS))
+@pytest.mark.parametrize("old, new", PAIRS)
+def test_unified_diff_applies_back_exactly(backend, old, new):
+    diff = DiffEngine(backend=backend).unified_diff(old, new, "a/f.py", "b/f.py")
+    result = apply_patch(old, diff, fuzz=0)
+    assert result.success
+    assert result.content == new
+
+
+def test_missing_final_newline_is_marked():
+    diff = DiffEngine().unified_diff("a\nb", "a\nb\n")
+    assert diff.endswith("-b\n" + NO_NEWLINE_MARKER + "+b\n")
+
+
+def test_matches_difflib_when_every_line_is_terminated():
+    old, new = "a\nb\nc\nd\n", "a\nc\nd\ne\n"
+    expected = "".join(difflib.unified_diff(old.splitlines(True), new.splitlines(True), "a", "b"))
+    assert DiffEngine(backend="difflib").unified_diff(old, new, "a", "b") == expected
+
+
+def test_edit_away_from_the_end_keeps_missing_final_newline():
+    old = "a\nb\nc\nd\ne\nf\ng\nh"
+    diff = "@@ -1,2 +1,2 @@\n-a\n+A\n b\n"
+    assert apply_patch(old, diff).content == "A\nb\nc\nd\ne\nf\ng\nh"
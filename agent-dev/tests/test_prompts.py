@@ -0,0 +1,57 @@
+import json
+import os
+
+import pytest
+
+from src.config.prompts import PromptManager
+
+
+def write_prompts(directory, category, prompts, mtime=None):
+    path = directory / f"{category}_prompts.json"
+    path.write_text(json.dumps(prompts), encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+    return path
+
+
+SCHEMAS = {"demo": {"greeting": {"name", "place"}, "plain": set()}}
+
+
+def test_repository_prompts_load_and_render_like_str_format():
+    manager = PromptManager()
+    template = manager.get_template("reviewer", "code_review")
+    values = {name: f"<{name}>" for name in template.placeholders}
+    assert manager.get_prompt("reviewer", "code_review", **values) == template.text.format(**values)
+
+
+def test_missing_values_are_named(tmp_path):
+    write_prompts(tmp_path, "demo", {"greeting": "Hi {name} from {place}, {{literal}}"})
+    manager = PromptManager(str(tmp_path), schemas=SCHEMAS)
+
+    assert manager.get_prompt("demo", "greeting", name="Ada", place="Turin") == "Hi Ada from Turin, {literal}"
+    with pytest.raises(KeyError, match="place"):
+        manager.get_prompt("demo", "greeting", name="Ada")
+
+
+def test_placeholders_callers_do_not_pass_are_rejected_at_load(tmp_path):
+    write_prompts(tmp_path, "demo", {"greeting": "Hi {name}, {typo}"})
+    with pytest.raises(ValueError, match="typo"):
+        PromptManager(str(tmp_path), schemas=SCHEMAS)
+
+
+def test_edited_files_are_reloaded_and_change_the_version(tmp_path):
+    write_prompts(tmp_path, "demo", {"plain": "one"}, mtime=1_000_000_000)
+    manager = PromptManager(str(tmp_path), reload_interval=0, schemas=SCHEMAS)
+    version = manager.get_prompt_version("demo", "plain")
+
+    write_prompts(tmp_path, "demo", {"plain": "two"}, mtime=2_000_000_000)
+    assert manager.get_prompt("demo", "plain") == "two"
+    assert manager.get_prompt_version("demo", "plain") != version
+
+
+def test_broken_edit_keeps_the_last_good_templates(tmp_path):
+    write_prompts(tmp_path, "demo", {"plain": "one"}, mtime=1_000_000_000)
+    manager = PromptManager(str(tmp_path), reload_interval=0, schemas=SCHEMAS)
+
+    write_prompts(tmp_path, "demo", {"plain": "unbalanced }"}, mtime=2_000_000_000)
+    assert manager.get_prompt("demo", "plain") == "one"
@@ -0,0 +1,77 @@
+import time
+
+from src.tasks.models import Task
+from src.tasks.retry import RetryScheduler
+
+
+def test_failed_task_is_due_after_its_backoff():
+    scheduler = RetryScheduler(base_delay=0.05)
+    task = Task(id="t1", description="build")
+
+    assert scheduler.schedule(task, ["SyntaxError in a.py"])
+    assert scheduler.pop_due() == []
+    time.sleep(0.06)
+    assert scheduler.pop_due() == ["t1"]
+    assert task.metadata["retry_feedback"] == ["SyntaxError in a.py"]
+    assert task.metadata["attempts"] == 1
+
+
+def test_retry_budget_is_enforced():
+    scheduler = RetryScheduler(max_retries=2, base_delay=0.0)
+    task = Task(id="t1", description="build")
+
+    assert scheduler.schedule(task, [])
+    assert scheduler.schedule(task, [])
+    assert not scheduler.schedule(task, [])
+    assert scheduler.attempts("t1") == 2
+
+
+def test_backoff_doubles_up_to_the_cap():
+    scheduler = RetryScheduler(max_retries=5, base_delay=10.0, max_delay=25.0)
+    task = Task(id="t1", description="build")
+
+    delays = []
+    for _ in range(3):
+        scheduler.schedule(task, [])
+        delays.append(scheduler.next_due_in())
+        scheduler._queue.clear()
+    assert [round(delay) for delay in delays] == [10, 20, 25]
+
+
+def test_requeue_is_immediate_and_free():
+    scheduler = RetryScheduler(max_retries=1, base_delay=60.0)
+    task = Task(id="t1", description="build")
+
+    scheduler.requeue(task, ["merge conflict in a.py"])
+    assert scheduler.pop_due() == ["t1"]
+    assert scheduler.attempts("t1") == 0
+    assert scheduler.schedule(task, [])
+
+
+def test_conflict_requeues_are_capped():
+    scheduler = RetryScheduler(max_retries=3, base_delay=60.0, max_conflict_requeues=2)
+    task = Task(id="t1", description="build")
+
+    assert scheduler.requeue(task, [])
+    assert scheduler.requeue(task, [])
+    assert not scheduler.requeue(task, ["still conflicting"])
+    assert task.metadata["conflict_requeues"] == 2
+    assert scheduler.pop_due() == ["t1", "t1"]
+    assert scheduler.attempts("t1") == 0
+
+
+def test_conflict_requeue_cap_defaults_to_the_retry_budget():
+    scheduler = RetryScheduler(max_retries=1)
+    task = Task(id="t1", description="build")
+
+    assert scheduler.requeue(task, [])
+    assert not scheduler.requeue(task, [])
+
+
+def test_pop_due_respects_the_limit():
+    scheduler = RetryScheduler()
+    for task_id in ("t1", "t2", "t3"):
+        scheduler.requeue(Task(id=task_id, description="build"), [])
+
+    assert scheduler.pop_due(limit=2) == ["t1", "t2"]
+    assert len(scheduler) == 1
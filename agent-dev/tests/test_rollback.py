@@ -0,0 +1,63 @@
+from src.file_manager.handler import FileManager
+
+
+def write(manager, task_id, **files):
+    return manager.write_files(
+        [{"filename": name.replace("_", "."), "code": code} for name, code in files.items()],
+        task_id
+    )
+
+
+def read(manager, filename):
+    return (manager.output_dir / filename).read_text(encoding="utf-8")
+
+
+def test_rollback_restores_each_file_to_its_state_before_the_task(tmp_path):
+    manager = FileManager(output_dir=str(tmp_path), durable=False)
+    write(manager, "setup", a_py="x = 1\n")
+    write(manager, "t1", a_py="x = 2\n", b_py="y = 1\n")
+
+    results = manager.rollback_tasks(["t1"])
+
+    assert results["restored"] == ["a.py"]
+    assert results["deleted"] == ["b.py"]
+    assert read(manager, "a.py") == "x = 1\n"
+    assert not (tmp_path / "b.py").exists()
+
+
+def test_rollback_after_conflict_requeue_keeps_other_tasks_changes(tmp_path):
+    manager = FileManager(output_dir=str(tmp_path), durable=False)
+    write(manager, "setup", a_py="x = 1\ny = 1\n", b_py="z = 1\n")
+
+    # t1's first attempt conflicts on b.py with t3; none of its writes land
+    manager.begin_task("t1", ["a.py", "b.py"])
+    manager.begin_task("t3", ["b.py"])
+    write(manager, "t3", b_py="z = 3\n")
+    attempt = write(manager, "t1", a_py="x = 1\ny = 2\n", b_py="z = 2\n")
+    assert [conflict["filename"] for conflict in attempt["conflicts"]] == ["b.py"]
+    assert read(manager, "a.py") == "x = 1\ny = 1\n"
+
+    # Another task changes a.py before t1 is retried
+    write(manager, "t2", a_py="x = 5\ny = 1\n")
+
+    manager.begin_task("t1", ["a.py", "b.py"])
+    retry = write(manager, "t1", a_py="x = 5\ny = 2\n", b_py="z = 3\nw = 1\n")
+    assert sorted(retry["success"]) == ["a.py", "b.py"]
+
+    results = manager.rollback_tasks(["t1"])
+
+    assert not results["failed"]
+    assert read(manager, "a.py") == "x = 5\ny = 1\n"
+    assert read(manager, "b.py") == "z = 3\n"
+
+
+def test_rollback_refuses_files_changed_since_by_other_tasks(tmp_path):
+    manager = FileManager(output_dir=str(tmp_path), durable=False)
+    write(manager, "setup", a_py="x = 1\n")
+    write(manager, "t1", a_py="x = 2\n")
+    write(manager, "t2", a_py="x = 3\n")
+
+    results = manager.rollback_tasks(["t1"])
+
+    assert results["failed"] == ["a.py"]
+    assert read(manager, "a.py") == "x = 3\n"
@@ -0,0 +1,80 @@
+import re
+
+from src.utils.safety import DEFAULT_RULES, SafetyChecker, SafetyRule, SafetyScanner
+
+
+CODE = '''import os
+import subprocess
+
+API_KEY = "abc123"
+token = os.getenv("TOKEN")
+url = process.env.API_URL
+
+
+def run(cmd):
+    subprocess.run(cmd)
+    with open(path, "w") as f:
+        f.write(eval(cmd))
+    os.remove(path)
+    shutil.rmtree("build")
+'''
+
+
+def naive_scan(code, filename):
+    """Each rule's regex run over the whole text on its own"""
+    findings = set()
+    suffix = "." + filename.rsplit(".", 1)[-1] if "." in filename else ""
+    for rule in DEFAULT_RULES:
+        if rule.extensions and suffix not in rule.extensions:
+            continue
+        flags = re.IGNORECASE if rule.ignore_case else 0
+        for match in re.finditer(rule.pattern, code, flags):
+            line = code.count("\n", 0, match.start()) + 1
+            column = match.start() - code.rfind("\n", 0, match.start())
+            findings.add((rule.id, line, column))
+    return findings
+
+
+def test_scanner_finds_what_each_rule_finds_on_its_own():
+    for filename in ("app.py", "app.js"):
+        findings = SafetyScanner().scan(CODE, filename)
+        assert {(finding.rule, finding.line, finding.column) for finding in findings} == naive_scan(CODE, filename)
+
+
+def test_findings_are_in_file_order():
+    findings = SafetyScanner().scan(CODE, "app.py")
+    positions = [(finding.line, finding.column) for finding in findings]
+    assert positions == sorted(positions)
+
+
+def test_triggers_match_case_insensitively_only_for_case_insensitive_rules():
+    scanner = SafetyScanner()
+    assert [finding.rule for finding in scanner.scan('PASSWORD = "hunter2"\n')] == ["hardcoded-secret"]
+    assert scanner.scan("SHUTIL.RMTREE(x)\n") == []
+
+
+def test_rules_limited_to_extensions_do_not_fire_elsewhere():
+    scanner = SafetyScanner()
+    assert [finding.rule for finding in scanner.scan("eval(x)\n", "app.py")] == ["import:eval"]
+    assert scanner.scan("eval(x)\n", "app.js") == []
+
+
+def test_content_is_scanned_once_per_digest():
+    scanner = SafetyScanner()
+    scanner.scan(CODE, "app.py")
+    scanner.scan(CODE, "app.js")
+    assert scanner.stats == {"scanned": 1, "cached": 1}
+
+
+def test_overlapping_triggers_are_each_tried():
+    rules = [
+        SafetyRule(id="short", category="filesystem", message="short", pattern=r"os\.", triggers=["os."]),
+        SafetyRule(id="long", category="sensitive", message="long", pattern=r"os\.getenv\(", triggers=["os.getenv("]),
+    ]
+    findings = SafetyScanner(rules=rules).scan("os.getenv(")
+    assert sorted(finding.rule for finding in findings) == ["long", "short"]
+
+
+def test_checker_reports_one_issue_per_rule():
+    issues = SafetyChecker.check_executable_content("eval(a)\neval(b)\n", "app.py")
+    assert issues == ["Potentially dangerous import: eval (line 1, column 1)"]
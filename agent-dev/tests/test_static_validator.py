@@ -0,0 +1,54 @@
+from src.tasks.models import Task
+from src.tasks.static_validator import StaticValidator
+
+
+def task_creating(*paths):
+    return Task(id="t1", description="task", metadata={"files_to_create": list(paths)})
+
+
+def test_valid_output_passes_and_trivial_files_skip_llm_validation():
+    result = StaticValidator().check(task_creating("README.md"), {"README.md": "# Project\n"})
+    assert result["passed"]
+    assert result["skip_llm"]
+
+
+def test_missing_declared_file_is_reported():
+    result = StaticValidator().check(task_creating("app.py", "util.py"), {"app.py": "x = 1\n"})
+    assert not result["passed"]
+    assert result["issues"] == ["Missing expected file: util.py"]
+
+
+def test_declared_directory_without_trailing_slash_is_satisfied_by_files_below_it():
+    generated = {"src/models/user.py": "class User:\n    pass\n"}
+    assert StaticValidator().check(task_creating("src/models", "./src/models/user.py"), generated)["passed"]
+
+
+def test_python_syntax_errors_are_reported_with_the_line():
+    issues = StaticValidator().check_file("app.py", "def broken(:\n    pass\n")
+    assert len(issues) == 1
+    assert issues[0].startswith("app.py: syntax error at line 1")
+
+
+def test_yaml_with_application_tags_parses():
+    template = (
+        "Resources:\n"
+        "  Bucket:\n"
+        "    Type: AWS::S3::Bucket\n"
+        "  Policy:\n"
+        "    Properties:\n"
+        "      Bucket: !Ref Bucket\n"
+        "      Arn: !GetAtt [Bucket, Arn]\n"
+        "password: !vault |\n"
+        "  $ANSIBLE_VAULT;1.1;AES256\n"
+    )
+    assert StaticValidator().check_file("template.yaml", template) == []
+
+
+def test_invalid_yaml_and_json_are_reported():
+    assert StaticValidator().check_file("config.yaml", "key: [unclosed\n")
+    assert StaticValidator().check_file("data.json", "{\"a\": }")
+
+
+def test_empty_files_are_only_allowed_where_expected():
+    assert StaticValidator().check_file("pkg/__init__.py", "") == []
+    assert StaticValidator().check_file("app.py", "  \n") == ["app.py: file is empty"]
@@ -0,0 +1,92 @@
+import threading
+import time
+
+from src.tasks.models import Task
+from src.tasks.validation_batcher import ValidationBatcher
+from src.utils.deadline import Deadline, TaskTimeoutError
+
+
+class FakeDecomposer:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+
+    def get_cached_validation(self, task, generated_files):
+        return None
+
+    def validate_task_completion(self, task, generated_files, deadline=None):
+        return self.validate_tasks_batch([(task, generated_files)], deadline)[task.id]
+
+    def validate_tasks_batch(self, items, deadline=None):
+        self.calls.append([task.id for task, _ in items])
+        time.sleep(self.delay)
+        return {task.id: {"passed": True, "task_id": task.id} for task, _ in items}
+
+
+def run(batcher, task, deadline=None):
+    batcher.task_started(task.id)
+    try:
+        return batcher.validate(task, {"a.py": "x = 1"}, deadline=deadline)
+    finally:
+        batcher.task_finished(task.id)
+
+
+def test_lone_task_is_sent_without_waiting_for_the_window():
+    decomposer = FakeDecomposer()
+    batcher = ValidationBatcher(decomposer, window_seconds=5.0)
+
+    start = time.monotonic()
+    verdict = run(batcher, Task(id="t1", description="one"))
+
+    assert verdict["passed"]
+    assert time.monotonic() - start < 1.0
+    assert decomposer.calls == [["t1"]]
+
+
+def test_concurrent_tasks_share_one_batch():
+    decomposer = FakeDecomposer()
+    batcher = ValidationBatcher(decomposer, window_seconds=5.0)
+    tasks = [Task(id="t1", description="one"), Task(id="t2", description="two")]
+    for task in tasks:
+        batcher.task_started(task.id)
+
+    verdicts = {}
+    threads = [
+        threading.Thread(target=lambda t=task: verdicts.update({t.id: batcher.validate(t, {"a.py": "x"})}))
+        for task in tasks
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=3.0)
+
+    assert set(verdicts) == {"t1", "t2"}
+    assert [sorted(call) for call in decomposer.calls] == [["t1", "t2"]]
+
+
+def test_each_member_keeps_its_own_deadline():
+    decomposer = FakeDecomposer(delay=0.3)
+    batcher = ValidationBatcher(decomposer, window_seconds=5.0)
+    tight, relaxed = Task(id="tight", description="a"), Task(id="relaxed", description="b")
+    batcher.task_started(tight.id)
+    batcher.task_started(relaxed.id)
+
+    outcome = {}
+
+    def validate(task, deadline):
+        try:
+            outcome[task.id] = batcher.validate(task, {"a.py": "x"}, deadline=deadline)
+        except TaskTimeoutError as e:
+            outcome[task.id] = e
+
+    threads = [
+        threading.Thread(target=validate, args=(tight, Deadline(0.1))),
+        threading.Thread(target=validate, args=(relaxed, Deadline(5.0))),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=3.0)
+
+    assert isinstance(outcome["tight"], TaskTimeoutError)
+    assert outcome["relaxed"]["passed"]
@@ -0,0 +1,51 @@
+from src.tasks.models import Task
+from src.tasks.write_sets import WriteSetScheduler
+
+
+def task(task_id, *files):
+    return Task(id=task_id, description=task_id, metadata={"files_to_create": list(files)})
+
+
+def ids(tasks):
+    return [task.id for task in tasks]
+
+
+def test_tasks_with_disjoint_write_sets_run_together():
+    scheduler = WriteSetScheduler()
+    tasks = [task("t1", "a.py"), task("t2", "b.py"), task("t3", "./a.py")]
+
+    assert ids(scheduler.select(tasks, limit=3)) == ["t1", "t2"]
+    assert scheduler.stats["deferred"] == 1
+
+
+def test_directory_entries_cover_the_files_below_them():
+    scheduler = WriteSetScheduler()
+    tasks = [task("t1", "src/"), task("t2", "src/app.py"), task("t3", "tests\\test_app.py")]
+
+    assert ids(scheduler.select(tasks, limit=3)) == ["t1", "t3"]
+
+
+def test_release_frees_a_tasks_paths():
+    scheduler = WriteSetScheduler()
+    first, second = task("t1", "a.py"), task("t2", "a.py")
+    scheduler.select([first], limit=1)
+
+    assert scheduler.select([second], limit=1) == []
+    scheduler.release("t1")
+    assert ids(scheduler.select([second], limit=1)) == ["t2"]
+    assert scheduler.owners() == {"a.py": "t2"}
+
+
+def test_select_stops_at_the_limit():
+    scheduler = WriteSetScheduler()
+    assert ids(scheduler.select([task("t1", "a.py"), task("t2", "b.py")], limit=1)) == ["t1"]
+    assert scheduler.owners() == {"a.py": "t1"}
+
+
+def test_undeclared_files_are_reported_and_claimed_when_free():
+    scheduler = WriteSetScheduler()
+    scheduler.select([task("t1", "a.py"), task("t2", "b.py")], limit=2)
+
+    assert scheduler.undeclared(task("t1", "a.py"), ["a.py", "b.py", "c.py"]) == ["b.py", "c.py"]
+    assert scheduler.owners() == {"a.py": "t1", "b.py": "t2", "c.py": "t1"}
+    assert scheduler.stats["undeclared"] == 2